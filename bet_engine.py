@@ -19,6 +19,15 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.action_chains import ActionChains
 from utils.calculate_no_vig_prices import calculate_no_vig_prices
 from utils.calculate_ev import calculate_ev
+from utils.event_index import SportyEventIndex
+from utils.event_map_cache import EventMapCache
+from utils.team_names import normalize_team, team_tokens, longest_tokens, word_match
+from utils.similarity import lev_similarity
+from utils.match_scoring import score_candidates, TOP_SCORE
+from utils.team_aliases import TeamAliasStore
+from utils.single_flight import SingleFlightCache
+from utils.market_index import get_market_index
+from utils.pinnacle_event import PinnacleEvent
 from scipy.optimize import minimize_scalar
 import math
 from captcha_solver import CaptchaSolver
@@ -222,6 +231,9 @@ class BetEngine(WebsiteOpener):
         # Initialize cookie jar for search functionality
         self.__cookie_jar = None
         
+        # Shared keep-alive connection pool for Sportybet API requests
+        self.__http_session = self.__build_http_session()
+        
 
         # Load configuration
         self.__load_config(config_file)
@@ -238,6 +250,54 @@ class BetEngine(WebsiteOpener):
         self.__active_bet_count = 0
         self.__active_bet_lock = threading.Lock()
         self.__start_bet_worker()
+        
+        # Local index of upcoming Sportybet events used to resolve matches without live search
+        self.__event_index = None
+        self.__start_event_index()
+        
+        # Persistent Pinnacle -> Sportybet event ID mappings, valid until kick-off
+        try:
+            self.__event_map = EventMapCache(path=self.__config.get("event_map_file", "event_map.db"))
+        except Exception as e:
+            logger.error(f"Error opening event mapping cache: {e}")
+            self.__event_map = None
+        
+        # Team aliases learned from confirmed matches, checked before any fuzzy matching
+        self.__team_aliases = TeamAliasStore(
+            path=self.__config.get("team_alias_file", "team_aliases.json"),
+            min_count=int(self.__config.get("team_alias_min_count", 2))
+        )
+        # Only matches at least this strong teach aliases (once bet on) or are stored in the event map
+        self.__team_alias_min_score = int(self.__config.get("team_alias_min_score", 300))
+        
+        # Keyword-level firstSearch cache: concurrent notifies share one request per keyword
+        search_cache_settings = self.__config.get("search_cache") or {}
+        self.__search_cache = SingleFlightCache(
+            ttl=float(search_cache_settings.get("ttl", 30)),
+            negative_ttl=float(search_cache_settings.get("negative_ttl", 10)),
+            name="sporty-search"
+        )
+        
+        # Pinnacle event payloads shared by every EV, stake and points lookup of a game scan
+        snapshot_settings = self.__config.get("pinnacle_snapshot") or {}
+        self.__pinnacle_snapshots = SingleFlightCache(
+            ttl=float(snapshot_settings.get("max_age", 5)),
+            negative_ttl=float(snapshot_settings.get("negative_ttl", 2)),
+            name="pinnacle-events"
+        )
+        
+        # Short-lived Sportybet event details, shared by concurrent notifies for the same event
+        details_cache_settings = self.__config.get("event_details_cache") or {}
+        self.__event_details_cache = SingleFlightCache(
+            ttl=float(details_cache_settings.get("ttl", 10)),
+            negative_ttl=float(details_cache_settings.get("negative_ttl", 3)),
+            name="sporty-event-details"
+        )
+        
+        # "grid" tries fixed candidate lines; "offered" only the lines Sportybet lists that Pinnacle also prices
+        self.__market_scan_mode = str(self.__config.get("market_scan_mode", "grid")).strip().lower()
+        # Match handicap outcomes by side/points and skip second-half/quarter markets (off: the original lookups)
+        self.__strict_market_matching = bool(self.__config.get("strict_market_matching", False))
     
     # Thread-local driver property to avoid cross-thread overrides
     @property
@@ -988,64 +1048,172 @@ class BetEngine(WebsiteOpener):
             raise
 
     def __normalize_team(self, name):
-        s = str(name or "").lower()
-        s = re.sub(r"\(.*?\)", "", s)
-        s = re.sub(r"[^a-z0-9\s]", " ", s)
-        s = re.sub(r"\s+", " ", s).strip()
-        s = re.sub(r"\b(fc|bc|cf|ac)\b\s*$", "", s).strip()
-        tokens = [t for t in s.split() if t not in {"club","team","sport","sports","fc","cf","sc","ac","bc","fk","united","city","town","rovers","athletic","sporting","real","atletico","inter","milan","juventus","football","soccer","basketball"}]
-        return " ".join(tokens)
+        return normalize_team(name)
 
     def __extract_longest_tokens(self, name):
-        s = self.__normalize_team(name)
-        arr = [w for w in s.split() if len(w) >= 3]
-        arr.sort(key=lambda x: len(x), reverse=True)
-        seen = []
-        for w in arr:
-            if w not in seen:
-                seen.append(w)
-            if len(seen) >= 3:
-                break
-        return seen
+        return list(longest_tokens(name))
 
     def __lev_similarity(self, a, b):
-        a = self.__normalize_team(a)
-        b = self.__normalize_team(b)
-        if not a or not b:
-            return 0.0
-        la, lb = len(a), len(b)
-        dp = list(range(lb + 1))
-        for i in range(1, la + 1):
-            prev = dp[0]
-            dp[0] = i
-            ai = a[i - 1]
-            for j in range(1, lb + 1):
-                tmp = dp[j]
-                cost = 0 if ai == b[j - 1] else 1
-                dp[j] = min(dp[j] + 1, dp[j - 1] + 1, prev + cost)
-                prev = tmp
-        dist = dp[lb]
-        sim = (1 - dist / max(la, lb)) * 100
-        return sim
+        return lev_similarity(a, b)
 
     def __word_match(self, token, text):
-        token = str(token or "").lower().strip()
-        text = self.__normalize_team(text)
-        if not token or not text:
-            return False
-        if len(token) <= 3:
-            return re.search(r"\b" + re.escape(token) + r"\b", text) is not None
-        return token in text
+        return word_match(token, text)
 
     def __similar(self, a, b):
-        ta = set(self.__normalize_team(a).split())
-        tb = set(self.__normalize_team(b).split())
+        ta = team_tokens(a)
+        tb = team_tokens(b)
         if not ta or not tb:
             return 0.0
         inter = len(ta & tb)
         union = len(ta | tb)
         return inter / union
 
+    def __build_http_session(self):
+        """Build the shared keep-alive session used for Sportybet API requests"""
+        session = requests.Session()
+        try:
+            from urllib3.util.retry import Retry
+            from requests.adapters import HTTPAdapter
+            retry = Retry(total=3, connect=3, read=3, backoff_factor=0.5, status_forcelist=[502, 503, 504], allowed_methods=["GET"])
+            adapter = HTTPAdapter(max_retries=retry, pool_connections=4, pool_maxsize=16)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+        except Exception as e:
+            logger.error(f"Error configuring HTTP session retries: {e}")
+        return session
+
+    def __start_event_index(self):
+        """Start the background Sportybet event indexer if enabled in config"""
+        settings = self.__config.get("event_index") or {}
+        if not settings.get("enabled", False):
+            return
+        proxies = None
+        if self.__config.get("use_proxies", False) and self.__accounts:
+            for acc in self.__accounts:
+                if acc.proxy:
+                    proxies = acc.get_proxies()
+                    break
+        try:
+            self.__event_index = SportyEventIndex(
+                api_host=self.__bet_api_host,
+                referer=self.__bet_host,
+                sport_ids=settings.get("sports", ["sr:sport:1", "sr:sport:2"]),
+                page_size=int(settings.get("page_size", 100)),
+                max_pages=int(settings.get("max_pages", 20)),
+                timeline=settings.get("timeline", "24"),
+                refresh_interval=float(settings.get("refresh_interval", 300)),
+                proxies=proxies
+            )
+            self.__event_index.start()
+            logger.info("Sportybet event index started")
+        except Exception as e:
+            logger.error(f"Error starting Sportybet event index: {e}")
+            self.__event_index = None
+
+    def __search_event_index(self, home_team, away_team, pinnacle_start_time=None):
+        """
+        Resolve a match from the local upcoming-event index without any network calls
+        
+        Only an exact hit (both teams equal to the query or a known alias after
+        normalization) is trusted; fuzzy index matches are left to the live search.
+        
+        Returns:
+        - Best match dict (event_name, event_id, score, exact), or None on a miss
+        """
+        if not self.__event_index or not len(self.__event_index):
+            return None
+        home_names = self.__team_aliases.names_for(home_team)
+        away_names = self.__team_aliases.names_for(away_team)
+        try:
+            candidates = self.__event_index.lookup(home_team, away_team, pinnacle_start_time, extra_names=home_names | away_names)
+        except Exception as e:
+            logger.error(f"Event index lookup failed: {e}")
+            return None
+        matches = score_candidates(home_team, away_team, candidates, pinnacle_start_time, home_names=home_names, away_names=away_names)
+        if not matches:
+            return None
+        best_match = next((m for m in matches if m["exact"]), matches[0])
+        if not best_match["exact"]:
+            logger.info(f"Event index match is not exact, using live search: {best_match['event_name']} (ID: {best_match['event_id']}, Score: {best_match['score']})")
+            return None
+        logger.info(f"Best match from event index: {best_match['event_name']} (ID: {best_match['event_id']}, Score: {best_match['score']})")
+        return best_match
+
+    def __fetch_search_candidates(self, search_term, proxies=None):
+        """
+        Run one firstSearch keyword query, through the short-TTL single-flight keyword cache
+        
+        Parameters:
+        - search_term: Search keyword
+        - proxies: Optional proxies dictionary
+        
+        Returns:
+        - List of pre-match candidate events (empty on failure)
+        """
+        try:
+            return self.__search_cache.get(
+                search_term.strip().lower(),
+                lambda: self.__request_search_candidates(search_term, proxies)
+            )
+        except Exception as e:
+            logger.error(f"Search request error for term '{search_term}': {e}")
+            return []
+
+    def __request_search_candidates(self, search_term, proxies=None):
+        """
+        Send one firstSearch request on the shared session
+        
+        Returns:
+        - List of pre-match candidate events (empty if the search found nothing)
+        
+        Raises on request failures so they are not cached as empty results.
+        """
+        search_url = f"{self.__bet_api_host}/factsCenter/event/firstSearch"
+        params = {
+            'keyword': search_term,
+            'offset': '0',
+            'pageSize': '20',
+            'withOneUpMarket': 'true',
+            'withTwoUpMarket': 'true',
+            '_t': str(int(time.time()*1000))
+        }
+        headers = {
+            "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36",
+            "Accept": "application/json",
+            "Referer": self.__bet_host,
+        }
+        prox = proxies
+        if isinstance(prox, dict) and "https" not in prox and "http" in prox:
+            prox = dict(prox)
+            prox["https"] = prox.get("http")
+        try:
+            response = self.__http_session.get(search_url, params=params, headers=headers, proxies=prox, timeout=15)
+        except requests.exceptions.SSLError:
+            response = self.__http_session.get(search_url, params=params, headers=headers, proxies=None, timeout=15)
+        
+        if response.status_code != 200:
+            raise requests.exceptions.HTTPError(f"Search request failed with status: {response.status_code}")
+        try:
+            search_results = response.json()
+        except ValueError as e:
+            logger.info(f"Response content: {response.text[:500]}...")
+            raise ValueError(f"Failed to parse JSON response: {e}")
+        
+        # Updated to handle the new API response structure
+        if "data" not in search_results or not search_results["data"]:
+            logger.info(f"No data found in search response for term: {search_term}")
+            return []
+        payload = search_results["data"]
+        candidates = []
+        if isinstance(payload, dict):
+            for key in ["preMatch"]:
+                v = payload.get(key)
+                if isinstance(v, list):
+                    candidates.extend(v)
+        elif isinstance(payload, list):
+            candidates.extend(payload)
+        return candidates
+
     def __search_event(self, home_team, away_team, pinnacle_start_time=None):
         """
         Search for an event on sportybet using team names and match start time
@@ -1058,13 +1226,26 @@ class BetEngine(WebsiteOpener):
         Returns:
         - event ID if found, None otherwise
         """
+        best_match = self.__search_event_match(home_team, away_team, pinnacle_start_time)
+        return best_match["event_id"] if best_match else None
+
+    def __search_event_match(self, home_team, away_team, pinnacle_start_time=None):
+        """
+        Search for an event on sportybet and return the best match with its score
+        
+        Parameters:
+        - home_team: Home team name
+        - away_team: Away team name
+        - pinnacle_start_time: Start time from Pinnacle in milliseconds (unix timestamp)
+        
+        Returns:
+        - Best match dict (event_name, event_id, score, exact) if found, None otherwise
+        """
         logger.info(f"Searching for match: {home_team} vs {away_team}")
         if pinnacle_start_time:
             pinnacle_datetime = time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(int(pinnacle_start_time)/1000))
             logger.info(f"Pinnacle start time: {pinnacle_datetime} (GMT)")
         
-        q_home = self.__normalize_team(home_team)
-        q_away = self.__normalize_team(away_team)
         l_home = self.__extract_longest_tokens(home_team)
         l_away = self.__extract_longest_tokens(away_team)
         search_strategies = []
@@ -1075,165 +1256,114 @@ class BetEngine(WebsiteOpener):
             if t not in search_strategies:
                 search_strategies.append(t)
         
-        # Store potential matches with scores for later evaluation
-        potential_matches = []
-
-        try:
-            from urllib3.util.retry import Retry
-            from requests.adapters import HTTPAdapter
-            session = requests.Session()
-            retry = Retry(total=3, connect=3, read=3, backoff_factor=0.5, status_forcelist=[502, 503, 504], allowed_methods=["GET"]) 
-            adapter = HTTPAdapter(max_retries=retry)
-            session.mount("http://", adapter)
-            session.mount("https://", adapter)
-        except Exception:
-            session = requests
+        # Known aliases go first: search by the names Sportybet actually uses
+        home_names = self.__team_aliases.names_for(home_team)
+        away_names = self.__team_aliases.names_for(away_team)
+        alias_home = self.__team_aliases.lookup(home_team)
+        alias_away = self.__team_aliases.lookup(away_team)
+        if alias_home or alias_away:
+            a_home = longest_tokens(alias_home or home_team)[:1]
+            a_away = longest_tokens(alias_away or away_team)[:1]
+            alias_term = " ".join(a_home + a_away)
+            if alias_term and alias_term not in search_strategies:
+                search_strategies.insert(0, alias_term)
+        
+        # Resolve from the local event index first; fall back to live search unless it is an exact hit
+        indexed_match = self.__search_event_index(home_team, away_team, pinnacle_start_time)
+        if indexed_match:
+            return indexed_match
+        
+        # Store potential matches with scores for later evaluation, one per event ID
+        potential_matches = {}
+        seen_event_ids = set()
         
         # List of terms that indicate the wrong team variant
         # variant_indicators = ["ladies", "women", "u21", "u-21", "u23", "u-23", "youth", "junior", "b team"]
         variant_indicators = []
-
         
-        for search_term in search_strategies:
-            # logger.info(f"Trying search term: {search_term}")
-            
-            try:
-                search_url = f"{self.__bet_api_host}/factsCenter/event/firstSearch"
-                params = {
-                    'keyword': search_term,
-                    'offset': '0',
-                    'pageSize': '20',
-                    'withOneUpMarket': 'true',
-                    'withTwoUpMarket': 'true',
-                    '_t': str(int(time.time()*1000))
-                }
-                headers = {
-                    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36",
-                    "Accept": "application/json",
-                    "Referer": self.__bet_host,
-                    "Connection": "close",
-                }
-                
-                # Get proxy if available
-                proxies = None
-                if self.__config.get("use_proxies", False) and self.__accounts:
-                    # Use the first available account's proxy
-                    for acc in self.__accounts:
-                        if acc.proxy:
-                            proxies = acc.get_proxies()
-                            logger.info(f"Using proxy for search: {acc.proxy}")
-                            break
-                
-                # logger.info(f"Searching with URL: {search_url} and params: {params}")
-                prox = proxies
-                if isinstance(prox, dict) and "https" not in prox and "http" in prox:
-                    prox = dict(prox)
-                    prox["https"] = prox.get("http")
+        # Get proxy if available
+        proxies = None
+        if self.__config.get("use_proxies", False) and self.__accounts:
+            # Use the first available account's proxy
+            for acc in self.__accounts:
+                if acc.proxy:
+                    proxies = acc.get_proxies()
+                    logger.info(f"Using proxy for search: {acc.proxy}")
+                    break
+        
+        # Highest score wins; ties go to the earliest strategy, then the earliest position in
+        # its response, which is the candidate a one-by-one search would have picked
+        def preference(match):
+            return match["score"], -match["rank"], -match["pos"]
+        
+        # Send all keyword searches at once over the shared keep-alive session. Responses are
+        # handled as they arrive, so stop early only once no running search can change the pick:
+        # the best candidate has the top rule score and every earlier strategy has answered.
+        workers = max(1, min(len(search_strategies), int(self.__config.get("search_concurrency", 8))))
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sporty-search")
+        answered = set()
+        try:
+            futures = {
+                executor.submit(self.__fetch_search_candidates, search_term, proxies): rank
+                for rank, search_term in enumerate(search_strategies)
+            }
+            for future in as_completed(futures):
+                rank = futures[future]
+                answered.add(rank)
                 try:
-                    response = session.get(search_url, params=params, headers=headers, proxies=prox, timeout=15)
-                except requests.exceptions.SSLError:
-                    try:
-                        response = session.get(search_url, params=params, headers=headers, proxies=None, timeout=15)
-                    except Exception as e:
-                        logger.error(f"Search request error: {e}")
+                    candidates = future.result()
+                except Exception as e:
+                    logger.error(f"Error searching for event with term '{search_strategies[rank]}': {e}")
+                    candidates = []
+                new_events = []
+                positions = {}
+                for pos, event in enumerate(candidates):
+                    event_id = event.get("eventId") or event.get("id")
+                    if not event_id:
                         continue
-                
-                # logger.info(f"Response status: {response.status_code}")
-                # print(f"Response content: {response.text[:500]}...")
-                if response.status_code == 200:
-                    try:
-                        search_results = response.json()
-                        # print(f"Search response: {search_results}")
-                    except ValueError as e:
-                        logger.error(f"Failed to parse JSON response: {e}")
-                        logger.info(f"Response content: {response.text[:500]}...")
+                    if event_id in seen_event_ids:
+                        # Same event from another keyword: keep its earliest strategy and position for tie-breaks
+                        if event_id in potential_matches:
+                            match = potential_matches[event_id]
+                            match["rank"], match["pos"] = min((match["rank"], match["pos"]), (rank, pos))
                         continue
-                
-                    # Updated to handle the new API response structure
-                    if "data" in search_results and search_results["data"]:
-                        payload = search_results["data"]
-                        candidates = []
-                        if isinstance(payload, dict):
-                            for key in ["preMatch"]:
-                                v = payload.get(key)
-                                if isinstance(v, list):
-                                    candidates.extend(v)
-                        elif isinstance(payload, list):
-                            candidates.extend(payload)
-                        for event in candidates:
-                            home_team_name = event.get("homeTeamName") or event.get("home") or ""
-                            away_team_name = event.get("awayTeamName") or event.get("away") or ""
-                            event_id = event.get("eventId") or event.get("id")
-                            
-                            if not event_id:
-                                continue
-                                
-                            hn = self.__normalize_team(home_team_name)
-                            an = self.__normalize_team(away_team_name)
-                            est = event.get("estimateStartTime") or event.get("startTime")
-                            if pinnacle_start_time and est:
-                                try:
-                                    diff_h = abs(int(pinnacle_start_time) - int(est)) / (1000 * 60 * 60)
-                                    if diff_h > 2:
-                                        continue
-                                except Exception:
-                                    continue
-                            lh = self.__extract_longest_tokens(home_team)
-                            la = self.__extract_longest_tokens(away_team)
-                            ok_l1b = False
-                            for x in lh[:1] + la[:1]:
-                                if self.__word_match(x, hn) or self.__word_match(x, an):
-                                    ok_l1b = True
-                                    break
-                            sim_hh = self.__lev_similarity(q_home, hn)
-                            sim_aa = self.__lev_similarity(q_away, an)
-                            sim_ha = self.__lev_similarity(q_home, an)
-                            sim_ah = self.__lev_similarity(q_away, hn)
-                            best_pair = max(((sim_hh, sim_aa),(sim_ha, sim_ah)), key=lambda t: t[0]+t[1])
-                            s1, s2 = best_pair
-                            rule_scores = []
-                            if s1 >= 25 and s2 >= 25 and (s1 + s2) >= 100:
-                                rule_scores.append(400)
-                            if ok_l1b and s1 >= 70 or ok_l1b and s2 >= 70:
-                                rule_scores.append(350)
-                            if q_home == hn and s2 >= 50 or q_home == an and s2 >= 50 or q_away == hn and s1 >= 50 or q_away == an and s1 >= 50:
-                                rule_scores.append(300)
-                            bs1 = (len(q_home) >= 3 and (q_home in hn or hn in q_home)) or (len(q_home) <= 3 and self.__word_match(q_home, hn))
-                            bs2 = (len(q_away) >= 3 and (q_away in an or an in q_away)) or (len(q_away) <= 3 and self.__word_match(q_away, an))
-                            if ok_l1b and (s1 >= 50 or s2 >= 50 or (bs1 and bs2)):
-                                rule_scores.append(250)
-                            if s1 >= 40 and s2 >= 40 and (s1 + s2) >= 100:
-                                rule_scores.append(200)
-                            if rule_scores:
-                                potential_matches.append({
-                                    "event_name": f"{home_team_name} vs {away_team_name}",
-                                    "event_id": event_id,
-                                    "score": max(rule_scores),
-                                })
-                            # logger.info(f"Potential match: {event_name} (Score: {match_score})")
-                    else:
-                        logger.info(f"No data found in search response for term: {search_term}")
-                else:
-                    logger.warning(f"Search request failed with status: {response.status_code}")
-                    # print(f"Response content: {response.text[:500]}...")
-            
-            except Exception as e:
-                logger.error(f"Error searching for event with term '{search_term}': {e}")
-                import traceback
-                traceback.print_exc()
-                continue
+                    seen_event_ids.add(event_id)
+                    positions[event_id] = pos
+                    new_events.append(event)
+                # Score the whole response in one vectorized batch
+                for match in score_candidates(home_team, away_team, new_events, pinnacle_start_time,
+                                              home_names=home_names, away_names=away_names):
+                    match["rank"] = rank
+                    match["pos"] = positions[match["event_id"]]
+                    potential_matches[match["event_id"]] = match
+                if potential_matches:
+                    best_match = max(potential_matches.values(), key=preference)
+                    if best_match["score"] >= TOP_SCORE and answered.issuperset(range(best_match["rank"])):
+                        logger.info("Top-score match found and no earlier search pending, skipping remaining search terms")
+                        break
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
         
         # If we have potential matches, return the one with the highest score
         if potential_matches:
-            best_match = max(potential_matches, key=lambda x: x["score"])
+            best_match = max(potential_matches.values(), key=preference)
             logger.info(f"Best match: {best_match['event_name']} (ID: {best_match['event_id']}, Score: {best_match['score']})")
-            return best_match["event_id"]
+            return best_match
         
         logger.warning("No matching event found on Sporty")
         return None
 
     def __get_event_details(self, event_id):
-        """Get detailed information about an event from Sporty"""
+        """
+        Get detailed information about an event from Sporty
+        
+        Details are cached per event for a few seconds and concurrent callers share one
+        request, so the market index built on them is reused as well.
+        """
+        return self.__event_details_cache.get(str(event_id), lambda: self.__request_event_details(event_id))
+
+    def __request_event_details(self, event_id):
+        """Fetch event details from the Sporty API (loader for the event details cache)"""
         logger.info(f"Getting details for event ID: {event_id}")
         
         try:
@@ -1249,17 +1379,7 @@ class BetEngine(WebsiteOpener):
                 "Referer": self.__bet_host,
             }
             
-            # Get proxy if available
-            proxies = None
-            if self.__config.get("use_proxies", False) and self.__accounts:
-                # Use the first available account's proxy
-                for acc in self.__accounts:
-                    if acc.proxy:
-                        proxies = acc.get_proxies()
-                        logger.info(f"Using proxy for event details: {acc.proxy}")
-                        break
-            
-            response = requests.get(details_url, params=params, headers=headers, timeout=10)
+            response = self.__http_session.get(details_url, params=params, headers=headers, timeout=10)
             response.raise_for_status()
             
             payload = response.json() or {}
@@ -2939,6 +3059,37 @@ class BetEngine(WebsiteOpener):
         
         return ev
         
+    def __get_pinnacle_event(self, event_id):
+        """
+        Get the Pinnacle event snapshot, shared by all lookups for the game within the snapshot freshness bound
+        
+        Parameters:
+        - event_id: The Pinnacle event ID
+        
+        Returns:
+        - PinnacleEvent, or None if it could not be fetched
+        """
+        return self.__pinnacle_snapshots.get(str(event_id), lambda: self.__request_pinnacle_event(event_id))
+
+    def __request_pinnacle_event(self, event_id):
+        """Fetch /events/{id} from the Pinnacle API (loader for the snapshot cache)"""
+        pinnacle_api_host = os.getenv("PINNACLE_HOST")
+        if not pinnacle_api_host:
+            logger.info("Pinnacle Events API host not configured")
+            return None
+        url = f"{pinnacle_api_host}/events/{event_id}"
+        logger.info(f"Fetching Pinnacle event snapshot from: {url}")
+        try:
+            response = self.__http_session.get(url, timeout=10)
+            if response.status_code != 200:
+                logger.info(f"Failed to fetch Pinnacle event: HTTP {response.status_code}")
+                return None
+            # Parsed once here; malformed lines are dropped instead of being re-checked on every lookup
+            return PinnacleEvent.from_payload(response.json())
+        except Exception as e:
+            logger.error(f"Error fetching Pinnacle event {event_id}: {e}")
+            return None
+
     def __fetch_latest_pinnacle_odds(self, event_id, line_type, points, outcome, period_key):
         """
         Fetch the latest odds from Pinnacle API for a specific event
@@ -2957,154 +3108,29 @@ class BetEngine(WebsiteOpener):
             logger.info("No event ID provided, cannot fetch latest odds")
             return None
             
-        pinnacle_api_host = os.getenv("PINNACLE_HOST")
-        if not pinnacle_api_host:
-            logger.info("Pinnacle Events API host not configured")
-            return None
-            
-        # Get proxy from first account if available
-        proxies = None
-        if self.__accounts and hasattr(self.__accounts[0], 'get_proxies'):
-            proxies = self.__accounts[0].get_proxies()
-            # if proxies:
-            #     # logger.info(f"Using proxy for Pinnacle odds: {self.__accounts[0].proxy}")
-            
         try:
-            url = f"{pinnacle_api_host}/events/{event_id}"
-            logger.info(f"Fetching latest odds from: {url}")
-            
-            response = requests.get(url)
-            if response.status_code != 200:
-                logger.info(f"Failed to fetch latest odds: HTTP {response.status_code}")
-                return None
-                
-            event_data = response.json()
-            # try:
-            #     ts = time.strftime("%Y%m%d-%H%M%S")
-            #     fname = f"pinnacle_latest_odds_{re.sub(r'[^A-Za-z0-9_.-]','_', str(event_id))}_{ts}.json"
-            #     with open(fname, "w") as f:
-            #         json.dump(event_data, f)
-            #     logger.info(f"Wrote Pinnacle latest odds response to {fname}")
-            # except Exception:
-            #     pass
-            if not event_data or "data" not in event_data or not event_data["data"]:
+            event = self.__get_pinnacle_event(event_id)
+            if event is None:
                 logger.info("No data returned from Pinnacle API")
                 return None
-                
-            if event_data["data"] == None or event_data["data"] == "null":
-                return None
-            
-            # Extract the period data
-            periods = event_data["data"].get("periods", {})
-            if not periods:  # Check if periods is None or empty
+            if not event.periods:
                 logger.info("No periods data found in Pinnacle API response")
                 return None
                 
-            period = periods.get(period_key, {})
-            if not period:  # Check if period is None or empty
+            period = event.period(period_key)
+            if period is None:
                 logger.info(f"No period data found for period key: {period_key}")
                 return None
             
-            # Extract the appropriate odds based on line type
-            decimal_prices = {}
-            
             if line_type in ("spread", "total") and points is None:
                 logger.info("Points not provided for line type requiring points; skipping latest odds fetch")
                 return None
             
-            if line_type == "money_line":
-                money_line = period.get("money_line", {})
-                if money_line:  # Check if money_line data exists
-                    try:
-                        val = money_line.get("home")
-                        if val is not None:
-                            decimal_prices["home"] = float(val)
-                    except (ValueError, TypeError):
-                        pass
-                    try:
-                        val = money_line.get("away")
-                        if val is not None:
-                            decimal_prices["away"] = float(val)
-                    except (ValueError, TypeError):
-                        pass
-                    try:
-                        val = money_line.get("draw")
-                        if val is not None:
-                            decimal_prices["draw"] = float(val)
-                    except (ValueError, TypeError):
-                        pass
-                else:
-                    logger.info("No money_line data found in period")
-                    
-            elif line_type == "spread":
-                spreads = period.get("spreads", {})
-                if spreads:  # Check if spreads data exists
-                    # Look for exact spread points match
-                    exact_spread = None
-                    
-                    for spread_key, spread_data in spreads.items():
-                        try:
-                            spread_points = float(spread_data.get("hdp", 0))
-                            # Only check for exact match, no closest approximation
-                            if abs(spread_points - float(points)) < 0.01:  # Exact match with small tolerance
-                                exact_spread = spread_data
-                                break
-                        except (ValueError, TypeError):
-                            continue
-                    
-                    if exact_spread:
-                        try:
-                            val = exact_spread.get("home")
-                            if val is not None:
-                                decimal_prices["home"] = float(val)
-                        except (ValueError, TypeError):
-                            pass
-                        try:
-                            val = exact_spread.get("away")
-                            if val is not None:
-                                decimal_prices["away"] = float(val)
-                        except (ValueError, TypeError):
-                            pass
-                    else:
-                        logger.info(f"No exact spread match found for points: {points}")
-                else:
-                    logger.info("No spreads data found in period")
-                    
-            elif line_type == "total":
-                totals = period.get("totals", {})
-                if totals:  # Check if totals data exists
-                    # Look for exact total points match
-                    exact_total = None
-                    
-                    for total_key, total_data in totals.items():
-                        try:
-                            total_points = float(total_data.get("points", 0))
-                            # Only check for exact match, no closest approximation
-                            if abs(total_points - float(points)) < 0.01:  # Exact match with small tolerance
-                                exact_total = total_data
-                                break
-                        except (ValueError, TypeError):
-                            continue
-                    
-                    if exact_total:
-                        try:
-                            val = exact_total.get("over")
-                            if val is not None:
-                                decimal_prices["home"] = float(val)  # Over as home
-                        except (ValueError, TypeError):
-                            pass
-                        try:
-                            val = exact_total.get("under")
-                            if val is not None:
-                                decimal_prices["away"] = float(val)  # Under as away
-                        except (ValueError, TypeError):
-                            pass
-                    else:
-                        logger.info(f"No exact total match found for points: {points}")
-                else:
-                    logger.info("No totals data found in period")
-            
-            return decimal_prices if decimal_prices else None
+            # Lines are keyed by rounded points, so this is a dict hit rather than a scan
+            decimal_prices = period.prices(line_type, points)
+            if decimal_prices is None and line_type in ("spread", "total"):
+                logger.info(f"No exact {line_type} match found for points: {points}")
+            return decimal_prices
             
         except Exception as e:
             logger.error(f"Error fetching latest odds: {e}")
@@ -3120,57 +3146,19 @@ class BetEngine(WebsiteOpener):
             logger.info("No event ID provided, cannot fetch available points")
             return {"totals": [], "spreads": []}
 
-        pinnacle_api_host = os.getenv("PINNACLE_HOST")
-        if not pinnacle_api_host:
-            logger.info("Pinnacle Events API host not configured")
-            return {"totals": [], "spreads": []}
-
         try:
-            url = f"{pinnacle_api_host}/events/{event_id}"
-            logger.info(f"Fetching available Pinnacle points from: {url}")
-
-            response = requests.get(url)
-            if response.status_code != 200:
-                logger.info(f"Failed to fetch available points: HTTP {response.status_code}")
-                return {"totals": [], "spreads": []}
-
-            event_data = response.json()
-            if not event_data or "data" not in event_data or not event_data["data"]:
+            event = self.__get_pinnacle_event(event_id)
+            if event is None:
                 logger.info("No data returned from Pinnacle API for available points")
                 return {"totals": [], "spreads": []}
 
-            if event_data["data"] is None or event_data["data"] == "null":
-                return {"totals": [], "spreads": []}
-
-            periods = event_data["data"].get("periods", {}) or {}
-            period = periods.get(period_key, {}) if periods else {}
-            if not period:
+            period = event.period(period_key)
+            if period is None:
                 logger.info(f"No period data found for period key (points): {period_key}")
                 return {"totals": [], "spreads": []}
 
-            totals_points = []
-            spreads_points = []
-
-            totals = period.get("totals", {}) or {}
-            for _, total_data in totals.items():
-                try:
-                    p = float(total_data.get("points"))
-                    totals_points.append(p)
-                except (TypeError, ValueError):
-                    continue
-
-            spreads = period.get("spreads", {}) or {}
-            for _, spread_data in spreads.items():
-                try:
-                    p = float(spread_data.get("hdp"))
-                    spreads_points.append(p)
-                except (TypeError, ValueError):
-                    continue
-
-            # Deduplicate and sort
-            totals_points = sorted({round(p, 2) for p in totals_points})
-            spreads_points = sorted({round(p, 2) for p in spreads_points})
-
+            totals_points = period.total_points()
+            spreads_points = period.spread_points()
             logger.info(f"Available Pinnacle points for period {period_key}: totals={totals_points}, spreads={spreads_points}")
             return {"totals": totals_points, "spreads": spreads_points}
 
@@ -3522,6 +3510,10 @@ class BetEngine(WebsiteOpener):
         # Generate game ID for outcome tracking
         game_id = self.__generate_game_id(home_team, away_team)
         
+        # Start each scan from a fresh Pinnacle snapshot; every lookup below reads that one payload
+        if shaped_data.get("eventId"):
+            self.__pinnacle_snapshots.invalidate(str(shaped_data.get("eventId")))
+        
         # Identify if this event is basketball
         is_basketball = (sport_name == "basketball" or sport_id in ("2", "sr:sport:2"))
         
@@ -3574,7 +3566,9 @@ class BetEngine(WebsiteOpener):
                 continue
 
             # Determine candidate total points from Pinnacle when basketball; fallback to defaults
-            if is_basketball:
+            if self.__market_scan_mode == "offered":
+                candidate_points = None  # resolved per outcome from the offered lines
+            elif is_basketball:
                 event_id = shaped_data.get("eventId")
                 period_key = "num_1" if is_first_half else "num_0"
                 points_info = self.__fetch_pinnacle_points_for_event(event_id, period_key) or {}
@@ -3591,6 +3585,9 @@ class BetEngine(WebsiteOpener):
                 if self.__should_skip_outcome(game_id, "total", outcome):
                     continue
                 
+                if self.__market_scan_mode == "offered":
+                    candidate_points = self.__offered_scan_points(event_details, shaped_data, "total", outcome, is_first_half, is_basketball)
+                
                 for points in candidate_points:
                     bet_code, odds, actual_points = self.__find_market_bet_code_with_points(
                         event_details, "total", points, outcome, is_first_half, sport_id, home_team, away_team
@@ -3630,7 +3627,9 @@ class BetEngine(WebsiteOpener):
                     continue
                     
                 # Determine handicap points from Pinnacle for basketball; fallback to defaults
-                if is_basketball:
+                if self.__market_scan_mode == "offered":
+                    candidate_points = self.__offered_scan_points(event_details, shaped_data, "spread", outcome, is_first_half, is_basketball)
+                elif is_basketball:
                     event_id = shaped_data.get("eventId")
                     period_key = "num_1" if is_first_half else "num_0"
                     points_info = self.__fetch_pinnacle_points_for_event(event_id, period_key) or {}
@@ -3719,6 +3718,37 @@ class BetEngine(WebsiteOpener):
         logger.info(f"{available_markets}")
         return available_markets
 
+    def __offered_scan_points(self, event_details, shaped_data, line_type, outcome, is_first_half, is_basketball):
+        """
+        Lines Sportybet offers for a market that Pinnacle also prices (offered scan mode)
+        
+        Parameters:
+        - event_details: The event details from sportybet
+        - shaped_data: The alert data (for the Pinnacle event ID)
+        - line_type: total or spread
+        - outcome: over/under or home/away
+        - is_first_half: Whether to scan first-half lines
+        - is_basketball: Whether the event is basketball
+        
+        Returns:
+        - Sorted list of Sportybet points to evaluate
+        """
+        offered = get_market_index(event_details, self.__strict_market_matching).offered_lines(line_type, outcome, is_first_half, is_basketball)
+        if not offered:
+            logger.info(f"No {line_type} {outcome} lines offered by Sportybet (1st Half: {is_first_half})")
+            return []
+        period_key = "num_1" if is_first_half else "num_0"
+        points_info = self.__fetch_pinnacle_points_for_event(shaped_data.get("eventId"), period_key) or {}
+        if line_type == "total":
+            pinnacle_points = set(points_info.get("totals") or [])
+            candidate_points = [p for p in offered if p in pinnacle_points]
+        else:
+            # __calculate_ev prices an away handicap at -points on Pinnacle
+            pinnacle_points = set(points_info.get("spreads") or [])
+            candidate_points = [p for p in offered if (-p if outcome == "away" else p) in pinnacle_points]
+        logger.info(f"Offered {line_type} {outcome} lines (1st Half: {is_first_half}): sportybet={offered}, priced by Pinnacle={candidate_points}")
+        return candidate_points
+
     def notify(self, shaped_data):
         """
         Main notification method for processing betting opportunities
@@ -3752,20 +3782,36 @@ class BetEngine(WebsiteOpener):
             
             logger.info(f"Processing new game: {home_team} vs {away_team}")
             
-            # Step 1: Search for the event on sportybet
-            logger.info(f"Searching for event: {home_team} vs {away_team}")
-            event_id = self.__search_event(home_team, away_team, pinnacle_start_time)
-            if not event_id:
-                logger.info("Event not found, cannot place bet")
-                return
+            # Step 1: Search for the event on sportybet (skipped when the mapping is already known)
+            pinnacle_event_id = shaped_data.get("eventId")
+            event_id = self.__event_map.get(pinnacle_event_id) if self.__event_map else None
+            mapped_from_cache = bool(event_id)
+            match_score = None
+            if mapped_from_cache:
+                logger.info(f"Using cached mapping for Pinnacle event {pinnacle_event_id}: {event_id}")
+            else:
+                logger.info(f"Searching for event: {home_team} vs {away_team}")
+                best_match = self.__search_event_match(home_team, away_team, pinnacle_start_time)
+                if not best_match:
+                    logger.info("Event not found, cannot place bet")
+                    return
+                event_id = best_match["event_id"]
+                match_score = best_match["score"]
             
             # Step 2: Get event details
             logger.info(f"Getting event details for event: {event_id}")
             event_details = self.__get_event_details(event_id)
             if not event_details:
                 logger.info("Could not get event details, cannot place bet")
+                if mapped_from_cache:
+                    # The mapped event may be gone; search again on the next alert
+                    self.__event_map.invalidate(pinnacle_event_id)
                 return
             
+            # Only a strong match whose event still exists is remembered; weaker ones are searched again
+            if not mapped_from_cache and self.__event_map and match_score >= self.__team_alias_min_score:
+                self.__event_map.put(pinnacle_event_id, event_id, pinnacle_start_time, home_team, away_team)
+            
             # Step 3: Check all available markets for this game
             available_markets = self.__check_all_markets_for_game(event_details, shaped_data)
             
@@ -3776,6 +3822,12 @@ class BetEngine(WebsiteOpener):
                 return
             
             # Step 4: Place bets for all markets that meet EV threshold
+            # Odds may have moved since the scan: place against freshly fetched details, not the cached snapshot
+            self.__event_details_cache.invalidate(str(event_id))
+            event_details = self.__get_event_details(event_id)
+            if not event_details:
+                logger.info("Could not refresh event details before placement, cannot place bet")
+                return
             bets_placed = 0
             for market_type, outcome, odds, points, ev, is_first_half, stake in available_markets:
                 try:
@@ -3805,6 +3857,11 @@ class BetEngine(WebsiteOpener):
                         logger.info(f"Bet already placed, skipping: {bet_signature}")
                         continue
                     
+                    current_odds = self.__current_market_odds(event_details, market_type, outcome, points, odds, is_first_half)
+                    if current_odds is None:
+                        continue
+                    odds = current_odds
+                    
                     # Place the bet
                     success = self.__place_bet(event_details, market_type, outcome, odds, modified_shaped_data, is_first_half, stake)
                     if success:
@@ -3835,6 +3892,17 @@ class BetEngine(WebsiteOpener):
                     logger.error(f"Error placing bet on {market_type} - {outcome}: {e}")
                     continue
             
+            # A strong match we actually bet on teaches us how Sportybet names these teams
+            if bets_placed and match_score is not None and match_score >= self.__team_alias_min_score:
+                try:
+                    self.__team_aliases.record_match(home_team, away_team, event_details.get("homeTeam"), event_details.get("awayTeam"))
+                except Exception as e:
+                    logger.error(f"Error recording team aliases: {e}")
+            
+            # Our bets move the odds, so later alerts must not reuse this snapshot
+            if bets_placed:
+                self.__event_details_cache.invalidate(str(event_id))
+            
             # Mark game as processed
             self.__processed_games.add(game_id)
             logger.info(f"Game {game_id} processed. Placed {bets_placed} out of {len(available_markets)} available bets")
@@ -3844,6 +3912,37 @@ class BetEngine(WebsiteOpener):
             # Close browser on error
             self.cleanup()
 
+    def __current_market_odds(self, event_details, market_type, outcome, points, odds, is_first_half=False):
+        """
+        Re-check a market found by the scan against the details fetched just before placement
+        
+        Parameters:
+        - event_details: Freshly fetched event details from sportybet
+        - market_type: Type of bet (money_line, total, spread)
+        - outcome: Outcome to bet on
+        - points: Sportybet points the market was found at (None for money_line)
+        - odds: Odds the market was evaluated at
+        - is_first_half: Whether this is a first half bet
+        
+        Returns:
+        - Current odds, or None if the market is gone or no longer worth the evaluated price
+        """
+        sport_id = (event_details.get("sport") or {}).get("id") or ""
+        bet_code, current_odds, _ = self.__find_market_bet_code_with_points(
+            event_details, market_type, points, outcome, is_first_half, sport_id,
+            event_details.get("homeTeam"), event_details.get("awayTeam")
+        )
+        if bet_code is None or not current_odds:
+            logger.info(f"{market_type} - {outcome} ({points}) is no longer offered, skipping bet")
+            return None
+        if current_odds < odds:
+            logger.info(f"{market_type} - {outcome} ({points}) odds dropped from {odds} to {current_odds}, skipping bet")
+            return None
+        if current_odds > self.__max_pinnacle_odds:
+            logger.info(f"sportybet odds {current_odds:.2f} exceeds maximum allowed {self.__max_pinnacle_odds:.2f}, skipping bet")
+            return None
+        return current_odds
+
     def __find_market_bet_code_with_points(self, event_details, line_type, points, outcome, is_first_half=False, sport_id=1, home_team=None, away_team=None):
         """
         Find the appropriate bet code in the sportybet event details and return the adjusted points value
@@ -3863,99 +3962,14 @@ class BetEngine(WebsiteOpener):
         sport_name = (sport_info.get("name") or "").strip().lower()
         is_basketball = sport_name == "basketball" or sport_id in ("2", "sr:sport:2")
         logger.info(f"Finding market for Game: {home_team} vs {away_team}: {line_type} - {outcome} - {points} - First Half: {is_first_half} - Sport: {'Basketball' if is_basketball else 'Football'}")
-        markets_sp = event_details.get("markets") or []
-        if markets_sp:
-            fh_keys = ("first half", "1st half", "half-time", "halftime", "half time", "fh", "ht")
-            filtered_markets = []
-            for _m in markets_sp:
-                _n = (_m.get("name") or _m.get("desc") or "").strip().lower()
-                _g = (_m.get("group") or "").strip().lower()
-                _t = (_m.get("title") or "").strip().lower()
-                _s = f"{_n} {_g} {_t}"
-                _has_half = any(k in _s for k in fh_keys)
-                if is_first_half and not _has_half:
-                    continue
-                if not is_first_half and _has_half:
-                    continue
-                filtered_markets.append(_m)
-            mn = ("1x2", "match result", "result")
-            tn = ("over/under", "total")
-            hn = ("asian handicap",)
-            dn = ("draw no bet", "dnb")
-            lt = line_type.lower()
-            if lt == "money_line":
-                for m in filtered_markets:
-                    name = (m.get("name")).strip().lower()
-                    if (is_basketball and name == "1x2") or name == "1x2" or (is_first_half and name == "1st half - 1x2"):
-                        mm = {"home": "home", "away": "away", "draw": "draw"}
-                        tgt = mm.get(outcome.lower())
-                        for o in m.get("outcomes", []):
-                            lbl = (o.get("desc") or "").strip().lower()
-                            if lbl == tgt:
-                                odds = o.get("odds") or o.get("value")
-                                return o.get("id"), float(odds), None
-            elif lt == "total":
-                rp = float(points) if points is not None else None
-                for m in filtered_markets:
-                    name = (m.get("name") or "").strip().lower()
-                    # Build exact target names based on sport and period
-                    if is_basketball:
-                        if is_first_half:
-                            target = "1st half - total"
-                        else:
-                            target = "over/under (incl. overtime)"
-                    else:
-                        if is_first_half:
-                            target = "1st half - over/under"
-                        else:
-                            target = "over/under"
-                    if name == target:
-                        for o in m.get("outcomes", []):
-                            txt = (o.get("desc") or "").strip().lower()
-                            mm = re.search(r"(over|under)\s*(\d+\.?\d*)", txt)
-                            if mm:
-                                side = mm.group(1)
-                                pts = float(mm.group(2))
-                                print(f"total points gotten {pts}")
-                                if side == outcome.lower() and rp is not None and abs(pts - rp) < 0.01:
-                                    odds = o.get("odds") or o.get("value")
-                                    return o.get("id"), float(odds), pts
-            elif lt == "spread":
-                # THIS IS DNB
-                if points is not None and abs(float(points)) < 0.01:
-                    for m in filtered_markets:
-                        name = (m.get("desc") or "").strip().lower()
-                        if any(k in name for k in dn):
-                            for o in m.get("outcomes", []):
-                                lbl = (o.get("desc") or "").strip().lower()
-                                if outcome.lower() == lbl:
-                                    odds = o.get("odds") or o.get("value")
-                                    return o.get("id"), float(odds), 0.0
-                else:
-                    rp = float(points) if points is not None else None
-                    for m in filtered_markets:
-                        name = (m.get("desc") or "").strip().lower()
-                        if any(k in name for k in hn):
-                            for o in m.get("outcomes", []):
-                                txt = (o.get("desc") or "").strip().lower()
-                                sd = txt
-                                # if home_team and home_team.lower() in txt:
-                                #     sd = "home"
-                                # elif away_team and away_team.lower() in txt:
-                                #     sd = "away"
-                                mm = re.search(r"([+-]?\d+\.?\d*)", txt)
-                                if sd == outcome.lower() and mm and rp is not None:
-                                    pts = float(mm.group(1))
-                                    print(f"asian handicap points gotten {pts}")
-                                    if abs(pts - rp) < 0.01:
-                                        odds = o.get("odds") or o.get("value")
-                                        return o.get("id"), float(odds), pts
-            logger.info("the market code not found in event details")
-            return None, None, None
-       
-        else:
+        if not event_details.get("markets"):
             logger.info("No markets found in event details")
             return None, None, None
+        # Markets are parsed once per event; every lookup after that is a dict hit
+        bet_code, odds, pts = get_market_index(event_details, self.__strict_market_matching).find(line_type, points, outcome, is_first_half, is_basketball)
+        if bet_code is None and odds is None:
+            logger.info("the market code not found in event details")
+        return bet_code, odds, pts
             
     def __extract_points_from_key(self, key):
         """Extract points value from a bet key"""
@@ -4123,6 +4137,87 @@ class BetEngine(WebsiteOpener):
                 
         return balance_updates
 
+    def get_event_index_stats(self):
+        """
+        Get size, refresh timing and hit counters of the local event index
+        
+        Returns:
+        - Stats dictionary, or None if the index is disabled
+        """
+        return self.__event_index.stats() if self.__event_index else None
+    
+    def stop_event_index(self):
+        """Stop the background Sportybet event indexer"""
+        if self.__event_index:
+            self.__event_index.stop()
+            self.__event_index = None
+    
+    def invalidate_event_mapping(self, pinnacle_event_id):
+        """
+        Forget the cached Sportybet event for a Pinnacle event so the next alert searches again
+        
+        Returns:
+        - True if a mapping was removed
+        """
+        return self.__event_map.invalidate(pinnacle_event_id) if self.__event_map else False
+    
+    def correct_event_mapping(self, pinnacle_event_id, sporty_event_id, pinnacle_start_time=None):
+        """
+        Replace the cached Sportybet event for a Pinnacle event
+        
+        Parameters:
+        - pinnacle_event_id: Pinnacle event ID
+        - sporty_event_id: Correct Sportybet event ID
+        - pinnacle_start_time: Match start time in milliseconds (the mapping expires then)
+        """
+        if self.__event_map:
+            self.__event_map.put(pinnacle_event_id, sporty_event_id, pinnacle_start_time, source="manual")
+    
+    def get_event_mapping_stats(self):
+        """
+        Get size and hit/miss counters of the event mapping cache
+        
+        Returns:
+        - Stats dictionary, or None if the cache is disabled
+        """
+        return self.__event_map.stats() if self.__event_map else None
+    
+    def get_team_alias_stats(self):
+        """
+        Get alias counts and lookup hit/miss counters of the team alias store
+        
+        Returns:
+        - Stats dictionary
+        """
+        return self.__team_aliases.stats()
+    
+    def get_pinnacle_snapshot_stats(self):
+        """
+        Get Pinnacle event snapshot cache counters
+        
+        Returns:
+        - Dictionary with hits, misses, coalesced requests and hit ratio
+        """
+        return self.__pinnacle_snapshots.stats()
+
+    def get_event_details_cache_stats(self):
+        """
+        Get Sportybet event details cache counters
+        
+        Returns:
+        - Dictionary with hits, misses, coalesced requests and hit ratio
+        """
+        return self.__event_details_cache.stats()
+
+    def get_search_cache_stats(self):
+        """
+        Get hit ratio and saved requests of the Sportybet keyword search cache
+        
+        Returns:
+        - Stats dictionary
+        """
+        return self.__search_cache.stats()
+    
     def search_event(self, home_team, away_team, pinnacle_start_time=None):
         """
         Public method to search for an event on sportybet
@@ -6,6 +6,7 @@ import json
 import argparse
 import sys
 from typing import Dict, Any, Optional
+from utils.team_aliases import TeamAliasStore
 
 CONFIG_FILE = "config.json"
 
@@ -276,6 +277,42 @@ def remove_odds_range(range_name: str) -> None:
     save_config(config)
     print(f"Odds range '{range_name}' removed successfully")
 
+def load_alias_store() -> TeamAliasStore:
+    """Open the team alias store configured in config.json"""
+    config = load_config()
+    return TeamAliasStore(path=config.get('team_alias_file', 'team_aliases.json'),
+                          min_count=int(config.get('team_alias_min_count', 2)))
+
+def add_alias(pinnacle_name: str, sporty_name: str) -> None:
+    """Add a manual Pinnacle -> Sportybet team alias"""
+    store = load_alias_store()
+    if not store.add(pinnacle_name, sporty_name):
+        print("Error: Both team names must contain at least one word after normalization")
+        return
+    print(f"Alias '{pinnacle_name}' -> '{sporty_name}' added successfully")
+
+def remove_alias(pinnacle_name: str, sporty_name: Optional[str] = None) -> None:
+    """Remove one alias, or all aliases of a Pinnacle team name"""
+    store = load_alias_store()
+    if not store.remove(pinnacle_name, sporty_name):
+        print(f"Error: No alias found for '{pinnacle_name}'")
+        return
+    print(f"Alias for '{pinnacle_name}' removed successfully")
+
+def list_aliases() -> None:
+    """List all team aliases"""
+    entries = load_alias_store().entries()
+    if not entries:
+        print("No team aliases found")
+        return
+    
+    print("\nTeam Aliases (normalized names):")
+    print("-" * 80)
+    for entry in entries:
+        source = "manual" if entry['manual'] else f"seen {entry['count']}x"
+        trusted = " [used]" if entry['trusted'] else ""
+        print(f"{entry['pinnacle']} -> {entry['sporty']} ({source}){trusted}")
+
 def main():
     parser = argparse.ArgumentParser(description="Betalert Configuration CLI")
     subparsers = parser.add_subparsers(dest='command', help='Available commands')
@@ -343,6 +380,17 @@ def main():
     # Show full config command
     subparsers.add_parser('show-config', help='Show full configuration')
     
+    # Team alias commands
+    add_alias_parser = subparsers.add_parser('add-alias', help='Add a Pinnacle -> Sportybet team name alias')
+    add_alias_parser.add_argument('pinnacle_name', help='Team name as listed on Pinnacle')
+    add_alias_parser.add_argument('sporty_name', help='Team name as listed on Sportybet')
+    
+    remove_alias_parser = subparsers.add_parser('remove-alias', help='Remove a team name alias')
+    remove_alias_parser.add_argument('pinnacle_name', help='Team name as listed on Pinnacle')
+    remove_alias_parser.add_argument('sporty_name', nargs='?', help='Sportybet name to remove (default: all aliases of the team)')
+    
+    subparsers.add_parser('list-aliases', help='List team name aliases')
+    
     args = parser.parse_args()
     
     if not args.command:
@@ -382,6 +430,12 @@ def main():
         show_odds_stakes()
     elif args.command == 'show-config':
         show_config()
+    elif args.command == 'add-alias':
+        add_alias(args.pinnacle_name, args.sporty_name)
+    elif args.command == 'remove-alias':
+        remove_alias(args.pinnacle_name, args.sporty_name)
+    elif args.command == 'list-aliases':
+        list_aliases()
 
 if __name__ == '__main__':
     main() 
\ No newline at end of file
@@ -55,6 +55,18 @@ def main():
                 interval=int(os.getenv("ODDS_CHECK_INTERVAL", "30"))
             )
             
+            # Optional push ingestion; polling keeps running as a catch-up fallback
+            if os.getenv("ODDS_WEBHOOK_PORT"):
+                print("Starting alert webhook receiver...")
+                odds_engine.start_push_receiver(
+                    host=os.getenv("ODDS_WEBHOOK_HOST", "127.0.0.1"),
+                    port=int(os.getenv("ODDS_WEBHOOK_PORT")),
+                    token=os.getenv("ODDS_WEBHOOK_TOKEN")
+                )
+            if os.getenv("ODDS_SSE_URL"):
+                print("Starting SSE alert client...")
+                odds_engine.start_sse_client(os.getenv("ODDS_SSE_URL"))
+            
             # Keep the main thread running to allow the monitoring to continue
             print("BetAlert running. Press Ctrl+C to exit.")
             while True:
@@ -72,6 +84,7 @@ def main():
                 odds_engine.stop()
             
             if bet_engine:
+                bet_engine.stop_event_index()
                 print("Cleaning up browser...")
                 bet_engine.cleanup()
                 
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Pinnacle alerts/events API, for load testing on one box.
+
+Serves the two endpoints the engines use:
+- GET /alerts/{user}?dropNotificationsCursor=..&limitChangeNotificationsCursor=..&openingLineNotificationsCursor=..
+- GET /events/{id}
+plus GET /stats with request counters.
+
+Synthetic alerts are generated at a configurable rate for a pool of fake games,
+and latency/errors can be injected on every request.
+
+# Start on port 8765 with 5 alerts/second, 50ms latency and 2% errors
+python3 mock_pinnacle.py --port 8765 --rate 5 --latency-ms 50 --error-rate 0.02
+
+# Point the engines at it
+export PINNACLE_HOST=http://127.0.0.1:8765 PINNACLE_USER_ID=mock
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from collections import deque
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+from utils.alert_cursors import STREAM_DEFAULT_SEQUENCE, parse_cursor, format_cursor
+
+TEAM_NAMES = [
+    "Arsenal", "Chelsea", "Liverpool", "Manchester United", "Manchester City", "Tottenham Hotspur",
+    "Everton", "Aston Villa", "Newcastle United", "West Ham United", "Real Madrid", "Barcelona",
+    "Atletico Madrid", "Sevilla", "Valencia", "Bayern Munich", "Borussia Dortmund", "RB Leipzig",
+    "Juventus", "Inter Milan", "AC Milan", "Napoli", "AS Roma", "Lazio", "Paris Saint-Germain",
+    "Olympique Marseille", "Lyon", "Ajax", "PSV Eindhoven", "Feyenoord", "Benfica", "Porto",
+]
+BASKETBALL_NAMES = [
+    "Los Angeles Lakers", "Boston Celtics", "Golden State Warriors", "Miami Heat", "Chicago Bulls",
+    "Orlando Magic", "Atlanta Hawks", "Denver Nuggets", "Phoenix Suns", "Milwaukee Bucks",
+]
+
+
+def _price_pair(rng, margin=1.04):
+    """Two decimal prices with a bookmaker margin"""
+    p = rng.uniform(0.3, 0.7)
+    return round(1 / (p * margin), 3), round(1 / ((1 - p) * margin), 3)
+
+
+class MockGame:
+    """A synthetic game with Pinnacle-shaped periods/spreads/totals/money_line"""
+
+    def __init__(self, event_id, sport_id, home, away, starts, rng):
+        self.event_id = event_id
+        self.sport_id = sport_id
+        self.home = home
+        self.away = away
+        self.starts = starts
+        self.periods = {"num_0": self.__build_period(rng, full=True), "num_1": self.__build_period(rng, full=False)}
+
+    def __build_period(self, rng, full):
+        if self.sport_id == 3:
+            base_total = rng.choice([210.5, 220.5, 230.5]) * (1 if full else 0.5)
+            total_lines = [round(base_total + d, 1) for d in (-2, -1, 0, 1, 2)]
+            spread_lines = [round(s * (1 if full else 0.5), 1) for s in (-6.5, -4.5, -2.5, 2.5, 4.5)]
+        else:
+            total_lines = [1.5, 2.5, 3.5] if full else [0.5, 1.5]
+            spread_lines = [-1.5, -1, -0.5, 0, 0.5, 1] if full else [-0.5, 0, 0.5]
+        money_line = {}
+        home, away = _price_pair(rng, margin=1.08 if self.sport_id == 1 else 1.04)
+        money_line["home"], money_line["away"] = home, away
+        if self.sport_id == 1:
+            money_line["draw"] = round(rng.uniform(3.0, 4.2), 3)
+        spreads = {}
+        for hdp in spread_lines:
+            h, a = _price_pair(rng)
+            spreads[str(hdp)] = {"hdp": hdp, "home": h, "away": a}
+        totals = {}
+        for points in total_lines:
+            o, u = _price_pair(rng)
+            totals[str(points)] = {"points": points, "over": o, "under": u}
+        return {"money_line": money_line, "spreads": spreads, "totals": totals}
+
+    def drift(self, rng):
+        """Move prices a little so repeated /events calls see live-looking odds"""
+        for period in self.periods.values():
+            for market in [period["money_line"]] + list(period["spreads"].values()) + list(period["totals"].values()):
+                for key in ("home", "away", "draw", "over", "under"):
+                    if key in market:
+                        market[key] = round(max(1.01, market[key] * rng.uniform(0.98, 1.02)), 3)
+
+    def payload(self):
+        return {
+            "data": {
+                "eventId": self.event_id,
+                "sportId": self.sport_id,
+                "home": self.home,
+                "away": self.away,
+                "starts": self.starts,
+                "periods": self.periods,
+            }
+        }
+
+
+class MockPinnacle:
+    """Alert generator and request handler state"""
+
+    def __init__(self, rate=1.0, games=40, basketball_share=0.25, latency_ms=0, jitter_ms=0,
+                 error_rate=0.0, buffer_size=10000, seed=None):
+        self.rate = rate
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.alerts = {stream: deque(maxlen=buffer_size) for stream in STREAM_DEFAULT_SEQUENCE}
+        self.sequence = 0
+        self.last_ms = 0
+        self.counters = {"alerts_generated": 0, "alerts_requests": 0, "events_requests": 0, "errors_injected": 0}
+        self.games = {}
+        now_ms = int(time.time() * 1000)
+        for i in range(games):
+            is_basketball = self.rng.random() < basketball_share
+            names = BASKETBALL_NAMES if is_basketball else TEAM_NAMES
+            home, away = self.rng.sample(names, 2)
+            event_id = str(1600000000 + i)
+            starts = now_ms + self.rng.randint(15, 24 * 60) * 60 * 1000
+            self.games[event_id] = MockGame(event_id, 3 if is_basketball else 1, home, away, starts, self.rng)
+        self.running = False
+
+    def start(self):
+        self.running = True
+        threading.Thread(target=self.__generate_loop, daemon=True).start()
+
+    def __next_id(self):
+        now_ms = int(time.time() * 1000)
+        if now_ms == self.last_ms:
+            self.sequence += 1
+        else:
+            self.last_ms = now_ms
+            self.sequence = 0
+        return now_ms, f"{now_ms}-{self.sequence}"
+
+    def __generate_loop(self):
+        while self.running:
+            if self.rate <= 0:
+                time.sleep(0.5)
+                continue
+            time.sleep(self.rng.expovariate(self.rate))
+            self.generate_alert()
+
+    def generate_alert(self):
+        with self.lock:
+            game = self.rng.choice(list(self.games.values()))
+            game.drift(self.rng)
+            period_key = self.rng.choice(["num_0", "num_0", "num_1"])
+            period = game.periods[period_key]
+            line_type = self.rng.choice(["money_line", "spread", "total"])
+            alert = {
+                "eventId": game.event_id,
+                "sportId": game.sport_id,
+                "home": game.home,
+                "away": game.away,
+                "starts": game.starts,
+                "type": "prematch",
+                "periodNumber": period_key[-1],
+                "lineType": line_type,
+            }
+            if line_type == "money_line":
+                alert["outcome"] = self.rng.choice(["home", "away"] + (["draw"] if "draw" in period["money_line"] else []))
+                alert.update({f"price{k.capitalize()}": v for k, v in period["money_line"].items()})
+            elif line_type == "spread":
+                line = self.rng.choice(list(period["spreads"].values()))
+                alert["outcome"] = self.rng.choice(["home", "away"])
+                alert["points"] = line["hdp"]
+                alert["priceHome"], alert["priceAway"] = line["home"], line["away"]
+            else:
+                line = self.rng.choice(list(period["totals"].values()))
+                alert["outcome"] = self.rng.choice(["over", "under"])
+                alert["points"] = line["points"]
+                alert["priceOver"], alert["priceUnder"] = line["over"], line["under"]
+            now_ms, alert_id = self.__next_id()
+            alert["id"] = alert_id
+            alert["timestamp"] = now_ms
+            stream = self.rng.choice(list(STREAM_DEFAULT_SEQUENCE))
+            self.alerts[stream].append((parse_cursor(alert_id), alert))
+            self.counters["alerts_generated"] += 1
+            return alert
+
+    def alerts_since(self, cursors):
+        """Alerts newer than the given per-stream cursors, plus the cursor to use next"""
+        data = []
+        next_cursors = {}
+        with self.lock:
+            for stream, entries in self.alerts.items():
+                cursor = cursors.get(stream) or (0, 0)
+                newest = cursor
+                for entry_cursor, alert in entries:
+                    if entry_cursor > cursor:
+                        data.append(alert)
+                        newest = max(newest, entry_cursor)
+                next_cursors[stream] = format_cursor(newest)
+            self.counters["alerts_requests"] += 1
+        data.sort(key=lambda a: parse_cursor(a["id"]))
+        return {"data": data, **next_cursors}
+
+    def event_payload(self, event_id):
+        with self.lock:
+            self.counters["events_requests"] += 1
+            game = self.games.get(event_id)
+            return game.payload() if game else None
+
+    def inject_faults(self):
+        """Sleep for the configured latency; return True if this request should fail"""
+        delay_ms = self.latency_ms + (self.rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0)
+        if delay_ms > 0:
+            time.sleep(delay_ms / 1000)
+        if self.error_rate and self.rng.random() < self.error_rate:
+            with self.lock:
+                self.counters["errors_injected"] += 1
+            return True
+        return False
+
+
+def make_handler(mock):
+    class MockPinnacleHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+
+        def _send_json(self, status, payload):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            parsed = urlparse(self.path)
+            parts = [p for p in parsed.path.split("/") if p]
+            if parts == ["stats"]:
+                with mock.lock:
+                    self._send_json(200, dict(mock.counters))
+                return
+            if mock.inject_faults():
+                self._send_json(500, {"error": "injected failure"})
+                return
+            if len(parts) == 2 and parts[0] == "alerts":
+                query = parse_qs(parsed.query)
+                cursors = {stream: parse_cursor(query[stream][0]) for stream in STREAM_DEFAULT_SEQUENCE if stream in query}
+                self._send_json(200, mock.alerts_since(cursors))
+            elif len(parts) == 2 and parts[0] == "events":
+                payload = mock.event_payload(parts[1])
+                self._send_json(200, payload if payload else {"data": None})
+            else:
+                self._send_json(404, {"error": "not found"})
+
+        def log_message(self, format, *args):
+            pass
+
+    return MockPinnacleHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Pinnacle stand-in server for load testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--rate", type=float, default=1.0, help="Synthetic alerts per second")
+    parser.add_argument("--games", type=int, default=40, help="Number of synthetic games")
+    parser.add_argument("--basketball-share", type=float, default=0.25, help="Fraction of games that are basketball")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Latency added to every request")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="Random +/- jitter on the latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with HTTP 500")
+    parser.add_argument("--seed", type=int, help="Random seed for repeatable runs")
+    args = parser.parse_args()
+
+    mock = MockPinnacle(rate=args.rate, games=args.games, basketball_share=args.basketball_share,
+                        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                        error_rate=args.error_rate, seed=args.seed)
+    mock.start()
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(mock))
+    print(f"Mock Pinnacle listening on http://{args.host}:{args.port} ({args.rate} alerts/s, {args.games} games)")
+    print(f"export PINNACLE_HOST=http://{args.host}:{args.port} PINNACLE_USER_ID=mock")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down mock Pinnacle...")
+    finally:
+        mock.running = False
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -5,7 +5,18 @@ import requests
 import json
 import threading
 import logging
+import asyncio
+import hmac
+import ipaddress
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 from datetime import datetime, timedelta
+from utils.alert_cursors import AlertCursorStore
+from utils.ttl_dedup import TTLDedupStore
+from utils.delay_queue import DelayQueue
+from utils.keyed_executor import KeyedExecutor
+from utils.alert_filters import compile_alert_filters
 
 # # Set up logging for odds engine
 # def setup_odds_logging():
@@ -72,43 +83,119 @@ class OddsEngine:
     there are potential value betting opportunities.
     """
     
-    def __init__(self, bet_engine=None, pinnacle_host=None, pinnacle_api_host=None):
+    def __init__(self, bet_engine=None, pinnacle_host=None, pinnacle_api_host=None, cursor_mode=None, cursor_file=None, user_id=None, config_file="config.json"):
+        """
+        Initialize OddsEngine
+        
+        Parameters:
+        - bet_engine: Engine that receives shaped alerts (defaults to a logging stub)
+        - pinnacle_host: Pinnacle alerts/events host
+        - pinnacle_api_host: Unused, kept for backwards compatibility
+        - cursor_mode: Poll only alerts newer than the last stored cursor instead of a fixed lookback window
+        - cursor_file: Path where the notification cursors are persisted in cursor mode
+        - user_id: Pinnacle user ID (defaults to PINNACLE_USER_ID)
+        - config_file: Config file holding the "alert_filters" section
+        """
         self.bet_engine = bet_engine if bet_engine else BetEngine()
         self.__host = pinnacle_host or os.getenv("PINNACLE_HOST")
-        self.__user_id = os.getenv("PINNACLE_USER_ID")
+        self.__user_id = user_id or os.getenv("PINNACLE_USER_ID")
         self.__last_processed_timestamp = int(time.time()) * 1000  # Convert to milliseconds
-        self.__processed_alerts = set()  # Keep track of processed alert IDs
-        self.__processed_event_line_types = set()  # Track event ID + line type combinations
-        self.__processed_alerts_ids = set()  # Track alert IDs directly
+        # Ordered dedup stores; keys expire once the match has started
+        self.__processed_alerts = TTLDedupStore(max_size=1000, name="events")  # Keep track of processed event IDs
+        self.__processed_event_line_types = TTLDedupStore(max_size=2000, name="event_line_types")  # Track event ID + line type combinations
+        self.__processed_alerts_ids = TTLDedupStore(max_size=3000, name="alert_ids")  # Track alert IDs directly
         self.__running = False
         self.__monitor_thread = None
+        self.__monitor_mode = "threaded"
+        
+        # Young alerts wait here until they are old enough instead of blocking the batch
+        self.__maturity_queue = DelayQueue(name="alert-maturity")
+        self.__process_lock = threading.Lock()
+        
+        # Cheap pre-filters compiled once from config.json; rejected alerts never reach the bet engine
+        self.__alert_filter = compile_alert_filters(self.__load_alert_filter_settings(config_file))
+        
+        # Push ingestion (webhook receiver / SSE client) state
+        self.__push_server = None
+        self.__sse_running = False
+        self.__sse_thread = None
+        
+        # Alerts for the same game are coalesced into one work item per poll batch,
+        # or per ODDS_COALESCE_WINDOW seconds when a window is configured
+        self.__coalesce_window = float(os.getenv("ODDS_COALESCE_WINDOW", "0"))
+        self.__pending_games = {}
+        self.__pending_lock = threading.Lock()
+        # Without a window, deferred (young or pushed) alerts released close together share one flush
+        self.__deferred_flush_delay = float(os.getenv("ODDS_DEFERRED_FLUSH_DELAY", "0.25"))
+        self.__deferred_flush_scheduled = False
+        self.__coalesced_alerts = 0
+        
+        # Bounded dispatch to the bet engine: one task at a time per event, events in parallel
+        self.__dispatch_executor = KeyedExecutor(
+            max_workers=int(os.getenv("ODDS_DISPATCH_WORKERS", "4")),
+            name="bet-dispatch",
+            merge=self.__merge_pending_notify
+        )
+        
+        # Persistent keep-alive session so polls reuse the same TLS connection
+        self.__request_timeout = float(os.getenv("ODDS_REQUEST_TIMEOUT", "10"))
+        # How much longer than the request timeout the async loop waits for a poll
+        self.__fetch_timeout_grace = 5.0
+        self.__session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=2)
+        self.__session.mount("http://", adapter)
+        self.__session.mount("https://", adapter)
+        self.__session.headers.update({"Connection": "keep-alive"})
+        
+        # Incremental polling: remember the last cursor per notification stream
+        if cursor_mode is None:
+            cursor_mode = os.getenv("ODDS_CURSOR_MODE", "false").lower() in ("1", "true", "yes")
+        self.__cursor_store = None
+        if cursor_mode:
+            self.__cursor_store = AlertCursorStore(
+                path=cursor_file or os.getenv("ODDS_CURSOR_FILE", "alert_cursors.json"),
+                seeds={
+                    "limitChangeNotificationsCursor": os.getenv("LIMITCHANGENOTIFICATIONCURSOR"),
+                    "openingLineNotificationsCursor": os.getenv("OPENLINENOTIFICATIONCURSOR"),
+                }
+            )
+            logger.info(f"Cursor mode enabled, resuming from: {self.__cursor_store.snapshot() or 'lookback window'}")
         
         # Validate required environment variables
         if not self.__host or not self.__user_id:
             raise ValueError("Pinnacle host, API host, or user ID not found in environment variables")
     
-    def start_monitoring(self, interval=30):
+    def start_monitoring(self, interval=30, mode=None):
         """
         Start monitoring for new odds alerts in a separate thread
         
         Parameters:
         - interval: Time in seconds between checks for new alerts
+        - mode: "threaded" (blocking poll loop) or "async" (asyncio loop that overlaps
+          processing of one batch with the fetch of the next). Defaults to ODDS_ENGINE_MODE.
         """
         if self.__running:
             logger.warning("Monitoring already running")
             return
+        
+        mode = (mode or os.getenv("ODDS_ENGINE_MODE", "threaded")).lower()
+        if mode not in ("threaded", "async"):
+            logger.warning(f"Unknown monitoring mode '{mode}', falling back to threaded")
+            mode = "threaded"
+        self.__monitor_mode = mode
             
         self.__running = True
         self.__monitor_thread = threading.Thread(
-            target=self.__monitoring_loop,
+            target=self.__async_monitoring_entry if mode == "async" else self.__monitoring_loop,
             args=(interval,),
             daemon=True
         )
         self.__monitor_thread.start()
-        logger.info(f"Started odds monitoring thread with interval of {interval} seconds")
+        logger.info(f"Started odds monitoring thread ({mode}) with interval of {interval} seconds")
         
     def stop(self):
-        """Stop the monitoring thread"""
+        """Stop the monitoring thread and any push receivers"""
+        self.__stop_push_ingestion()
         if not self.__running:
             logger.warning("Monitoring not running")
             return
@@ -117,8 +204,179 @@ class OddsEngine:
         self.__running = False
         if self.__monitor_thread and self.__monitor_thread.is_alive():
             self.__monitor_thread.join(timeout=5)
+        self.__maturity_queue.stop()
+        self.__dispatch_executor.shutdown(wait=False)
+        self.__session.close()
         logger.info("Odds monitoring stopped")
         
+    def start_push_receiver(self, host="127.0.0.1", port=8099, path="/alerts", token=None, max_body_bytes=1024 * 1024):
+        """
+        Start a local HTTP webhook that accepts pushed alerts
+        
+        POST a single alert, a list of alerts or {"data": [...]} as JSON to the path.
+        Pushed alerts go through the same maturity, dedup and dispatch path as polled ones,
+        so polling can keep running as a catch-up fallback.
+        
+        Parameters:
+        - host: Interface to bind (loopback by default)
+        - port: Port to listen on
+        - path: URL path that accepts alerts
+        - token: Shared secret expected in the X-Webhook-Token header; required unless bound to loopback
+        - max_body_bytes: Larger requests are rejected with 413 without being read
+        """
+        if self.__push_server:
+            logger.warning("Push receiver already running")
+            return
+        # Pushed alerts can lead to real bets, so only loopback may go unauthenticated
+        if not token and not self.__is_loopback_host(host):
+            raise ValueError(f"Refusing to bind the alert webhook to {host} without a token (set ODDS_WEBHOOK_TOKEN)")
+        
+        engine = self
+        extract_alerts = self.__extract_pushed_alerts
+        
+        class AlertWebhookHandler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                if self.path.split("?")[0] != path:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                if token and not hmac.compare_digest((self.headers.get("X-Webhook-Token") or "").encode(), token.encode()):
+                    self.send_response(401)
+                    self.end_headers()
+                    return
+                try:
+                    length = int(self.headers.get("Content-Length", 0))
+                except (ValueError, TypeError):
+                    length = -1
+                if length < 0 or length > max_body_bytes:
+                    self.send_response(413 if length > max_body_bytes else 400)
+                    self.send_header("Connection", "close")
+                    self.end_headers()
+                    self.close_connection = True
+                    return
+                try:
+                    payload = json.loads(self.rfile.read(length) or b"null")
+                except (ValueError, TypeError):
+                    self.send_response(400)
+                    self.end_headers()
+                    return
+                alerts = extract_alerts(payload)
+                # Acknowledge first so the sender isn't held up by processing
+                self.send_response(202)
+                self.end_headers()
+                if alerts:
+                    logger.info(f"Received {len(alerts)} pushed alerts via webhook")
+                    engine.ingest_alerts(alerts, payload)
+            
+            def log_message(self, format, *args):
+                pass
+        
+        self.__push_server = ThreadingHTTPServer((host, port), AlertWebhookHandler)
+        self.__push_server.daemon_threads = True
+        threading.Thread(target=self.__push_server.serve_forever, daemon=True).start()
+        logger.info(f"Alert webhook listening on http://{host}:{port}{path}")
+    
+    @staticmethod
+    def __is_loopback_host(host):
+        if host == "localhost":
+            return True
+        try:
+            return ipaddress.ip_address(host).is_loopback
+        except ValueError:
+            return False
+    
+    def start_sse_client(self, url, reconnect_delay=2):
+        """
+        Subscribe to a server-sent events stream of alerts
+        
+        Each event's data must be a JSON alert, list of alerts or {"data": [...]}.
+        The client reconnects with backoff and resumes with Last-Event-ID when the server sends ids.
+        
+        Parameters:
+        - url: SSE endpoint URL
+        - reconnect_delay: Initial delay in seconds before reconnecting after a failure
+        """
+        if self.__sse_running:
+            logger.warning("SSE client already running")
+            return
+        self.__sse_running = True
+        self.__sse_thread = threading.Thread(target=self.__sse_loop, args=(url, reconnect_delay), daemon=True)
+        self.__sse_thread.start()
+        logger.info(f"Started SSE alert client for {url}")
+    
+    def __sse_loop(self, url, reconnect_delay):
+        """Read the SSE stream and ingest alerts until stopped"""
+        last_event_id = None
+        delay = reconnect_delay
+        while self.__sse_running:
+            try:
+                headers = {"Accept": "text/event-stream", "Cache-Control": "no-cache"}
+                if last_event_id:
+                    headers["Last-Event-ID"] = last_event_id
+                with requests.get(url, headers=headers, stream=True, timeout=(self.__request_timeout, 90)) as response:
+                    if response.status_code != 200:
+                        raise RuntimeError(f"HTTP {response.status_code}")
+                    logger.info("SSE alert stream connected")
+                    delay = reconnect_delay
+                    data_lines = []
+                    for raw_line in response.iter_lines(chunk_size=None, decode_unicode=True):
+                        if not self.__sse_running:
+                            return
+                        line = raw_line or ""
+                        if not line:
+                            # Blank line ends an event
+                            if data_lines:
+                                self.__ingest_sse_event("\n".join(data_lines))
+                                data_lines = []
+                            continue
+                        if line.startswith(":"):
+                            continue  # comment / keep-alive
+                        field, _, value = line.partition(":")
+                        value = value[1:] if value.startswith(" ") else value
+                        if field == "data":
+                            data_lines.append(value)
+                        elif field == "id":
+                            last_event_id = value
+            except Exception as e:
+                if not self.__sse_running:
+                    return
+                logger.error(f"SSE alert stream error: {e}. Reconnecting in {delay} seconds")
+                time.sleep(delay)
+                delay = min(delay * 2, 60)
+    
+    def __ingest_sse_event(self, data):
+        """Parse one SSE event payload and ingest its alerts"""
+        try:
+            payload = json.loads(data)
+        except ValueError:
+            logger.warning(f"Ignoring non-JSON SSE event: {data[:200]}")
+            return
+        alerts = self.__extract_pushed_alerts(payload)
+        if alerts:
+            logger.info(f"Received {len(alerts)} pushed alerts via SSE")
+            self.ingest_alerts(alerts, payload)
+    
+    def __extract_pushed_alerts(self, payload):
+        """Normalize a pushed payload (alert, list of alerts or {"data": [...]}) to a list of alerts"""
+        if isinstance(payload, dict) and isinstance(payload.get("data"), list):
+            return [a for a in payload["data"] if isinstance(a, dict)]
+        if isinstance(payload, dict) and "eventId" in payload:
+            return [payload]
+        if isinstance(payload, list):
+            return [a for a in payload if isinstance(a, dict)]
+        return []
+    
+    def __stop_push_ingestion(self):
+        """Stop the webhook receiver and SSE client if they are running"""
+        if self.__push_server:
+            self.__push_server.shutdown()
+            self.__push_server.server_close()
+            self.__push_server = None
+            logger.info("Alert webhook stopped")
+        if self.__sse_running:
+            self.__sse_running = False
+            logger.info("SSE alert client stopped")
+        
     def __monitoring_loop(self, interval):
         """Main monitoring loop that runs in a separate thread"""
         logger.info(f"Starting odds monitoring with interval of {interval} seconds")
@@ -131,45 +389,185 @@ class OddsEngine:
             except Exception as e:
                 logger.error(f"Error in monitoring loop: {e}")
                 time.sleep(interval)
+    
+    def __async_monitoring_entry(self, interval):
+        """Run the asyncio ingestion loop in the monitor thread, falling back to the threaded loop on failure"""
+        try:
+            asyncio.run(self.__async_monitoring_loop(interval))
+        except Exception as e:
+            logger.error(f"Async monitoring loop failed, falling back to threaded mode: {e}")
+            self.__monitor_mode = "threaded"
+            if self.__running:
+                self.__monitoring_loop(interval)
+    
+    async def __async_monitoring_loop(self, interval):
+        """
+        Asyncio ingestion loop.
+        
+        The fetch of batch N+1 runs while batch N is still being parsed and dispatched.
+        Batches are still handled strictly in order: batch N must finish before N+1 starts.
+        The interval is measured from the start of each poll, so slow fetches don't add up.
+        A poll that outlives its timeout is not dropped: it keeps running and its batch is
+        taken on the next iteration, since it may already have moved the in-memory cursors.
+        """
+        logger.info(f"Starting async odds monitoring with interval of {interval} seconds")
+        loop = asyncio.get_running_loop()
+        fetch_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="odds-fetch")
+        process_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="odds-process")
+        processing = None
+        fetch = None
+        
+        try:
+            while self.__running:
+                started = loop.time()
+                if fetch is None:
+                    fetch = loop.run_in_executor(fetch_executor, self.__fetch_alerts)
+                try:
+                    # shield: a timeout must not discard the fetch, only stop waiting for it
+                    batch = await asyncio.wait_for(
+                        asyncio.shield(fetch),
+                        timeout=self.__request_timeout + self.__fetch_timeout_grace
+                    )
+                    fetch = None
+                except asyncio.TimeoutError:
+                    logger.error("Timed out fetching odds alerts; taking the batch on the next poll")
+                    batch = None
+                except Exception as e:
+                    logger.error(f"Error in async monitoring loop: {e}")
+                    fetch = None
+                    batch = None
+                
+                if processing is not None:
+                    try:
+                        await processing
+                    except Exception as e:
+                        logger.error(f"Error processing alert batch: {e}")
+                    processing = None
+                
+                if batch:
+                    processing = loop.run_in_executor(process_executor, self.__handle_alerts, *batch)
+                
+                elapsed = loop.time() - started
+                await asyncio.sleep(max(0.0, interval - elapsed))
+            
+            if processing is not None:
+                await processing
+        finally:
+            fetch_executor.shutdown(wait=False)
+            process_executor.shutdown(wait=False)
+            logger.info("Async odds monitoring loop exited")
                 
     def get_odds(self):
         """
         Fetch new odds alerts from Pinnacle and process them
         """
+        batch = self.__fetch_alerts()
+        if batch:
+            self.__handle_alerts(*batch)
+    
+    def __fetch_alerts(self):
+        """
+        Fetch the next batch of alerts from Pinnacle over the persistent session
+        
+        Returns:
+        - Tuple of (payload, alerts) or None if there is nothing to process
+        """
         current_time = int(time.time() * 1000)
-        # Look back 10 minutes for alerts
-        lookback_time = current_time - (60 * 2 * 1000)
-        # lookback_time = 1747423479000
+        
+        if self.__cursor_store:
+            params = self.__cursor_store.query_params(current_time)
+            logger.info(f"Polling alerts newer than cursors: {params}")
+            url = f"{self.__host}/alerts/{self.__user_id}?" + "&".join(f"{k}={v}" for k, v in params.items())
+        else:
+            # Look back 2 minutes for alerts
+            lookback_time = current_time - (60 * 2 * 1000)
+            # lookback_time = 1747423479000
 
-        logger.info(f"Looking back {lookback_time} milliseconds")
+            logger.info(f"Looking back {lookback_time} milliseconds")
+            url = f"{self.__host}/alerts/{self.__user_id}?dropNotificationsCursor={lookback_time}-0&limitChangeNotificationsCursor={os.getenv('LIMITCHANGENOTIFICATIONCURSOR', lookback_time)}-0&openingLineNotificationsCursor={os.getenv('OPENLINENOTIFICATIONCURSOR', lookback_time)}-1"
         
         try:
-            response = requests.get(
-                f"{self.__host}/alerts/{self.__user_id}?dropNotificationsCursor={lookback_time}-0&limitChangeNotificationsCursor={os.getenv('LIMITCHANGENOTIFICATIONCURSOR', lookback_time)}-0&openingLineNotificationsCursor={os.getenv('OPENLINENOTIFICATIONCURSOR', lookback_time)}-1"
-            )
+            response = self.__session.get(url, timeout=self.__request_timeout)
             
             if response.status_code != 200:
                 logger.error(f"Error fetching odds: HTTP {response.status_code}")
-                return
+                return None
                 
             data = response.json()
             if "data" not in data or not data["data"]:
                 logger.info("No new alerts")
-                return
+                self.__advance_cursors(data, [])
+                return None
                 
             logger.info(f"Retrieved {len(data['data'])} alerts")
             
+            # Advance cursors now so an overlapping fetch doesn't ask for this batch again
+            self.__advance_cursors(data, data["data"], persist=False)
+            return data, data["data"]
+                
+        except Exception as e:
+            logger.error(f"Error fetching odds: {e}")
+            return None
+    
+    def ingest_alerts(self, alerts, payload=None):
+        """
+        Process a batch of alerts that did not come from polling (replayed or pushed alerts)
+        
+        The batch goes through the same maturity delay, dedup, coalescing and dispatch
+        as polled alerts, but does not move the poll cursors.
+        
+        Parameters:
+        - alerts: List of raw Pinnacle alerts
+        - payload: Optional raw payload the alerts came from
+        """
+        if not alerts:
+            return
+        self.__handle_alerts(payload or {}, alerts, advance_cursors=False)
+    
+    def __handle_alerts(self, payload, alerts, advance_cursors=True):
+        """
+        Process a batch of alerts returned by a poll
+        
+        Parameters:
+        - payload: The raw poll response
+        - alerts: The alerts contained in the response
+        - advance_cursors: Whether the batch should move the poll cursors
+        """
+        try:
             # Process each alert
-            for alert in data["data"]:
+            for alert in alerts:
                 # Log alert timestamp
                 alert_timestamp = int(alert.get("timestamp", 0))
                 alert_time_str = time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(alert_timestamp/1000))
                 logger.info(f"Processing alert with timestamp: {alert_time_str}")
                 
                 self.__process_alert(alert)
-                
         except Exception as e:
-            logger.error(f"Error fetching odds: {e}")
+            logger.error(f"Error processing alerts: {e}")
+        finally:
+            if self.__coalesce_window <= 0:
+                self.__flush_pending_games()
+            if advance_cursors:
+                self.__advance_cursors(payload, alerts)
+    
+    def __advance_cursors(self, payload, alerts, persist=True):
+        """
+        Move the stored notification cursors past the alerts we just handled (cursor mode only)
+        
+        Parameters:
+        - payload: The raw poll response
+        - alerts: The alerts contained in the response
+        - persist: Whether to write the cursors to disk
+        """
+        if not self.__cursor_store:
+            return
+        try:
+            if self.__cursor_store.update_from_response(payload, alerts):
+                logger.info(f"Advanced alert cursors to: {self.__cursor_store.snapshot()}")
+            if persist:
+                self.__cursor_store.save()
+        except Exception as e:
+            logger.error(f"Error saving alert cursors: {e}")
     
     def __process_alert(self, alert):
         """
@@ -178,136 +576,167 @@ class OddsEngine:
         Parameters:
         - alert: The alert data from Pinnacle
         """
-        # Check if the alert timestamp is less than a minute ago
+        # Check if the alert timestamp is less than a second ago
         alert_timestamp = int(alert.get("timestamp", 0))
         current_time = int(time.time() * 1000)  # Current time in milliseconds
         time_diff_ms = current_time - alert_timestamp
         
-        # If alert is less than 1 second old, wait until it's 1 second old
+        # If alert is less than 1 second old, hold it until it's 1 second old without
+        # blocking the alerts queued behind it in the same batch
         if time_diff_ms < 1000:  # 1000 ms = 1 second
             wait_time_seconds = (1000 - time_diff_ms) / 1000
-            logger.info(f"Alert is only {time_diff_ms/1000:.1f} seconds old. Waiting {wait_time_seconds:.1f} seconds before processing.")
-            time.sleep(wait_time_seconds)
-            logger.info("Resuming alert processing after wait period.")
+            logger.info(f"Alert is only {time_diff_ms/1000:.1f} seconds old. Deferring it {wait_time_seconds:.1f} seconds before processing.")
+            self.__maturity_queue.schedule((alert_timestamp + 1000) / 1000, self.__process_deferred_alert, alert)
+            return
         
-        # Get alert identifiers
-        alert_id = alert.get("eventId", "")
-        line_type = alert.get("lineType", "")
-        alert_direct_id = alert.get("id", "")  # Get the direct alert ID
+        self.__process_mature_alert(alert)
+    
+    def __process_deferred_alert(self, alert):
+        """
+        Process an alert released by the maturity queue
         
-        # Create a unique key for this event + line type combination
-        event_line_key = f"{alert_id}_{line_type}"
+        Parameters:
+        - alert: The alert data from Pinnacle
+        """
+        self.__process_mature_alert(alert)
+        # Deferred alerts are not part of a poll batch; without a window, everything released
+        # within the short flush delay is dispatched as one batch
+        if self.__coalesce_window <= 0:
+            with self.__pending_lock:
+                if self.__deferred_flush_scheduled:
+                    return
+                self.__deferred_flush_scheduled = True
+            self.__maturity_queue.schedule(time.time() + self.__deferred_flush_delay, self.__flush_deferred_games)
+    
+    def __flush_deferred_games(self):
+        """Flush the games collected from deferred alerts since the last deferred flush"""
+        with self.__pending_lock:
+            self.__deferred_flush_scheduled = False
+        self.__flush_pending_games()
+    
+    def __process_mature_alert(self, alert):
+        """
+        Dedup, filter and dispatch an alert that is at least 1 second old
         
-        # Skip if we've already processed this alert ID
-        if alert_direct_id and alert_direct_id in self.__processed_alerts_ids:
-            logger.info(f"Skipping already processed alert ID: {alert_direct_id}")
-            return
+        Runs on the monitor thread or the maturity queue thread, so it is serialized
+        with a lock to keep the dedup check and the mark atomic.
         
-        # Skip if we've already processed this event + line type combination
-        if event_line_key in self.__processed_event_line_types:
-            logger.info(f"Skipping already processed event + line type: {event_line_key}")
-            return
-            
-        # Skip alerts with "(Corners)" in team names
-        home_team = alert.get("home", "")
-        away_team = alert.get("away", "")
-        if "(Corners)" in home_team or "(Corners)" in away_team:
-            logger.info(f"Skipping corners market: {home_team} vs {away_team}")
-            self.__processed_alerts.add(alert_id)
-            self.__processed_event_line_types.add(event_line_key)
-            if alert_direct_id:
-                self.__processed_alerts_ids.add(alert_direct_id)
-                logger.info(f"Added alert ID {alert_direct_id} to processed_alerts_ids")
-            self.__last_processed_timestamp = max(self.__last_processed_timestamp, int(alert.get("timestamp", 0)))
-            
-            # Limit the size of processed alerts set to prevent memory growth
-            if len(self.__processed_alerts) > 1000:
-                self.__processed_alerts = set(list(self.__processed_alerts)[-1000:])
-                
-            # Also limit the event + line type combinations set
-            if len(self.__processed_event_line_types) > 2000:
-                self.__processed_event_line_types = set(list(self.__processed_event_line_types)[-2000:])
-                
-            # Limit the size of processed alerts IDs set
-            if len(self.__processed_alerts_ids) > 3000:
-                self.__processed_alerts_ids = set(list(self.__processed_alerts_ids)[-3000:])
-            return
+        Parameters:
+        - alert: The alert data from Pinnacle
+        """
+        with self.__process_lock:
+            # Get alert identifiers
+            alert_id = alert.get("eventId", "")
+            line_type = alert.get("lineType", "")
+            alert_direct_id = alert.get("id", "")  # Get the direct alert ID
+        
+            # Create a unique key for this event + line type combination
+            event_line_key = f"{alert_id}_{line_type}"
+        
+            # Skip if we've already processed this alert ID
+            if alert_direct_id and alert_direct_id in self.__processed_alerts_ids:
+                logger.info(f"Skipping already processed alert ID: {alert_direct_id}")
+                return
         
-        # Skip alerts for matches that have already started (with timezone awareness)
-        current_time_ms = int(time.time() * 1000)  # Current time in UTC/GMT
-        match_start_time = int(alert.get("starts", 0))  # Pinnacle time is in UTC/GMT
-        
-        # Add a small buffer (5 minutes) to account for possible delays
-        buffer_ms = 5 * 60 * 1000
-        
-        if match_start_time <= current_time_ms:
-            match_start_datetime = time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(match_start_time/1000))
-            current_datetime = time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(current_time_ms/1000))
-            logger.info(f"Skipping alert for match that already started: {home_team} vs {away_team}")
-            logger.info(f"Match start time (GMT): {match_start_datetime}, Current time (GMT): {current_datetime}")
-            self.__processed_alerts.add(alert_id)
-            self.__processed_event_line_types.add(event_line_key)
-            if alert_direct_id:
-                self.__processed_alerts_ids.add(alert_direct_id)
-                logger.info(f"Added alert ID {alert_direct_id} to processed_alerts_ids")
-            self.__last_processed_timestamp = max(self.__last_processed_timestamp, int(alert.get("timestamp", 0)))
+            # Skip if we've already processed this event + line type combination
+            if event_line_key in self.__processed_event_line_types:
+                logger.info(f"Skipping already processed event + line type: {event_line_key}")
+                return
             
-            # Limit the size of processed alerts set to prevent memory growth
-            if len(self.__processed_alerts) > 1000:
-                self.__processed_alerts = set(list(self.__processed_alerts)[-1000:])
-                
-            # Also limit the event + line type combinations set
-            if len(self.__processed_event_line_types) > 2000:
-                self.__processed_event_line_types = set(list(self.__processed_event_line_types)[-2000:])
-                
-            # Limit the size of processed alerts IDs set
-            if len(self.__processed_alerts_ids) > 3000:
-                self.__processed_alerts_ids = set(list(self.__processed_alerts_ids)[-3000:])
-            return
+            # Run the compiled pre-filters (corners, started matches, sport/league/odds limits)
+            rejected_by = self.__alert_filter.check(alert)
+            if rejected_by:
+                logger.info(f"Skipping alert ({rejected_by}): {alert.get('home', '')} vs {alert.get('away', '')}")
+                # Time/price rejections may not hold for the next alert on this line, so only the alert itself is recorded
+                self.__mark_processed(alert, event_line_key, record_alert_id=True,
+                                      record_event_line=not self.__alert_filter.is_transient(rejected_by))
+                return
             
-        # Shape the data for the bet engine
-        shaped_data = self.__shape_alert_data(alert)
+            # Shape the data for the bet engine
+            shaped_data = self.__shape_alert_data(alert)
         
-        # Send to bet engine if valid
-        if shaped_data:
-            logger.info(f"Sending alert to bet engine: {shaped_data['game']['home']} vs {shaped_data['game']['away']} - {shaped_data['category']['type']}")
-            bet_processed = self.__notify_bet_engine(shaped_data)
+            # Send to bet engine if valid
+            if shaped_data:
+                logger.info(f"Sending alert to bet engine: {shaped_data['game']['home']} vs {shaped_data['game']['away']} - {shaped_data['category']['type']}")
+                bet_processed = self.__queue_game_for_dispatch(shaped_data)
             
-            # Only add to processed collections if bet was successfully processed
-            if bet_processed:
-                logger.info(f"Bet was successfully processed, adding to processed collections")
-                self.__processed_alerts.add(alert_id)
-                self.__processed_event_line_types.add(event_line_key)
-                self.__last_processed_timestamp = max(self.__last_processed_timestamp, int(alert.get("timestamp", 0)))
-                
-                # Limit the size of processed alerts set to prevent memory growth
-                if len(self.__processed_alerts) > 1000:
-                    self.__processed_alerts = set(list(self.__processed_alerts)[-1000:])
-                    
-                # Also limit the event + line type combinations set
-                if len(self.__processed_event_line_types) > 2000:
-                    self.__processed_event_line_types = set(list(self.__processed_event_line_types)[-2000:])
+                # Only add to processed collections if bet was successfully processed
+                if bet_processed:
+                    logger.info(f"Bet was successfully processed, adding to processed collections")
+                    self.__mark_processed(alert, event_line_key, record_alert_id=False)
+                else:
+                    self.__mark_processed(alert, event_line_key, record_alert_id=True)
+                    logger.info(f"Bet was not successfully processed, still adding to processed collections")
             else:
-                if alert_direct_id:
-                    self.__processed_alerts_ids.add(alert_direct_id)
-                    logger.info(f"Added alert ID {alert_direct_id} to processed_alerts_ids")
-                 # Limit the size of processed alerts IDs set
-                if len(self.__processed_alerts_ids) > 3000:
-                    self.__processed_alerts_ids = set(list(self.__processed_alerts_ids)[-3000:])
-                self.__processed_alerts.add(alert_id)
-                self.__processed_event_line_types.add(event_line_key)
-                self.__last_processed_timestamp = max(self.__last_processed_timestamp, int(alert.get("timestamp", 0)))
-                
-                # Limit the size of processed alerts set to prevent memory growth
-                if len(self.__processed_alerts) > 1000:
-                    self.__processed_alerts = set(list(self.__processed_alerts)[-1000:])
-                    
-                # Also limit the event + line type combinations set
-                if len(self.__processed_event_line_types) > 2000:
-                    self.__processed_event_line_types = set(list(self.__processed_event_line_types)[-2000:])
-                logger.info(f"Bet was not successfully processed, still adding to processed collections")
-        else:
-            logger.info(f"Invalid shaped data for alert, not adding to processed collections")
+                logger.info(f"Invalid shaped data for alert, not adding to processed collections")
+    
+    def __mark_processed(self, alert, event_line_key, record_alert_id=True, record_event_line=True):
+        """
+        Record an alert in the dedup stores
+        
+        Keys expire when the match starts (alerts for started matches are skipped anyway),
+        with a short floor so alerts for already-started matches are not re-logged every poll.
+        
+        Parameters:
+        - alert: The raw alert data from Pinnacle
+        - event_line_key: The event ID + line type key
+        - record_alert_id: Whether to also record the alert's own ID
+        - record_event_line: Whether to record the event and event + line type keys
+        """
+        now = time.time()
+        try:
+            starts_s = int(alert.get("starts", 0)) / 1000
+        except (TypeError, ValueError):
+            starts_s = 0
+        expires_at = max(starts_s, now + 5 * 60) if starts_s else None
+        
+        alert_id = alert.get("eventId", "")
+        alert_direct_id = alert.get("id", "")
+        if record_event_line:
+            self.__processed_alerts.add(alert_id, expires_at)
+            self.__processed_event_line_types.add(event_line_key, expires_at)
+        if record_alert_id and alert_direct_id:
+            self.__processed_alerts_ids.add(alert_direct_id, expires_at)
+            logger.info(f"Added alert ID {alert_direct_id} to processed_alerts_ids")
+        self.__last_processed_timestamp = max(self.__last_processed_timestamp, int(alert.get("timestamp", 0)))
+    
+    def get_dedup_stats(self):
+        """
+        Get hit/miss counters for the processed-alert dedup stores
+        
+        Returns:
+        - List of stats dictionaries, one per store
+        """
+        return [
+            self.__processed_alerts_ids.stats(),
+            self.__processed_event_line_types.stats(),
+            self.__processed_alerts.stats(),
+        ]
+    
+    def get_filter_stats(self):
+        """
+        Get how many alerts each pre-filter rule rejected
+        
+        Returns:
+        - Dictionary with checked/rejected totals and per-rule rejection counts
+        """
+        return self.__alert_filter.stats()
+    
+    def __load_alert_filter_settings(self, config_file):
+        """
+        Read the "alert_filters" section from the config file
+        
+        Returns:
+        - The section as a dictionary, or None to use the default filters
+        """
+        if not config_file or not os.path.exists(config_file):
+            return None
+        try:
+            with open(config_file, "r") as f:
+                return json.load(f).get("alert_filters")
+        except Exception as e:
+            logger.error(f"Error loading alert filters from {config_file}: {e}")
+            return None
     
     def __shape_alert_data(self, alert):
         """
@@ -389,6 +818,58 @@ class OddsEngine:
             
         return shaped_data
     
+    def __queue_game_for_dispatch(self, shaped_data):
+        """
+        Coalesce a shaped alert with other pending alerts for the same game
+        
+        The first alert for a game becomes the work item; later alerts for the same game
+        are absorbed into it, since the bet engine scans every market of the game anyway.
+        The work item is dispatched at the end of the poll batch (or the deferred flush delay),
+        or after the coalesce window when one is configured.
+        
+        Parameters:
+        - shaped_data: The shaped alert data
+        
+        Returns:
+        - Boolean indicating if the alert was accepted for dispatch
+        """
+        try:
+            game_key = self.__game_key(shaped_data)
+            with self.__pending_lock:
+                pending = self.__pending_games.get(game_key)
+                if pending is not None:
+                    self.__coalesced_alerts += 1
+                    logger.info(f"Coalesced alert into pending work item for {game_key}: {shaped_data['category']['type']}")
+                    return True
+                self.__pending_games[game_key] = shaped_data
+            if self.__coalesce_window > 0:
+                self.__maturity_queue.schedule(time.time() + self.__coalesce_window, self.__flush_pending_games, game_key)
+            return True
+        except Exception as e:
+            logger.error(f"Error queueing alert for dispatch: {e}")
+            return False
+    
+    def __flush_pending_games(self, game_key=None):
+        """
+        Send pending coalesced work items to the bet engine
+        
+        Parameters:
+        - game_key: Only flush this game; flushes all pending games when None
+        """
+        with self.__pending_lock:
+            if game_key is None:
+                items = list(self.__pending_games.values())
+                self.__pending_games.clear()
+            else:
+                item = self.__pending_games.pop(game_key, None)
+                items = [item] if item is not None else []
+        for shaped_data in items:
+            self.__notify_bet_engine(shaped_data)
+    
+    def __game_key(self, shaped_data):
+        """Key used to group alerts that belong to the same game"""
+        return shaped_data.get("eventId") or f"{shaped_data['game']['home']}_{shaped_data['game']['away']}"
+    
     def __notify_bet_engine(self, shaped_data):
         """
         Send the shaped alert data to the bet engine
@@ -400,13 +881,43 @@ class OddsEngine:
         - Boolean indicating if the bet was successfully processed and placed
         """
         try:
-            # Run bet_engine.notify in a background thread to avoid blocking the odds loop
+            # Hand bet_engine.notify to the bounded dispatcher to avoid blocking the odds loop.
+            # Alerts for the same event run in order; a second alert for an event that is still
+            # waiting is merged into the waiting task, since notify scans every market of the game.
             # Return True immediately so we mark this alert as processed
-            threading.Thread(target=self.bet_engine.notify, args=(shaped_data,), daemon=True).start()
+            self.__dispatch_executor.submit(self.__game_key(shaped_data), self.bet_engine.notify, shaped_data)
             return True
         except Exception as e:
             logger.error(f"Error notifying bet engine: {e}")
             return False
+    
+    def __merge_pending_notify(self, pending_args, new_args):
+        """
+        Fold a new alert into a notify task that is still waiting for the same event
+        
+        Parameters:
+        - pending_args: Arguments of the waiting notify task
+        - new_args: Arguments of the new notify task
+        
+        Returns:
+        - The arguments to keep for the waiting task
+        """
+        pending_data = pending_args[0]
+        new_data = new_args[0]
+        logger.info(f"Merged alert into pending notify for event {pending_data.get('eventId')}: {new_data['category']['type']}")
+        return pending_args
+    
+    def get_dispatch_stats(self):
+        """
+        Get queue depth, wait time and throughput of the bet engine dispatcher
+        
+        Returns:
+        - Dictionary of dispatcher stats, plus how many alerts were coalesced into pending work items
+        """
+        stats = self.__dispatch_executor.stats()
+        with self.__pending_lock:
+            stats["coalesced"] = self.__coalesced_alerts
+        return stats
 
 if __name__ == "__main__":
     """Test the OddsEngine independently"""
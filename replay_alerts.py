@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Replay recorded Pinnacle alert payloads through OddsEngine.
+
+Each JSONL line may be a single alert, a poll response ({"data": [...]}) or
+{"alerts": [...]}. Every line is fed to OddsEngine as one batch, so the same
+maturity delay, dedup, coalescing and dispatch paths run as with live polling.
+Lines that contain no alerts are skipped.
+
+Recorded timestamps and start times are shifted to the replay clock by default
+so recorded matches are not skipped as already started; --no-rebase-time keeps
+them as recorded. The replay exits with status 1 if every alert was rejected as
+already started.
+
+# Replay as fast as possible against a stub bet engine and print throughput
+python3 replay_alerts.py recorded_alerts.jsonl --speed max
+
+# Replay 10x faster than recorded
+python3 replay_alerts.py recorded_alerts.jsonl --speed 10
+"""
+import argparse
+import json
+import logging
+import sys
+import threading
+import time
+
+from odds_engine import OddsEngine
+
+logger = logging.getLogger('msport_odds')
+
+
+class CountingBetEngine:
+    """Stub bet engine that counts notifications instead of searching Sportybet"""
+
+    def __init__(self, notify_delay=0.0):
+        self.notify_delay = notify_delay
+        self.notified = 0
+        self.__lock = threading.Lock()
+
+    def notify(self, shaped_data):
+        if self.notify_delay:
+            time.sleep(self.notify_delay)
+        with self.__lock:
+            self.notified += 1
+
+
+def load_batches(path):
+    """
+    Read alert batches from a JSONL file
+
+    Returns:
+    - Tuple of (list of alert batches, number of skipped lines)
+    """
+    batches = []
+    skipped = 0
+    with open(path, "r") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                skipped += 1
+                continue
+            if isinstance(record, dict) and isinstance(record.get("data"), list):
+                alerts = record["data"]
+            elif isinstance(record, dict) and isinstance(record.get("alerts"), list):
+                alerts = record["alerts"]
+            elif isinstance(record, dict) and "eventId" in record and "lineType" in record:
+                alerts = [record]
+            elif isinstance(record, list):
+                alerts = [a for a in record if isinstance(a, dict)]
+            else:
+                alerts = []
+            if alerts:
+                batches.append(alerts)
+            else:
+                skipped += 1
+    return batches, skipped
+
+
+def batch_timestamp(alerts):
+    """Newest alert timestamp in a batch (milliseconds), or None"""
+    stamps = []
+    for alert in alerts:
+        try:
+            stamps.append(int(alert.get("timestamp", 0)))
+        except (TypeError, ValueError):
+            continue
+    stamps = [t for t in stamps if t > 0]
+    return max(stamps) if stamps else None
+
+
+def rebase_batch(alerts, maturity_ms=2000):
+    """
+    Shift a batch so its newest alert is maturity_ms old right now.
+
+    Match start times move by the same offset, so the time between alert and
+    kick-off is preserved and recorded matches are not skipped as already started.
+    """
+    newest = batch_timestamp(alerts)
+    if newest is None:
+        return alerts
+    offset = int(time.time() * 1000) - maturity_ms - newest
+    rebased = []
+    for alert in alerts:
+        alert = dict(alert)
+        for field in ("timestamp", "starts"):
+            try:
+                if alert.get(field):
+                    alert[field] = int(alert[field]) + offset
+            except (TypeError, ValueError):
+                pass
+        rebased.append(alert)
+    return rebased
+
+
+class AlertReplayer:
+    """
+    Feeds recorded alert batches into an OddsEngine at a chosen speed
+
+    Parameters:
+    - odds_engine: The OddsEngine to feed
+    - speed: 1.0 for real time, N for N times faster, 0 for as fast as possible
+    - rebase_time: Shift recorded timestamps to the replay clock (default True)
+    """
+
+    def __init__(self, odds_engine, speed=1.0, rebase_time=True):
+        self.odds_engine = odds_engine
+        self.speed = speed
+        self.rebase_time = rebase_time
+
+    def replay(self, batches):
+        """
+        Replay the batches and return throughput numbers
+
+        Returns:
+        - Dictionary with batch/alert counts and timings
+        """
+        started = time.time()
+        previous_ts = None
+        alerts_total = 0
+        for alerts in batches:
+            ts = batch_timestamp(alerts)
+            if self.speed > 0 and previous_ts is not None and ts is not None and ts > previous_ts:
+                time.sleep((ts - previous_ts) / 1000 / self.speed)
+            if ts is not None:
+                previous_ts = ts
+            if self.rebase_time:
+                alerts = rebase_batch(alerts)
+            self.odds_engine.ingest_alerts(alerts)
+            alerts_total += len(alerts)
+        ingest_seconds = time.time() - started
+        return {
+            "batches": len(batches),
+            "alerts": alerts_total,
+            "ingest_seconds": ingest_seconds,
+            "alerts_per_second": (alerts_total / ingest_seconds) if ingest_seconds else float("inf"),
+        }
+
+
+def parse_speed(value):
+    """Parse --speed: 'realtime', 'max' or a multiplier such as '10' or '10x'"""
+    value = str(value).strip().lower()
+    if value in ("realtime", "real-time", "1x"):
+        return 1.0
+    if value in ("max", "asap", "0"):
+        return 0.0
+    return float(value.rstrip("x"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded Pinnacle alerts through OddsEngine")
+    parser.add_argument("files", nargs="+", help="JSONL files with recorded alerts or poll responses")
+    parser.add_argument("--speed", default="max", help="'realtime', 'max' or a multiplier like '10x' (default: max)")
+    parser.add_argument("--rebase-time", action=argparse.BooleanOptionalAction, default=True,
+                        help="Shift timestamps and start times to the replay clock (default: on)")
+    parser.add_argument("--notify-delay", type=float, default=0.0, help="Seconds the stub bet engine spends per notify")
+    parser.add_argument("--quiet", action="store_true", help="Only log warnings and the final report")
+    args = parser.parse_args()
+
+    if args.quiet:
+        logger.setLevel(logging.WARNING)
+
+    batches = []
+    skipped = 0
+    for path in args.files:
+        file_batches, file_skipped = load_batches(path)
+        batches.extend(file_batches)
+        skipped += file_skipped
+
+    bet_engine = CountingBetEngine(notify_delay=args.notify_delay)
+    odds_engine = OddsEngine(
+        bet_engine=bet_engine,
+        pinnacle_host="replay://local",
+        user_id="replay",
+        cursor_mode=False
+    )
+    replayer = AlertReplayer(odds_engine, speed=parse_speed(args.speed), rebase_time=args.rebase_time)
+    result = replayer.replay(batches)
+
+    # Let deferred alerts mature and the dispatcher drain before reporting
+    deadline = time.time() + 10
+    time.sleep(1.5)
+    while time.time() < deadline:
+        stats = odds_engine.get_dispatch_stats()
+        if not stats["queue_depth"] and not stats["running"]:
+            break
+        time.sleep(0.05)
+
+    print("\nReplay results")
+    print("-" * 40)
+    print(f"Batches: {result['batches']} (skipped lines: {skipped})")
+    print(f"Alerts: {result['alerts']}")
+    print(f"Ingest time: {result['ingest_seconds']:.3f}s ({result['alerts_per_second']:.1f} alerts/s)")
+    dispatch = odds_engine.get_dispatch_stats()
+    print(f"Notify calls: {bet_engine.notified} (alerts coalesced per game: {dispatch['coalesced']}, merged in dispatch: {dispatch['merged']})")
+    for store in odds_engine.get_dedup_stats():
+        print(f"Dedup {store['name']}: size={store['size']} hits={store['hits']} misses={store['misses']} hit_ratio={store['hit_ratio']:.2f}")
+    print(f"Dispatch: submitted={dispatch['submitted']} merged={dispatch['merged']} completed={dispatch['completed']} "
+          f"avg_wait={dispatch['avg_wait_seconds']*1000:.1f}ms max_wait={dispatch['max_wait_seconds']*1000:.1f}ms")
+    filters = odds_engine.get_filter_stats()
+    print(f"Filters: checked={filters['checked']} rejected={filters['rejected']} {filters['rejections']}")
+
+    started = filters["rejections"].get("already_started", 0)
+    if filters["checked"] and started == filters["checked"]:
+        hint = "" if args.rebase_time else " Drop --no-rebase-time to shift them to the replay clock."
+        print(f"\nERROR: all {started} alerts were rejected as already started; the replay measured nothing.{hint}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Checks AlertCursorStore parsing, per-stream advancing and persistence.
+
+Usage:
+  python test_alert_cursors.py
+"""
+import os
+import tempfile
+import unittest
+
+from mock_pinnacle import MockPinnacle
+from utils.alert_cursors import AlertCursorStore, STREAM_DEFAULT_SEQUENCE, alert_position, format_cursor, parse_cursor
+
+DROP = "dropNotificationsCursor"
+LIMIT = "limitChangeNotificationsCursor"
+OPENING = "openingLineNotificationsCursor"
+
+
+class AlertCursorStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "cursors.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_parse_and_format(self):
+        self.assertEqual(parse_cursor("1700000000000-3"), (1700000000000, 3))
+        self.assertEqual(parse_cursor(1700000000000), (1700000000000, 0))
+        self.assertEqual(parse_cursor("1700000000000"), (1700000000000, 0))
+        self.assertIsNone(parse_cursor("abc"))
+        self.assertIsNone(parse_cursor(None))
+        self.assertEqual(format_cursor((5, 1)), "5-1")
+
+    def test_alert_position(self):
+        self.assertEqual(alert_position({"id": "700-2", "timestamp": 900}), (700, 2))
+        self.assertEqual(alert_position({"id": 12, "timestamp": 900}), (900, 0))
+        self.assertIsNone(alert_position({}))
+
+    def test_query_params_fall_back_to_lookback(self):
+        store = AlertCursorStore(path=None, lookback_ms=1000, seeds={LIMIT: "500-2"})
+        params = store.query_params(now_ms=10_000)
+        self.assertEqual(params, {DROP: "9000-0", LIMIT: "500-2", OPENING: "9000-1"})
+
+    def test_cursors_never_move_backwards(self):
+        store = AlertCursorStore(path=None)
+        self.assertTrue(store.advance(DROP, "200-0"))
+        self.assertFalse(store.advance(DROP, "100-5"))
+        self.assertFalse(store.advance("unknownCursor", "300-0"))
+        self.assertEqual(store.snapshot(), {DROP: "200-0"})
+
+    def test_server_cursors_win(self):
+        store = AlertCursorStore(path=None)
+        payload = {"cursors": {DROP: "900-0"}, LIMIT: "800-0"}
+        store.update_from_response(payload, [{"id": "950-0"}])
+        self.assertEqual(store.snapshot()[DROP], "900-0")
+        self.assertEqual(store.snapshot()[LIMIT], "800-0")
+
+    def test_unreported_streams_advance_only_to_the_oldest_alert(self):
+        store = AlertCursorStore(path=None)
+        alerts = [{"id": "500-0"}, {"timestamp": 400}, {"id": "600-0"}]
+        self.assertTrue(store.update_from_response({OPENING: "50-1"}, alerts))
+        self.assertEqual(store.snapshot(), {OPENING: "50-1", DROP: "400-0", LIMIT: "400-0"})
+        store.update_from_response({}, [{"id": "300-0"}])
+        self.assertEqual(store.snapshot(), {OPENING: "300-0", DROP: "400-0", LIMIT: "400-0"})
+
+    def test_no_alert_is_skipped_against_server_cursors(self):
+        server = MockPinnacle(games=5, seed=1)
+        store = AlertCursorStore(path=None, lookback_ms=10 ** 12)
+        delivered = []
+        for _ in range(5):
+            for _ in range(20):
+                server.generate_alert()
+            cursors = {k: parse_cursor(v) for k, v in store.query_params(0).items()}
+            payload = server.alerts_since(cursors)
+            delivered.extend(a["id"] for a in payload["data"])
+            store.update_from_response(payload, payload["data"])
+        self.assertEqual(len(delivered), 100)
+        self.assertEqual(len(set(delivered)), 100)
+        payload = server.alerts_since({k: parse_cursor(v) for k, v in store.query_params(0).items()})
+        self.assertEqual(payload["data"], [])
+
+    def test_persists_and_reloads(self):
+        store = AlertCursorStore(path=self.path)
+        store.advance(DROP, "123-4")
+        self.assertTrue(store.save())
+        self.assertFalse(store.save())
+        reloaded = AlertCursorStore(path=self.path, seeds={LIMIT: "9-0"})
+        self.assertEqual(reloaded.snapshot(), {DROP: "123-4", LIMIT: "9-0"})
+        self.assertEqual(set(reloaded.query_params(10_000)), set(STREAM_DEFAULT_SEQUENCE))
+
+
+if __name__ == "__main__":
+    unittest.main()
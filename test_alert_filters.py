@@ -0,0 +1,108 @@
+"""
+Checks the compiled alert pre-filters: default corner/started rules, the
+optional config rules, rule order and the rejection counters.
+
+Usage:
+  python test_alert_filters.py
+"""
+import unittest
+
+from utils.alert_filters import AlertFilter, compile_alert_filters, to_decimal_odds
+
+NOW_MS = 1_700_000_000_000
+HOUR_MS = 60 * 60 * 1000
+
+
+def alert(**fields):
+    base = {
+        "id": "a-1",
+        "sportId": 29,
+        "home": "Arsenal",
+        "away": "Chelsea",
+        "league": "England - Premier League",
+        "starts": NOW_MS + 2 * HOUR_MS,
+        "outcome": "home",
+        "priceHome": 2.1,
+        "priceAway": 3.5,
+    }
+    base.update(fields)
+    return base
+
+
+class ToDecimalOddsTest(unittest.TestCase):
+    def test_decimal_and_american_prices(self):
+        self.assertEqual(to_decimal_odds(2.5), 2.5)
+        self.assertEqual(to_decimal_odds("150"), 2.5)
+        self.assertEqual(to_decimal_odds(-200), 1.5)
+        self.assertEqual(to_decimal_odds(50), 50.0)
+        for price in (None, "x", 1, 0.5, -50):
+            self.assertIsNone(to_decimal_odds(price), price)
+
+
+class CompileAlertFiltersTest(unittest.TestCase):
+    def test_defaults_reject_corners_and_started_matches(self):
+        alert_filter = compile_alert_filters()
+        self.assertIsNone(alert_filter.check(alert(), NOW_MS))
+        self.assertEqual(alert_filter.check(alert(home="Arsenal (Corners)"), NOW_MS), "excluded_team_substring")
+        self.assertEqual(alert_filter.check(alert(away="Chelsea (Corners)"), NOW_MS), "excluded_team_substring")
+        self.assertEqual(alert_filter.check(alert(starts=NOW_MS), NOW_MS), "already_started")
+        self.assertEqual(alert_filter.check(alert(starts="bad"), NOW_MS), "already_started")
+
+    def test_empty_settings_keep_only_started_rule(self):
+        alert_filter = compile_alert_filters({})
+        self.assertEqual([name for name, _ in alert_filter.rules], ["already_started"])
+        self.assertEqual(compile_alert_filters({"skip_started": False}).rules, [])
+
+    def test_sports_and_leagues(self):
+        alert_filter = compile_alert_filters({
+            "sports": [29, "4"],
+            "include_leagues": ["Premier League", "NBA"],
+            "exclude_leagues": ["U21"],
+        })
+        self.assertIsNone(alert_filter.check(alert(), NOW_MS))
+        self.assertIsNone(alert_filter.check(alert(sportId="4", league={"name": "USA - NBA"}), NOW_MS))
+        self.assertEqual(alert_filter.check(alert(sportId=33), NOW_MS), "sport_not_allowed")
+        self.assertEqual(alert_filter.check(alert(league="Spain - La Liga"), NOW_MS), "league_not_included")
+        self.assertEqual(alert_filter.check(alert(league="England - Premier League U21"), NOW_MS), "league_excluded")
+        self.assertEqual(alert_filter.check(alert(league=None, leagueName="premier league"), NOW_MS), None)
+
+    def test_start_window_and_max_odds(self):
+        alert_filter = compile_alert_filters({
+            "max_hours_to_start": 6,
+            "min_minutes_to_start": 10,
+            "max_pinnacle_odds": 3.0,
+        })
+        self.assertIsNone(alert_filter.check(alert(), NOW_MS))
+        self.assertEqual(alert_filter.check(alert(starts=NOW_MS + 7 * HOUR_MS), NOW_MS), "starts_too_far")
+        self.assertEqual(alert_filter.check(alert(starts=NOW_MS + 5 * 60 * 1000), NOW_MS), "starts_too_soon")
+        self.assertEqual(alert_filter.check(alert(outcome="away"), NOW_MS), "odds_above_max")
+        self.assertEqual(alert_filter.check(alert(priceHome=250), NOW_MS), "odds_above_max")
+        self.assertIsNone(alert_filter.check(alert(outcome="over"), NOW_MS))
+        for rule in ("starts_too_far", "starts_too_soon", "odds_above_max"):
+            self.assertTrue(AlertFilter.is_transient(rule))
+        self.assertFalse(AlertFilter.is_transient("already_started"))
+
+    def test_first_rejecting_rule_wins_and_is_counted(self):
+        alert_filter = compile_alert_filters({"exclude_team_substrings": ["(Corners)"], "sports": [29]})
+        self.assertEqual(alert_filter.check(alert(home="A (Corners)", sportId=1, starts=0), NOW_MS),
+                         "excluded_team_substring")
+        alert_filter.check(alert(sportId=1), NOW_MS)
+        alert_filter.check(alert(), NOW_MS)
+        stats = alert_filter.stats()
+        self.assertEqual((stats["checked"], stats["rejected"]), (3, 2))
+        self.assertEqual(stats["rejections"], {"excluded_team_substring": 1, "already_started": 0, "sport_not_allowed": 1})
+
+
+class AlertFilterErrorTest(unittest.TestCase):
+    def test_failing_rule_is_logged_and_skipped(self):
+        def broken(alert, now_ms):
+            raise KeyError("home")
+
+        alert_filter = AlertFilter([("broken", broken), ("always", lambda alert, now_ms: True)])
+        with self.assertLogs("utils.alert_filters", level="ERROR"):
+            self.assertEqual(alert_filter.check(alert(), NOW_MS), "always")
+        self.assertEqual(alert_filter.stats()["errors"], {"broken": 1, "always": 0})
+
+
+if __name__ == "__main__":
+    unittest.main()
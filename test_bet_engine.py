@@ -0,0 +1,425 @@
+"""
+Checks BetEngine decision paths with the network and browser replaced by fakes.
+
+The engine is built without running __init__ (no browser, config or accounts);
+each test sets only the private attributes the path under test reads.
+
+Usage:
+  python test_bet_engine.py
+"""
+import copy
+import os
+import random
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+import requests
+
+import bet_engine
+from bet_engine import BetEngine
+from mock_pinnacle import MockGame
+from test_market_index import load_sample_events
+from utils.event_map_cache import EventMapCache
+from utils.pinnacle_event import PinnacleEvent
+from utils.single_flight import SingleFlightCache
+from utils.team_aliases import TeamAliasStore
+
+
+class BetEngineTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def make_engine(self, **private):
+        engine = BetEngine.__new__(BetEngine)
+        defaults = {
+            "config": {},
+            "accounts": [],
+            "event_index": None,
+            "team_aliases": TeamAliasStore(path=os.path.join(self.tmp.name, "team_aliases.json")),
+            "popup_handler_running": False,
+            "browser_open": False,
+            "browser_initialized": False,
+        }
+        defaults.update(private)
+        for name, value in defaults.items():
+            setattr(engine, f"_BetEngine__{name}", value)
+        return engine
+
+
+def search_result(event_id, home, away):
+    return {"eventId": event_id, "homeTeamName": home, "awayTeamName": away}
+
+
+class SearchEventTest(BetEngineTestCase):
+    """Concurrent keyword search must pick what the one-by-one search picked"""
+
+    def make_search_engine(self, responses):
+        """responses: keyword -> (delay_seconds, candidates)"""
+        calls = []
+        lock = threading.Lock()
+
+        def fetch(search_term, proxies=None):
+            delay, candidates = responses.get(search_term, (0, []))
+            time.sleep(delay)
+            with lock:
+                calls.append(search_term)
+            return candidates
+
+        engine = self.make_engine(fetch_search_candidates=fetch)
+        return engine, calls
+
+    def test_out_of_order_responses_keep_the_earliest_strategy(self):
+        # Strategies run in the order "arsenal chelsea", "arsenal", "chelsea".
+        # Both events score the top rule; the sequential search kept the first strategy's.
+        engine, calls = self.make_search_engine({
+            "arsenal chelsea": (0.3, [search_result("sr:match:1", "Arsenal", "Chelsea")]),
+            "arsenal": (0, [search_result("sr:match:2", "Arsenal", "Chelsea FC")]),
+            "chelsea": (0, [search_result("sr:match:2", "Arsenal", "Chelsea FC")]),
+        })
+        best = engine._BetEngine__search_event_match("Arsenal", "Chelsea")
+        self.assertEqual(best["event_id"], "sr:match:1")
+        self.assertEqual(calls[-1], "arsenal chelsea")
+
+    def test_ties_within_a_response_keep_response_order(self):
+        engine, _ = self.make_search_engine({
+            "arsenal chelsea": (0.2, [search_result("sr:match:3", "Arsenal", "Chelsea"),
+                                      search_result("sr:match:1", "Arsenal", "Chelsea")]),
+            "arsenal": (0, [search_result("sr:match:1", "Arsenal", "Chelsea")]),
+        })
+        self.assertEqual(engine._BetEngine__search_event_match("Arsenal", "Chelsea")["event_id"], "sr:match:3")
+
+    def test_higher_score_from_a_later_strategy_wins(self):
+        engine, _ = self.make_search_engine({
+            "arsenal chelsea": (0, [search_result("sr:match:4", "Arsenal", "Everton")]),
+            "chelsea": (0.2, [search_result("sr:match:1", "Arsenal", "Chelsea")]),
+        })
+        self.assertEqual(engine._BetEngine__search_event_match("Arsenal", "Chelsea")["event_id"], "sr:match:1")
+
+    def test_stops_early_once_earlier_strategies_have_answered(self):
+        engine, calls = self.make_search_engine({
+            "arsenal chelsea": (0, [search_result("sr:match:1", "Arsenal", "Chelsea")]),
+            "chelsea": (2, [search_result("sr:match:2", "Arsenal", "Chelsea")]),
+        })
+        started = time.time()
+        best = engine._BetEngine__search_event_match("Arsenal", "Chelsea")
+        self.assertEqual(best["event_id"], "sr:match:1")
+        self.assertLess(time.time() - started, 1.5)
+        self.assertNotIn("chelsea", calls)
+
+
+class FakeResponse:
+    def __init__(self, status_code, payload=None):
+        self.status_code = status_code
+        self.payload = payload
+
+    def json(self):
+        return self.payload
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(str(self.status_code))
+
+
+class FakeSession:
+    """Counts GETs and answers them with `responses` in turn (the last one repeats) after `delay` seconds"""
+
+    def __init__(self, *responses, delay=0):
+        self.responses = responses
+        self.delay = delay
+        self.urls = []
+        self.lock = threading.Lock()
+
+    def get(self, url, **kwargs):
+        time.sleep(self.delay)
+        with self.lock:
+            self.urls.append(url)
+            return self.responses[min(len(self.urls), len(self.responses)) - 1]
+
+
+class PinnacleSnapshotTest(BetEngineTestCase):
+    """Every EV and points lookup of a game reads one Pinnacle /events snapshot"""
+
+    def setUp(self):
+        super().setUp()
+        env = mock.patch.dict(os.environ, {"PINNACLE_HOST": "http://pinnacle.test"})
+        env.start()
+        self.addCleanup(env.stop)
+        self.payload = MockGame(1001, 1, "Arsenal", "Chelsea", 0, random.Random(23)).payload()
+
+    def make_snapshot_engine(self, response, max_age=5, negative_ttl=2, delay=0):
+        session = FakeSession(response, delay=delay)
+        engine = self.make_engine(
+            http_session=session,
+            pinnacle_snapshots=SingleFlightCache(ttl=max_age, negative_ttl=negative_ttl, name="pinnacle-events"),
+        )
+        return engine, session
+
+    def scan(self, engine):
+        """The lookups one game scan makes: points per period, then prices for every line"""
+        results = []
+        for period_key in ("num_0", "num_1"):
+            points = engine._BetEngine__fetch_pinnacle_points_for_event(1001, period_key)
+            results.append(engine._BetEngine__fetch_latest_pinnacle_odds(1001, "money_line", None, "home", period_key))
+            for line_type, key in (("spread", "spreads"), ("total", "totals")):
+                for p in points[key]:
+                    results.append(engine._BetEngine__fetch_latest_pinnacle_odds(1001, line_type, p, "home", period_key))
+        return results
+
+    def test_one_request_per_scan(self):
+        engine, session = self.make_snapshot_engine(FakeResponse(200, self.payload))
+        results = self.scan(engine)
+        self.assertGreater(len(results), 10)
+        self.assertEqual(session.urls, ["http://pinnacle.test/events/1001"])
+
+        event = PinnacleEvent.from_payload(self.payload)
+        self.assertEqual(results[0], event.period("num_0").prices("money_line", None))
+        self.assertTrue(all(results))
+        stats = engine.get_pinnacle_snapshot_stats()
+        self.assertEqual((stats["misses"], stats["hits"]), (1, len(results) + 1))
+
+    def test_snapshot_is_refetched_after_max_age(self):
+        engine, session = self.make_snapshot_engine(FakeResponse(200, self.payload), max_age=0.1)
+        self.scan(engine)
+        time.sleep(0.15)
+        self.scan(engine)
+        self.assertEqual(len(session.urls), 2)
+
+    def test_concurrent_lookups_share_one_request(self):
+        engine, session = self.make_snapshot_engine(FakeResponse(200, self.payload), delay=0.2)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(self.scan(engine))) for _ in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(session.urls), 1)
+        self.assertTrue(all(r == results[0] for r in results))
+
+    def test_failed_fetch_is_not_retried_within_negative_ttl(self):
+        engine, session = self.make_snapshot_engine(FakeResponse(503))
+        self.assertIsNone(engine._BetEngine__fetch_latest_pinnacle_odds(1001, "money_line", None, "home", "num_0"))
+        self.assertEqual(engine._BetEngine__fetch_pinnacle_points_for_event(1001, "num_0"), {"totals": [], "spreads": []})
+        self.assertEqual(len(session.urls), 1)
+
+
+class FakeElement:
+    """Just enough of a selenium element: children are looked up by CSS selector"""
+
+    def __init__(self, text="", **children):
+        self.text = text
+        self.children = children
+        self.clicked = False
+
+    def find_elements(self, by, selector):
+        return self.children.get(selector, [])
+
+    def find_element(self, by, selector):
+        found = self.find_elements(by, selector)
+        if not found:
+            raise LookupError(selector)
+        return found[0]
+
+    def get_attribute(self, name):
+        return self.text
+
+    def click(self):
+        self.clicked = True
+
+
+class FakeDriver(FakeElement):
+    def quit(self):
+        pass
+
+
+class FakeAccount:
+    username = "tester"
+    proxy = None
+    current_bets = 0
+
+    def can_place_bet(self):
+        return True
+
+    def increment_bets(self):
+        self.current_bets += 1
+
+    def decrement_bets(self):
+        self.current_bets -= 1
+
+
+def market_table(title, rows):
+    """A Sportybet market table; each row is a list of (label, odds) cells"""
+    def row(outcomes):
+        cells = [FakeElement(**{".m-table-cell-item": [FakeElement(label), FakeElement(odds)]}) for label, odds in outcomes]
+        return FakeElement(**{".m-table-row.m-outcome .m-table-cell.m-table-cell--responsive": cells})
+
+    return FakeElement(**{
+        ".m-table-header .m-table-header-title": [FakeElement(title)],
+        ".m-table .m-table-row": [row(outcomes) for outcomes in rows],
+    })
+
+
+class PlacementPathTest(BetEngineTestCase):
+    """A handicap found in the event details is placed on the same line and side on the bet page"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.football = load_sample_events()[0]
+
+    def make_placement_engine(self, strict, page):
+        engine = self.make_engine(
+            config={"immediate_bet_placement": True},
+            strict_market_matching=strict,
+            accounts=[FakeAccount()],
+            headless=True,
+            bet_host="https://www.sportybet.com",
+            thread_drivers={},
+        )
+        placed = []
+
+        def place_with_selenium(account, bet_url, market_type, outcome, odds, stake, points=None,
+                                is_first_half=False, home_team=None, away_team=None, sport_id=1):
+            # Login and navigation skipped: pick the outcome on the already "open" page
+            element, page_odds = engine._BetEngine__get_market_selector(
+                market_type, outcome, points, is_first_half, home_team, away_team, sport_id)
+            placed.append((market_type, outcome, points, is_first_half, element, page_odds))
+            return element is not None
+
+        engine._BetEngine__place_bet_with_selenium = place_with_selenium
+        opener = mock.patch.object(bet_engine, "WebsiteOpener", lambda **kwargs: mock.Mock(driver=page))
+        opener.start()
+        self.addCleanup(opener.stop)
+        return engine, placed
+
+    def first_half_handicap_page(self):
+        rows = [[(o["desc"], o["odds"]) for o in m["outcomes"]] for m in self.football["markets"]
+                if (m.get("desc") or "").lower() == "1st half - asian handicap"]
+        page = FakeDriver(**{".m-table__wrapper": [market_table("Asian Handicap", rows)]})
+        return page, [cell for row in rows for cell in row]
+
+    def find(self, engine, points, outcome):
+        return engine._BetEngine__find_market_bet_code_with_points(
+            self.football, "spread", points, outcome, True, "sr:sport:1", "Home", "Away")
+
+    def test_strict_handicap_is_placed_on_its_line(self):
+        page, outcomes = self.first_half_handicap_page()
+        engine, placed = self.make_placement_engine(True, page)
+        for points, outcome in ((-1.5, "home"), (2.0, "away")):
+            bet_code, odds, sporty_points = self.find(engine, points, outcome)
+            self.assertIsNotNone(bet_code)
+            self.assertEqual(sporty_points, points)
+            shaped_data = {"category": {"type": "spread", "meta": {"team": outcome, "value": sporty_points}},
+                           "game": {"home": "Home", "away": "Away"}}
+            self.assertTrue(engine._BetEngine__place_bet(self.football, "spread", outcome, odds, shaped_data, True, 10))
+
+            market_type, side, placed_points, is_first_half, element, page_odds = placed[-1]
+            self.assertEqual((market_type, side, placed_points, is_first_half), ("spread", outcome, points, True))
+            label = element.find_elements(None, ".m-table-cell-item")[0].text
+            self.assertIn((label, str(page_odds)), [(l, str(float(o))) for l, o in outcomes])
+            self.assertTrue(label.lower().startswith(outcome))
+            self.assertEqual(page_odds, odds)
+
+    def test_default_matching_finds_no_handicap_to_place(self):
+        page, _ = self.first_half_handicap_page()
+        engine, placed = self.make_placement_engine(False, page)
+        self.assertEqual(self.find(engine, -1.5, "home"), (None, None, None))
+        self.assertEqual(placed, [])
+
+    def test_line_missing_from_the_page_is_not_placed(self):
+        page, _ = self.first_half_handicap_page()
+        engine, placed = self.make_placement_engine(True, page)
+        shaped_data = {"category": {"type": "spread", "meta": {"team": "home", "value": -3.5}},
+                       "game": {"home": "Home", "away": "Away"}}
+        self.assertFalse(engine._BetEngine__place_bet(self.football, "spread", "home", 1.9, shaped_data, True, 10))
+        self.assertEqual([(p[2], p[4]) for p in placed], [(-3.5, None)])
+
+
+
+class PlacementRefreshTest(BetEngineTestCase):
+    """Markets found by the scan are re-checked against freshly fetched event details before betting"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.football = load_sample_events()[0]
+
+    def set_odds(self, data, name, desc, odds):
+        for market in data["markets"]:
+            if (market.get("name") or "").lower() == name:
+                for outcome in market["outcomes"]:
+                    if outcome["desc"] == desc:
+                        outcome["odds"] = odds
+
+    def make_refresh_engine(self, fresh):
+        event_map = EventMapCache(path=os.path.join(self.tmp.name, "event_map.db"))
+        self.addCleanup(event_map.close)
+        event_map.put(1001, self.football["eventId"], int((time.time() + 3600) * 1000))
+        session = FakeSession(FakeResponse(200, {"data": self.football}), FakeResponse(200, {"data": fresh}))
+        engine = self.make_engine(
+            event_map=event_map,
+            event_details_cache=SingleFlightCache(ttl=10, negative_ttl=3, name="sporty-event-details"),
+            http_session=session,
+            bet_api_host="https://www.sportybet.com/api/ng",
+            bet_host="https://www.sportybet.com",
+            processed_games=set(),
+            placed_bets={},
+            strict_market_matching=False,
+            max_pinnacle_odds=30.0,
+            team_alias_min_score=300,
+        )
+        scanned = []
+        placed = []
+
+        def check_all_markets(event_details, shaped_data):
+            scanned.append(event_details)
+            return [
+                ("money_line", "home", 1.02, None, 5.0, False, 10),
+                ("money_line", "away", 28.0, None, 5.0, False, 10),
+                ("total", "under", 2.05, 4.5, 5.0, False, 10),
+                ("total", "over", 2.45, 5.5, 5.0, False, 10),
+            ]
+
+        def place_bet(event_details, market_type, outcome, odds, shaped_data, is_first_half=False, stake=None):
+            placed.append((event_details, market_type, outcome, odds))
+            return True
+
+        engine._BetEngine__check_all_markets_for_game = check_all_markets
+        engine._BetEngine__place_bet = place_bet
+        return engine, session, scanned, placed
+
+    def alert(self):
+        return {"eventId": 1001, "starts": 1700000000000, "match_type": "prematch",
+                "game": {"home": "Portugal", "away": "Estonia"},
+                "category": {"type": "money_line", "meta": {"team": "home", "value": None}}}
+
+    def test_bets_use_fresh_odds_and_skip_moved_markets(self):
+        fresh = copy.deepcopy(self.football)
+        self.set_odds(fresh, "1x2", "Home", "1.01")
+        self.set_odds(fresh, "1x2", "Away", "30.00")
+        fresh["markets"] = [m for m in fresh["markets"]
+                            if not any(o["desc"] == "Under 4.5" for o in m.get("outcomes") or [])]
+        engine, session, scanned, placed = self.make_refresh_engine(fresh)
+
+        engine.notify(self.alert())
+        self.assertEqual(len(session.urls), 2)
+        self.assertEqual(len(scanned), 1)
+        self.assertEqual([(market_type, outcome, odds) for _, market_type, outcome, odds in placed],
+                         [("money_line", "away", 30.0), ("total", "over", 2.45)])
+        self.assertTrue(all(details is not scanned[0] for details, *_ in placed))
+        self.assertEqual(placed[0][0]["markets"], fresh["markets"])
+
+        # The snapshot the bets were placed against is not reused by later alerts
+        self.assertEqual(engine._BetEngine__event_details_cache.stats()["size"], 0)
+
+    def test_nothing_is_placed_when_the_refresh_fails(self):
+        engine, session, scanned, placed = self.make_refresh_engine(None)
+        session.responses = (FakeResponse(200, {"data": self.football}), FakeResponse(503))
+        engine.notify(self.alert())
+        self.assertEqual(len(scanned), 1)
+        self.assertEqual(placed, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+"""
+Checks DelayQueue runs callbacks at their due time, in due-time order.
+
+Usage:
+  python test_delay_queue.py
+"""
+import threading
+import time
+import unittest
+
+from utils.delay_queue import DelayQueue
+
+
+class DelayQueueTest(unittest.TestCase):
+    def setUp(self):
+        self.queue = DelayQueue(name="test-delay-queue")
+        self.ran = []
+        self.lock = threading.Lock()
+
+    def tearDown(self):
+        self.queue.stop()
+
+    def record(self, value):
+        with self.lock:
+            self.ran.append((value, time.time()))
+
+    def wait_for(self, count, timeout=3.0):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            with self.lock:
+                if len(self.ran) >= count:
+                    return
+            time.sleep(0.01)
+        self.fail(f"only {len(self.ran)} of {count} callbacks ran")
+
+    def test_runs_in_due_order_not_schedule_order(self):
+        now = time.time()
+        self.queue.schedule(now + 0.15, self.record, "late")
+        self.queue.schedule(now + 0.05, self.record, "early")
+        self.queue.schedule(now - 1, self.record, "past")
+        self.wait_for(3)
+        self.assertEqual([v for v, _ in self.ran], ["past", "early", "late"])
+        self.assertGreaterEqual(self.ran[2][1], now + 0.15)
+
+    def test_same_due_time_keeps_schedule_order(self):
+        due = time.time() + 0.05
+        for i in range(20):
+            self.queue.schedule(due, self.record, i)
+        self.wait_for(20)
+        self.assertEqual([v for v, _ in self.ran], list(range(20)))
+
+    def test_failing_callback_does_not_stop_the_queue(self):
+        def boom():
+            raise RuntimeError("boom")
+        now = time.time()
+        with self.assertLogs("utils.delay_queue", level="ERROR"):
+            self.queue.schedule(now, boom)
+            self.queue.schedule(now + 0.02, self.record, "after")
+            self.wait_for(1)
+        self.assertEqual(self.ran[0][0], "after")
+
+    def test_stop_runs_or_drops_pending(self):
+        self.queue.schedule(time.time() + 60, self.record, "kept")
+        self.assertEqual(self.queue.pending(), 1)
+        self.queue.stop(run_pending=True)
+        self.assertEqual([v for v, _ in self.ran], ["kept"])
+
+        queue = DelayQueue(name="test-delay-queue-drop")
+        queue.schedule(time.time() + 60, self.record, "dropped")
+        queue.stop()
+        self.assertEqual(queue.pending(), 0)
+        self.assertEqual(len(self.ran), 1)
+
+    def test_schedule_racing_stop_runs_one_scheduler_thread(self):
+        def callback(item):
+            with self.lock:
+                self.ran.append(item)
+
+        queue = DelayQueue(name="test-delay-queue-race")
+        live = []
+        for round_ in range(50):
+            queue.schedule(time.time(), callback, (round_, "before"))
+            stopper = threading.Thread(target=queue.stop)
+            stopper.start()
+            for i in range(5):
+                queue.schedule(time.time(), callback, (round_, i))
+            stopper.join()
+            time.sleep(0.01)
+            live.append(sum(1 for t in threading.enumerate() if t.name == "test-delay-queue-race"))
+        queue.stop()
+        self.assertLessEqual(max(live), 1)
+        self.assertEqual(len(self.ran), len(set(self.ran)))
+
+
+if __name__ == "__main__":
+    unittest.main()
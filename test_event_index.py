@@ -0,0 +1,154 @@
+"""
+Checks SportyEventIndex against a fake pcUpcomingEvents endpoint: paging,
+diff-based refreshes, token lookups, start-time windows and pruning.
+
+Usage:
+  python test_event_index.py
+"""
+import random
+import time
+import unittest
+
+from utils.event_index import SportyEventIndex
+from utils.team_names import normalize_team
+
+HOUR_MS = 60 * 60 * 1000
+
+
+class FakeResponse:
+    def __init__(self, payload, status_code=200):
+        self.payload = payload
+        self.status_code = status_code
+
+    def json(self):
+        return self.payload
+
+
+class FakeUpcomingSession:
+    """Serves pcUpcomingEvents pages from a {sportId: [events]} dict"""
+
+    def __init__(self, events_by_sport):
+        self.events_by_sport = events_by_sport
+        self.requests = []
+
+    def get(self, url, params=None, headers=None, proxies=None, timeout=None):
+        self.requests.append(params)
+        size = int(params["pageSize"])
+        page = int(params["pageNum"])
+        events = self.events_by_sport.get(params["sportId"], [])
+        chunk = events[(page - 1) * size:page * size]
+        return FakeResponse({"data": {"totalNum": len(events), "tournaments": [{"events": chunk}]}})
+
+    def close(self):
+        pass
+
+
+def event(event_id, home, away, start_ms):
+    return {"eventId": event_id, "homeTeamName": home, "awayTeamName": away, "estimateStartTime": start_ms}
+
+
+class EventIndexTestCase(unittest.TestCase):
+    def setUp(self):
+        self.now_ms = int(time.time() * 1000)
+        self.football = [
+            event("sr:match:1", "Arsenal", "Chelsea", self.now_ms + 2 * HOUR_MS),
+            event("sr:match:2", "Manchester United", "Liverpool", self.now_ms + 3 * HOUR_MS),
+            event("sr:match:3", "Bayern Munich", "Borussia Dortmund", self.now_ms + 20 * HOUR_MS),
+        ]
+        self.basketball = [event("sr:match:4", "Los Angeles Lakers", "Boston Celtics", self.now_ms + 2 * HOUR_MS)]
+        self.session = FakeUpcomingSession({"sr:sport:1": self.football, "sr:sport:2": self.basketball})
+        self.index = SportyEventIndex(api_host="https://sporty.test", page_size=2)
+        self.index._session = self.session
+
+    def ids(self, candidates):
+        return [c["eventId"] for c in candidates]
+
+
+class RefreshTest(EventIndexTestCase):
+    def test_refresh_pages_through_every_sport(self):
+        self.assertEqual(self.index.refresh(), 4)
+        pages = [(p["sportId"], p["pageNum"]) for p in self.session.requests]
+        self.assertEqual(pages, [("sr:sport:1", "1"), ("sr:sport:1", "2"), ("sr:sport:2", "1")])
+        self.assertEqual(self.index.stats()["events"], 4)
+
+    def test_refresh_applies_the_difference(self):
+        self.index.refresh()
+        self.football[0] = event("sr:match:1", "Arsenal", "Tottenham", self.now_ms + 2 * HOUR_MS)
+        del self.football[1]
+        self.football.append(event("sr:match:5", "Ajax", "PSV", self.now_ms + 4 * HOUR_MS))
+        self.football.append(event("sr:match:6", "Porto", "Benfica", self.now_ms - HOUR_MS))
+        self.assertEqual(self.index.refresh(), 4)
+        self.assertEqual(self.ids(self.index.lookup("Arsenal", "Tottenham")), ["sr:match:1"])
+        self.assertEqual(self.index.lookup("Chelsea", "Nobody"), [])
+        self.assertEqual(self.index.lookup("Liverpool", "Nobody"), [])
+        self.assertEqual(self.ids(self.index.lookup("Ajax", "PSV")), ["sr:match:5"])
+        self.assertEqual(self.index.lookup("Porto", "Benfica"), [])
+
+    def test_entries_without_id_or_teams_are_skipped(self):
+        self.assertFalse(self.index.add_event({"homeTeamName": "Arsenal"}))
+        self.assertFalse(self.index.add_event({"eventId": "sr:match:9"}))
+        self.assertTrue(self.index.add_event({"id": "sr:match:9", "home": "Arsenal", "away": "Chelsea", "startTime": "x"}))
+        self.assertEqual(self.index.lookup("Arsenal", "Chelsea")[0]["estimateStartTime"], None)
+
+
+class LookupTest(EventIndexTestCase):
+    def setUp(self):
+        super().setUp()
+        self.index.refresh()
+
+    def test_lookup_by_normalized_token(self):
+        self.assertEqual(self.ids(self.index.lookup("Arsenal FC", "Someone")), ["sr:match:1"])
+        self.assertEqual(self.ids(self.index.lookup("Manchester Utd", "Liverpool FC")), ["sr:match:2"])
+        self.assertEqual(self.index.lookup("Real Madrid", "Barcelona"), [])
+        stats = self.index.stats()
+        self.assertEqual((stats["lookups"], stats["hits"]), (3, 2))
+
+    def test_spelling_variants_without_a_shared_token_are_not_candidates(self):
+        # Only exact index hits are used, so fuzzy candidates are left to the live search
+        self.assertEqual(self.index.lookup("Man. United", "Liverpul"), [])
+        self.assertEqual(self.index.lookup("Arsenel", "Chelsey"), [])
+        self.assertEqual(self.index.lookup("LA Lakers", "Celtics Boston", self.now_ms)[0]["eventId"], "sr:match:4")
+
+    def test_extra_names_widen_the_lookup(self):
+        self.assertEqual(self.index.lookup("Gunners", "Blues"), [])
+        self.assertEqual(self.ids(self.index.lookup("Gunners", "Blues", extra_names={"Arsenal"})), ["sr:match:1"])
+
+    def test_start_time_window_and_order(self):
+        self.index.add_event(event("sr:match:7", "Arsenal U21", "Chelsea U21", self.now_ms + HOUR_MS))
+        start = self.now_ms + 2 * HOUR_MS
+        self.assertEqual(self.ids(self.index.lookup("Arsenal", "Chelsea", start)), ["sr:match:1", "sr:match:7"])
+        self.assertEqual(self.ids(self.index.lookup("Arsenal", "Chelsea", start, window_hours=0.5)), ["sr:match:1"])
+        self.assertEqual(self.index.lookup("Bayern Munich", "Dortmund", start), [])
+        self.assertEqual(self.index.lookup("Arsenal", "Chelsea", self.now_ms + 100 * HOUR_MS), [])
+        self.assertEqual(self.ids(self.index.window(start, window_hours=1)),
+                         ["sr:match:7", "sr:match:1", "sr:match:4", "sr:match:2"])
+
+    def test_remove_and_prune(self):
+        self.assertTrue(self.index.remove_event("sr:match:1"))
+        self.assertFalse(self.index.remove_event("sr:match:1"))
+        self.assertEqual(self.index.lookup("Arsenal", "Chelsea"), [])
+        self.assertEqual(self.index.prune_started(self.now_ms + 5 * HOUR_MS), 2)
+        self.assertEqual(len(self.index), 1)
+        self.assertEqual(self.index.stats()["tokens"], 4)
+
+    def test_lookup_matches_a_scan_of_the_board(self):
+        rng = random.Random(20)
+        words = ["united", "arsenal", "chelsea", "rovers", "athletic", "porto", "benfica", "ajax", "psv", "celtic"]
+        board = []
+        for i in range(300):
+            board.append(event(f"sr:match:{100 + i}", " ".join(rng.sample(words, 2)), rng.choice(words),
+                               self.now_ms + rng.randint(1, 48 * 60) * 60 * 1000))
+            self.index.add_event(board[-1])
+        for _ in range(50):
+            home, away = rng.choice(words), rng.choice(words)
+            start = self.now_ms + rng.randint(1, 48) * HOUR_MS
+            got = set(self.ids(self.index.lookup(home, away, start)))
+            query = set(normalize_team(home).split()) | set(normalize_team(away).split())
+            expected = {e["eventId"] for e in board + self.football + self.basketball
+                        if abs(e["estimateStartTime"] - start) <= 2 * HOUR_MS
+                        and query & set(normalize_team(f"{e['homeTeamName']} {e['awayTeamName']}").split())}
+            self.assertEqual(got, expected, (home, away))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+"""
+Checks EventMapCache keeps Pinnacle -> Sportybet mappings until kick-off and
+across restarts, and drops invalidated or expired ones.
+
+Usage:
+  python test_event_map_cache.py
+"""
+import os
+import sqlite3
+import tempfile
+import time
+import unittest
+
+from utils.event_map_cache import EventMapCache
+
+
+class EventMapCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "event_map.db")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def open_cache(self, **kwargs):
+        cache = EventMapCache(path=self.path, **kwargs)
+        self.addCleanup(cache.close)
+        return cache
+
+    def kickoff_ms(self, seconds):
+        return int((time.time() + seconds) * 1000)
+
+    def test_put_and_get(self):
+        cache = self.open_cache()
+        cache.put(1001, "sr:match:1", self.kickoff_ms(3600), "Arsenal", "Chelsea")
+        self.assertEqual(cache.get(1001), "sr:match:1")
+        self.assertEqual(cache.get("1001"), "sr:match:1")
+        self.assertIsNone(cache.get(1002))
+        self.assertIsNone(cache.get(None))
+        stats = cache.stats()
+        self.assertEqual((stats["size"], stats["hits"], stats["misses"]), (1, 2, 1))
+        self.assertAlmostEqual(stats["hit_ratio"], 2 / 3)
+
+    def test_missing_ids_are_not_stored(self):
+        cache = self.open_cache()
+        cache.put(None, "sr:match:1")
+        cache.put(1001, None)
+        cache.put(1002, "")
+        self.assertEqual(cache.stats()["size"], 0)
+
+    def test_mapping_expires_at_kickoff(self):
+        cache = self.open_cache()
+        cache.put(1001, "sr:match:1", self.kickoff_ms(0.1))
+        self.assertEqual(cache.get(1001), "sr:match:1")
+        time.sleep(0.15)
+        self.assertIsNone(cache.get(1001))
+        self.assertEqual(cache.stats()["size"], 0)
+
+    def test_missing_or_past_start_uses_default_ttl(self):
+        cache = self.open_cache(default_ttl=0.1)
+        cache.put(1001, "sr:match:1")
+        cache.put(1002, "sr:match:2", self.kickoff_ms(-60))
+        cache.put(1003, "sr:match:3", "not a time")
+        cache.put(1004, "sr:match:4", self.kickoff_ms(3600))
+        self.assertEqual(cache.get(1002), "sr:match:2")
+        time.sleep(0.15)
+        self.assertEqual(cache.purge_expired(), 3)
+        self.assertEqual(cache.stats()["size"], 1)
+        self.assertEqual(cache.get(1004), "sr:match:4")
+
+    def test_mappings_survive_restart(self):
+        cache = self.open_cache()
+        cache.put(1001, "sr:match:1", self.kickoff_ms(3600), "Arsenal", "Chelsea")
+        cache.put(1001, "sr:match:9", self.kickoff_ms(3600), source="manual")
+        cache.put(1002, "sr:match:2", self.kickoff_ms(0.1))
+        cache.close()
+        time.sleep(0.15)
+
+        reopened = self.open_cache()
+        self.assertEqual(reopened.get(1001), "sr:match:9")
+        self.assertIsNone(reopened.get(1002))
+        conn = sqlite3.connect(self.path)
+        self.addCleanup(conn.close)
+        rows = conn.execute("SELECT pinnacle_id, source FROM event_map").fetchall()
+        self.assertEqual(rows, [("1001", "manual")])
+
+    def test_invalidate(self):
+        cache = self.open_cache()
+        cache.put(1001, "sr:match:1", self.kickoff_ms(3600))
+        self.assertTrue(cache.invalidate(1001))
+        self.assertFalse(cache.invalidate(1001))
+        self.assertIsNone(cache.get(1001))
+        cache.close()
+        self.assertIsNone(self.open_cache().get(1001))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+"""
+Checks KeyedExecutor keeps per-key order, runs keys in parallel, merges
+waiting tasks and survives failing tasks.
+
+Usage:
+  python test_keyed_executor.py
+"""
+import threading
+import time
+import unittest
+
+from utils.keyed_executor import KeyedExecutor
+
+
+def wait_idle(executor, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        stats = executor.stats()
+        if not stats["queue_depth"] and not stats["running"] and not stats["active_keys"]:
+            return stats
+        time.sleep(0.01)
+    raise AssertionError(f"executor did not drain: {executor.stats()}")
+
+
+class KeyedExecutorTest(unittest.TestCase):
+    def test_same_key_runs_in_submission_order(self):
+        executor = KeyedExecutor(max_workers=8, name="test-order")
+        seen = {}
+        lock = threading.Lock()
+
+        def task(key, i):
+            time.sleep(0.001 * ((i * 7) % 3))
+            with lock:
+                seen.setdefault(key, []).append(i)
+
+        for i in range(50):
+            for key in ("a", "b", "c"):
+                executor.submit(key, task, key, i)
+        stats = wait_idle(executor)
+        executor.shutdown()
+        self.assertEqual(seen, {key: list(range(50)) for key in ("a", "b", "c")})
+        self.assertEqual(stats["completed"], 150)
+
+    def test_same_key_never_runs_concurrently_but_keys_do(self):
+        executor = KeyedExecutor(max_workers=4, name="test-parallel")
+        active = {}
+        overlap = []
+        peak = [0]
+        lock = threading.Lock()
+
+        def task(key):
+            with lock:
+                active[key] = active.get(key, 0) + 1
+                if active[key] > 1:
+                    overlap.append(key)
+                peak[0] = max(peak[0], sum(active.values()))
+            time.sleep(0.02)
+            with lock:
+                active[key] -= 1
+
+        for _ in range(5):
+            for key in range(4):
+                executor.submit(key, task, key)
+        wait_idle(executor)
+        executor.shutdown()
+        self.assertEqual(overlap, [])
+        self.assertGreater(peak[0], 1)
+
+    def test_merge_folds_into_waiting_task(self):
+        executor = KeyedExecutor(max_workers=1, name="test-merge", merge=lambda pending, new: (pending[0] + new[0],))
+        release = threading.Event()
+        calls = []
+
+        def task(batch):
+            release.wait(2)
+            calls.append(batch)
+
+        self.assertTrue(executor.submit("k", task, ["first"]))
+        time.sleep(0.05)
+        self.assertTrue(executor.submit("k", task, ["a"]))
+        self.assertFalse(executor.submit("k", task, ["b"]))
+        self.assertFalse(executor.submit("k", task, ["c"]))
+        release.set()
+        stats = wait_idle(executor)
+        executor.shutdown()
+        self.assertEqual(calls, [["first"], ["a", "b", "c"]])
+        self.assertEqual((stats["submitted"], stats["merged"], stats["completed"]), (4, 2, 2))
+
+    def test_merge_returning_none_queues_separately(self):
+        executor = KeyedExecutor(max_workers=1, name="test-no-merge", merge=lambda pending, new: None)
+        calls = []
+        for i in range(3):
+            executor.submit("k", calls.append, i)
+        wait_idle(executor)
+        executor.shutdown()
+        self.assertEqual(calls, [0, 1, 2])
+
+    def test_failed_task_is_logged_with_key_and_does_not_block_the_key(self):
+        executor = KeyedExecutor(max_workers=2, name="test-fail")
+        calls = []
+
+        def boom():
+            raise ValueError("boom")
+
+        with self.assertLogs("utils.keyed_executor", level="ERROR") as logs:
+            executor.submit("game-1", boom)
+            executor.submit("game-1", calls.append, "after")
+            stats = wait_idle(executor)
+        executor.shutdown()
+        self.assertEqual(calls, ["after"])
+        self.assertEqual((stats["failed"], stats["completed"]), (1, 1))
+        self.assertIn("game-1", logs.output[0])
+
+    def test_submit_after_shutdown_leaves_no_active_key(self):
+        executor = KeyedExecutor(max_workers=1, name="test-shutdown")
+        executor.shutdown()
+        calls = []
+        for _ in range(2):
+            with self.assertRaises(RuntimeError):
+                executor.submit("k", calls.append, "late")
+        stats = executor.stats()
+        self.assertEqual((stats["active_keys"], stats["queue_depth"]), (0, 0))
+        self.assertEqual(calls, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
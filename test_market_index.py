@@ -0,0 +1,205 @@
+"""
+Checks MarketIndex against the real Sportybet event details saved in
+Sporty.postman_collection.json ("event details" responses: a football and a
+basketball event), and against a linear scan of the markets list.
+
+Usage:
+  python test_market_index.py
+"""
+import json
+import os
+import re
+import unittest
+
+from utils.market_index import MarketIndex, get_market_index, FIRST_HALF_KEYS, OTHER_PERIOD_KEYS
+
+COLLECTION = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Sporty.postman_collection.json")
+
+
+def load_sample_events():
+    """Event details payloads from the postman collection's "event details" responses"""
+    with open(COLLECTION, encoding="utf-8") as f:
+        collection = json.load(f)
+    item = next(i for i in collection["item"] if i["name"] == "event details")
+    return [json.loads(r["body"])["data"] for r in item["response"]]
+
+
+def scan_find(markets, line_type, points, outcome, is_first_half=False, is_basketball=False, strict=False):
+    """Reference lookup: the original scan over the markets list, plus the period and handicap rules of strict mode"""
+    filtered = []
+    for m in markets:
+        label = (m.get("name") or m.get("desc") or "").strip().lower()
+        s = f"{label} {(m.get('group') or '').strip().lower()} {(m.get('title') or '').strip().lower()}"
+        if any(k in s for k in FIRST_HALF_KEYS) != is_first_half:
+            continue
+        if strict and any(k in f"{(m.get('name') or '').lower()} {(m.get('desc') or '').lower()}" for k in OTHER_PERIOD_KEYS):
+            continue
+        filtered.append(m)
+    side = outcome.lower()
+    lt = line_type.lower()
+
+    def hit(o, pts):
+        odds = o.get("odds") or o.get("value")
+        return o.get("id"), float(odds), pts
+
+    if lt == "money_line":
+        for m in filtered:
+            name = (m.get("name") or "").strip().lower()
+            if name == "1x2" or (is_first_half and name == "1st half - 1x2"):
+                for o in m.get("outcomes", []):
+                    if (o.get("desc") or "").strip().lower() == side:
+                        return hit(o, None)
+    elif lt == "total":
+        target = {(False, False): "over/under", (False, True): "1st half - over/under",
+                  (True, False): "over/under (incl. overtime)", (True, True): "1st half - total"}[(is_basketball, is_first_half)]
+        for m in filtered:
+            if (m.get("name") or "").strip().lower() == target:
+                for o in m.get("outcomes", []):
+                    mm = re.search(r"(over|under)\s*(\d+\.?\d*)", (o.get("desc") or "").strip().lower())
+                    if mm and mm.group(1) == side and abs(float(mm.group(2)) - float(points)) < 0.01:
+                        return hit(o, float(mm.group(2)))
+    elif lt == "spread" and abs(float(points)) < 0.01:
+        for m in filtered:
+            if any(k in (m.get("desc") or "").strip().lower() for k in ("draw no bet", "dnb")):
+                for o in m.get("outcomes", []):
+                    if (o.get("desc") or "").strip().lower() == side:
+                        return hit(o, 0.0)
+    elif lt == "spread":
+        for m in filtered:
+            desc = (m.get("desc") or "").strip().lower()
+            if "asian handicap" in desc or (strict and "handicap (incl. overtime)" in desc):
+                for o in m.get("outcomes", []):
+                    txt = (o.get("desc") or "").strip().lower()
+                    if strict:
+                        mm = re.match(r"(home|away)\s*\(\s*([+-]?\d+\.?\d*)\s*\)", txt)
+                        if mm and mm.group(1) == side and abs(float(mm.group(2)) - float(points)) < 0.01:
+                            return hit(o, float(mm.group(2)))
+                    else:
+                        # The original scan compared the whole outcome description to the side
+                        mm = re.search(r"([+-]?\d+\.?\d*)", txt)
+                        if txt == side and mm and abs(float(mm.group(1)) - float(points)) < 0.01:
+                            return hit(o, float(mm.group(1)))
+    return None, None, None
+
+
+SCAN_GRID = (
+    [("money_line", None, o) for o in ("home", "away", "draw")]
+    + [("total", p / 2, o) for p in range(0, 400) for o in ("over", "under")]
+    + [("spread", p / 4, o) for p in range(-40, 41) for o in ("home", "away")]
+)
+
+
+class SampleEventsTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.football, cls.basketball = load_sample_events()
+
+
+class MarketIndexSampleTest(SampleEventsTestCase):
+    def test_matches_linear_scan(self):
+        for strict in (False, True):
+            for event in (self.football, self.basketball):
+                index = MarketIndex(event["markets"], strict=strict)
+                for is_first_half in (False, True):
+                    for is_basketball in (False, True):
+                        for line_type, points, outcome in SCAN_GRID:
+                            args = (line_type, points, outcome, is_first_half, is_basketball)
+                            self.assertEqual(index.find(*args), scan_find(event["markets"], *args, strict=strict),
+                                             (strict,) + args)
+
+    def test_totals_and_money_line(self):
+        for strict in (False, True):
+            index = MarketIndex(self.basketball["markets"], strict=strict)
+            over = index.offered_lines("total", "over", is_basketball=True)
+            self.assertTrue(over)
+            self.assertEqual(index.find("total", over[0], "over", is_basketball=True)[2], over[0])
+            self.assertEqual(index.find("total", over[0], "over", is_basketball=False), (None, None, None))
+            self.assertIsNotNone(MarketIndex(self.football["markets"], strict=strict).find("money_line", None, "draw")[0])
+
+    def test_first_outcome_wins_and_value_fallback(self):
+        markets = [
+            {"name": "Over/Under", "desc": "Over/Under", "outcomes": [
+                {"id": "a", "desc": "Over 2.5", "value": "1.90"},
+                {"id": "b", "desc": "Over 2.50", "odds": "1.80"},
+            ]},
+            {"name": "1x2", "outcomes": [{"id": "c", "desc": "Home", "odds": "2.10"}]},
+            {"name": None, "desc": "1st Half - Draw No Bet", "outcomes": [{"id": "d", "desc": "Home", "odds": "1.50"}]},
+        ]
+        index = MarketIndex(markets)
+        for args in (("total", 2.5, "over"), ("money_line", None, "home"), ("spread", 0, "home", True)):
+            self.assertEqual(index.find(*args), scan_find(markets, *args))
+        self.assertEqual(index.find("total", 2.5, "over"), ("a", 1.9, 2.5))
+
+    def test_index_is_cached_on_event(self):
+        event = dict(self.football)
+        index = get_market_index(event)
+        self.assertIs(get_market_index(event), index)
+        self.assertFalse(index.strict)
+        strict_index = get_market_index(event, strict=True)
+        self.assertTrue(strict_index.strict)
+        self.assertIs(get_market_index(event, strict=True), strict_index)
+        event["markets"] = list(event["markets"])
+        self.assertIsNot(get_market_index(event, strict=True), strict_index)
+
+
+class DefaultMatchingTest(SampleEventsTestCase):
+    """Without strict matching lookups behave like the original scan"""
+
+    def test_handicap_sides_are_not_matched(self):
+        for event in (self.football, self.basketball):
+            index = MarketIndex(event["markets"])
+            for is_first_half in (False, True):
+                for outcome in ("home", "away"):
+                    self.assertEqual(index.offered_lines("spread", outcome, is_first_half), [])
+        self.assertEqual(MarketIndex(self.football["markets"]).find("spread", -1.5, "home", is_first_half=True),
+                         (None, None, None))
+
+    def test_draw_no_bet_takes_the_first_market_of_any_period(self):
+        index = MarketIndex(self.basketball["markets"])
+        first = next(m for m in self.basketball["markets"]
+                     if any(k in (m.get("desc") or "").lower() for k in ("draw no bet", "dnb"))
+                     and not any(k in f"{m.get('name') or m.get('desc') or ''} {m.get('group') or ''} {m.get('title') or ''}".lower()
+                                 for k in FIRST_HALF_KEYS))
+        home = next(o for o in first["outcomes"] if o["desc"] == "Home")
+        self.assertEqual(index.find("spread", 0, "home"), (home["id"], float(home["odds"]), 0.0))
+
+
+class StrictMatchingTest(SampleEventsTestCase):
+    """strict=True: handicaps by side and points, other periods skipped"""
+
+    def test_football_first_half_spreads_are_listed(self):
+        index = MarketIndex(self.football["markets"], strict=True)
+        self.assertEqual(index.offered_lines("spread", "home", is_first_half=True), [-2.0, -1.5])
+        self.assertEqual(index.offered_lines("spread", "away", is_first_half=True), [1.5, 2.0])
+        outcome_id, odds, points = index.find("spread", -1.5, "home", is_first_half=True)
+        self.assertIsNotNone(outcome_id)
+        self.assertGreater(odds, 1.0)
+        self.assertEqual(points, -1.5)
+
+    def test_basketball_spreads_are_listed(self):
+        index = MarketIndex(self.basketball["markets"], strict=True)
+        full_home = index.offered_lines("spread", "home")
+        self.assertEqual(full_home, [-6.5, -5.5, -4.5, -3.5, -2.5, -1.5, 1.5, 2.5, 3.5])
+        self.assertEqual(index.offered_lines("spread", "away"), sorted(-p for p in full_home))
+        self.assertEqual(index.offered_lines("spread", "home", is_first_half=True),
+                         [-3.5, -2.5, -1.5, -0.5, 0.5, 1.5, 2.5])
+        for points in full_home:
+            self.assertNotEqual(index.find("spread", points, "home"), (None, None, None))
+            self.assertNotEqual(index.find("spread", -points, "away"), (None, None, None))
+
+    def test_other_periods_are_not_full_match_lines(self):
+        # Football sample only offers 2nd-half Asian handicap / draw no bet at full-match level
+        index = MarketIndex(self.football["markets"], strict=True)
+        self.assertEqual(index.offered_lines("spread", "home"), [])
+        self.assertEqual(index.find("spread", -2.5, "home"), (None, None, None))
+        self.assertEqual(index.find("spread", 0, "home"), (None, None, None))
+
+        # Basketball full-match draw no bet is the "DNB" market, not a quarter's
+        index = MarketIndex(self.basketball["markets"], strict=True)
+        dnb = next(m for m in self.basketball["markets"] if m.get("name") == "DNB")
+        home = next(o for o in dnb["outcomes"] if o["desc"] == "Home")
+        self.assertEqual(index.find("spread", 0, "home"), (home["id"], float(home["odds"]), 0.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+"""
+Checks the vectorized candidate scoring against a one-candidate-at-a-time
+reference of the 400/350/300/250/200 rules, plus the alias and start-time
+handling.
+
+Usage:
+  python test_match_scoring.py
+"""
+import random
+import unittest
+
+from utils.match_scoring import score_candidates, TOP_SCORE
+from utils.similarity import lev_similarity
+from utils.team_names import longest_tokens, normalize_team, word_match
+
+HOUR_MS = 60 * 60 * 1000
+
+TEAMS = [
+    "Arsenal", "Arsenal FC", "Arsenal U21", "Arsenal Tula", "Chelsea", "Chelsea (Women)", "Chelmsford City",
+    "Manchester United", "Manchester City", "Man Utd", "Liverpool", "Everton", "PSV", "PSV Eindhoven",
+    "AZ Alkmaar", "Ajax", "Real Madrid", "Atletico Madrid", "Inter Milan", "AC Milan", "Los Angeles Lakers",
+    "LA Clippers", "Boston Celtics", "Olympiacos", "Olympiakos Piraeus", "Sporting CP", "FC", "",
+]
+
+
+def reference_score(home_team, away_team, home_name, away_name):
+    """The original per-candidate rule chain"""
+    q_home = normalize_team(home_team)
+    q_away = normalize_team(away_team)
+    hn = normalize_team(home_name)
+    an = normalize_team(away_name)
+    ok_l1b = any(word_match(x, hn) or word_match(x, an) for x in longest_tokens(home_team)[:1] + longest_tokens(away_team)[:1])
+    sim_hh = lev_similarity(q_home, hn)
+    sim_aa = lev_similarity(q_away, an)
+    sim_ha = lev_similarity(q_home, an)
+    sim_ah = lev_similarity(q_away, hn)
+    s1, s2 = max(((sim_hh, sim_aa), (sim_ha, sim_ah)), key=lambda t: t[0] + t[1])
+    rule_scores = []
+    if s1 >= 25 and s2 >= 25 and (s1 + s2) >= 100:
+        rule_scores.append(400)
+    if ok_l1b and s1 >= 70 or ok_l1b and s2 >= 70:
+        rule_scores.append(350)
+    if q_home == hn and s2 >= 50 or q_home == an and s2 >= 50 or q_away == hn and s1 >= 50 or q_away == an and s1 >= 50:
+        rule_scores.append(300)
+    bs1 = (len(q_home) >= 3 and (q_home in hn or hn in q_home)) or (len(q_home) <= 3 and word_match(q_home, hn))
+    bs2 = (len(q_away) >= 3 and (q_away in an or an in q_away)) or (len(q_away) <= 3 and word_match(q_away, an))
+    if ok_l1b and (s1 >= 50 or s2 >= 50 or (bs1 and bs2)):
+        rule_scores.append(250)
+    if s1 >= 40 and s2 >= 40 and (s1 + s2) >= 100:
+        rule_scores.append(200)
+    return max(rule_scores) if rule_scores else 0
+
+
+def candidate(event_id, home, away, start_ms=None):
+    event = {"eventId": event_id, "homeTeamName": home, "awayTeamName": away}
+    if start_ms is not None:
+        event["estimateStartTime"] = start_ms
+    return event
+
+
+class ScoreCandidatesTest(unittest.TestCase):
+    def test_matches_reference_rules(self):
+        rng = random.Random(16)
+        for _ in range(60):
+            home, away = rng.sample(TEAMS[:-2], 2)
+            candidates = [candidate(i, rng.choice(TEAMS), rng.choice(TEAMS)) for i in range(1, 41)]
+            expected = {c["eventId"]: reference_score(home, away, c["homeTeamName"], c["awayTeamName"]) for c in candidates}
+            got = {m["event_id"]: m["score"] for m in score_candidates(home, away, candidates)}
+            self.assertEqual(got, {i: s for i, s in expected.items() if s > 0}, (home, away))
+
+    def test_best_first_and_candidate_order_within_a_score(self):
+        candidates = [
+            candidate(1, "Arsenal", "Everton"),
+            candidate(2, "Chelsea", "Arsenal"),
+            candidate(3, "Arsenal FC", "Chelsea"),
+            candidate(4, "Arsenal", "Chelsea"),
+            candidate(None, "Arsenal", "Chelsea"),
+            candidate(5, "Real Madrid", "Ajax"),
+        ]
+        matches = score_candidates("Arsenal", "Chelsea", candidates)
+        self.assertEqual([(m["event_id"], m["score"]) for m in matches], [(2, 400), (3, 400), (4, 400), (1, 350)])
+        self.assertEqual([m["index"] for m in matches], [1, 2, 3, 0])
+        self.assertEqual(matches[0]["event_name"], "Chelsea vs Arsenal")
+        self.assertTrue(all(m["exact"] for m in matches[:3]))
+        self.assertFalse(matches[3]["exact"])
+
+    def test_known_names_score_exact(self):
+        candidates = [candidate(1, "Gunners", "Blues"), candidate(2, "Arsenal", "Chelsea")]
+        self.assertEqual([m["event_id"] for m in score_candidates("Arsenal", "Chelsea", candidates)], [2])
+        matches = score_candidates("Arsenal", "Chelsea", candidates,
+                                   home_names=frozenset({"gunners"}), away_names=frozenset({"blues"}))
+        self.assertEqual([(m["event_id"], m["score"], m["exact"]) for m in matches], [(1, TOP_SCORE, True), (2, TOP_SCORE, True)])
+
+    def test_start_time_window(self):
+        start = 1_700_000_000_000
+        candidates = [
+            candidate(1, "Arsenal", "Chelsea", start + 3 * HOUR_MS),
+            candidate(2, "Arsenal", "Chelsea", start - 2 * HOUR_MS),
+            candidate(3, "Arsenal", "Chelsea", "soon"),
+            candidate(4, "Arsenal", "Chelsea"),
+        ]
+        self.assertEqual([m["event_id"] for m in score_candidates("Arsenal", "Chelsea", candidates, start)], [2, 4])
+        self.assertEqual([m["event_id"] for m in score_candidates("Arsenal", "Chelsea", candidates, start, window_hours=4)], [1, 2, 4])
+        self.assertEqual(len(score_candidates("Arsenal", "Chelsea", candidates)), 4)
+        self.assertEqual(score_candidates("Arsenal", "Chelsea", []), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,243 @@
+"""
+Checks OddsEngine ingestion paths against a fake Pinnacle session and a
+counting bet engine (no network).
+
+Usage:
+  python test_odds_engine.py
+"""
+import http.client
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from odds_engine import OddsEngine
+
+
+class FakeResponse:
+    def __init__(self, payload, status_code=200):
+        self.payload = payload
+        self.status_code = status_code
+
+    def json(self):
+        return self.payload
+
+
+class FakeSession:
+    """Serves queued payloads to OddsEngine polls; each entry is (delay_seconds, payload)"""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def get(self, url, timeout=None):
+        with self.lock:
+            self.calls += 1
+            delay, payload = self.responses.pop(0) if self.responses else (0, {"data": []})
+        time.sleep(delay)
+        return FakeResponse(payload)
+
+    def close(self):
+        pass
+
+
+class CountingBetEngine:
+    def __init__(self):
+        self.notified = []
+        self.lock = threading.Lock()
+
+    def notify(self, shaped_data):
+        with self.lock:
+            self.notified.append(shaped_data)
+
+
+def make_alert(alert_id, event_id=1, line_type="money_line", outcome="home", points=None, age_ms=5000):
+    now_ms = int(time.time() * 1000)
+    alert = {
+        "id": f"{now_ms - age_ms}-{alert_id}",
+        "timestamp": now_ms - age_ms,
+        "eventId": event_id,
+        "sportId": 29,
+        "home": f"Home {event_id}",
+        "away": f"Away {event_id}",
+        "starts": now_ms + 3 * 60 * 60 * 1000,
+        "type": "prematch",
+        "periodNumber": "0",
+        "lineType": line_type,
+        "outcome": outcome,
+        "priceHome": 2.0,
+        "priceAway": 2.0,
+        "priceDraw": 3.4,
+    }
+    if points is not None:
+        alert["points"] = points
+    return alert
+
+
+def wait_until(predicate, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return predicate()
+
+
+class OddsEngineTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.bet_engine = CountingBetEngine()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def make_engine(self, responses=(), cursor_mode=False):
+        engine = OddsEngine(
+            bet_engine=self.bet_engine,
+            pinnacle_host="http://pinnacle.test",
+            user_id="test",
+            cursor_mode=cursor_mode,
+            cursor_file=os.path.join(self.tmp.name, "cursors.json"),
+            config_file=os.path.join(self.tmp.name, "missing-config.json"),
+        )
+        engine._OddsEngine__session = FakeSession(responses)
+        self.addCleanup(engine.stop)
+        return engine
+
+
+class AsyncLoopTest(OddsEngineTestCase):
+    def test_timed_out_poll_is_taken_on_next_iteration(self):
+        alerts = [make_alert(1, event_id=11), make_alert(2, event_id=12)]
+        engine = self.make_engine([(0.6, {"data": alerts})], cursor_mode=True)
+        engine._OddsEngine__request_timeout = 0.1
+        engine._OddsEngine__fetch_timeout_grace = 0.1
+        handled = []
+        engine._OddsEngine__handle_alerts = lambda payload, batch: handled.append([a["id"] for a in batch])
+
+        with self.assertLogs("msport_odds", level="ERROR") as logs:
+            engine.start_monitoring(interval=0.05, mode="async")
+            self.assertTrue(wait_until(lambda: handled))
+        self.assertIn("Timed out fetching odds alerts", logs.output[0])
+        self.assertEqual(handled[0], [a["id"] for a in alerts])
+
+
+class CoalescingTest(OddsEngineTestCase):
+    def notified_events(self):
+        with self.bet_engine.lock:
+            return sorted(d["eventId"] for d in self.bet_engine.notified)
+
+    def test_batch_sends_one_work_item_per_game(self):
+        engine = self.make_engine()
+        engine.ingest_alerts([
+            make_alert(1, event_id=11),
+            make_alert(2, event_id=11, line_type="total", outcome="over", points=2.5),
+            make_alert(3, event_id=12),
+            make_alert(4, event_id=11, line_type="spread", outcome="home", points=-1.5),
+        ])
+        self.assertTrue(wait_until(lambda: engine.get_dispatch_stats()["completed"] == 2))
+        self.assertEqual(self.notified_events(), [11, 12])
+        first = next(d for d in self.bet_engine.notified if d["eventId"] == 11)
+        self.assertEqual(first["category"]["type"], "money_line")
+        self.assertEqual(engine.get_dispatch_stats()["coalesced"], 2)
+
+    def test_deferred_alerts_released_together_share_a_flush(self):
+        engine = self.make_engine()
+        engine.ingest_alerts([
+            make_alert(1, event_id=13, age_ms=200),
+            make_alert(2, event_id=13, line_type="total", outcome="over", points=2.5, age_ms=300),
+            make_alert(3, event_id=14, age_ms=100),
+        ])
+        time.sleep(0.3)
+        self.assertEqual(self.notified_events(), [])
+        self.assertTrue(wait_until(lambda: engine.get_dispatch_stats()["completed"] == 2))
+        self.assertEqual(self.notified_events(), [13, 14])
+        self.assertEqual(engine.get_dispatch_stats()["coalesced"], 1)
+
+    def test_window_coalesces_across_batches(self):
+        with mock.patch.dict(os.environ, {"ODDS_COALESCE_WINDOW": "0.3"}):
+            engine = self.make_engine()
+        engine.ingest_alerts([make_alert(1, event_id=15)])
+        engine.ingest_alerts([make_alert(2, event_id=15, line_type="total", outcome="over", points=2.5)])
+        time.sleep(0.1)
+        self.assertEqual(self.notified_events(), [])
+        self.assertTrue(wait_until(lambda: engine.get_dispatch_stats()["completed"] == 1))
+        time.sleep(0.4)
+        self.assertEqual(self.notified_events(), [15])
+        self.assertEqual(engine.get_dispatch_stats()["coalesced"], 1)
+
+
+class PushIngestionTest(OddsEngineTestCase):
+    def start_webhook(self, engine, **kwargs):
+        engine.start_push_receiver(port=0, **kwargs)
+        return engine._OddsEngine__push_server.server_address[1]
+
+    def post(self, port, body, headers=None, path="/alerts"):
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+        try:
+            conn.request("POST", path, body=body, headers=headers or {})
+            return conn.getresponse().status
+        finally:
+            conn.close()
+
+    def test_webhook_accepts_alerts_on_loopback(self):
+        engine = self.make_engine()
+        port = self.start_webhook(engine)
+        payload = {"data": [make_alert(1, event_id=21), make_alert(2, event_id=22), "noise"]}
+        self.assertEqual(self.post(port, json.dumps(payload)), 202)
+        self.assertEqual(self.post(port, json.dumps(make_alert(3, event_id=23))), 202)
+        self.assertEqual(self.post(port, "{}", path="/other"), 404)
+        self.assertEqual(self.post(port, "not json"), 400)
+        self.assertTrue(wait_until(lambda: len(self.bet_engine.notified) == 3))
+        self.assertEqual(sorted(d["eventId"] for d in self.bet_engine.notified), [21, 22, 23])
+
+    def test_webhook_token_and_body_cap(self):
+        engine = self.make_engine()
+        port = self.start_webhook(engine, token="secret", max_body_bytes=64)
+        body = json.dumps(make_alert(1, event_id=24))
+        self.assertEqual(self.post(port, body), 401)
+        self.assertEqual(self.post(port, body, {"X-Webhook-Token": "wrong"}), 401)
+        self.assertEqual(self.post(port, body, {"X-Webhook-Token": "secret"}), 413)
+        self.assertEqual(self.post(port, "[]", {"X-Webhook-Token": "secret"}), 202)
+        time.sleep(0.2)
+        self.assertEqual(self.bet_engine.notified, [])
+
+    def test_refuses_non_loopback_bind_without_token(self):
+        engine = self.make_engine()
+        with self.assertRaises(ValueError):
+            engine.start_push_receiver(host="0.0.0.0", port=0)
+        self.assertIsNone(engine._OddsEngine__push_server)
+
+    def test_sse_client_ingests_events(self):
+        events = "".join(f"id: {i}\ndata: {json.dumps(make_alert(i, event_id=30 + i))}\n\n" for i in range(2))
+
+        class SSEHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.end_headers()
+                self.wfile.write(events.encode())
+                self.wfile.flush()
+                time.sleep(0.5)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), SSEHandler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        engine = self.make_engine()
+        engine.start_sse_client(f"http://127.0.0.1:{server.server_address[1]}/alerts")
+        self.assertTrue(wait_until(lambda: len(self.bet_engine.notified) == 2))
+        self.assertEqual(sorted(d["eventId"] for d in self.bet_engine.notified), [30, 31])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+"""
+Checks PinnacleEvent lookups against the raw per-request scan of the
+/events/{id} payload they replaced.
+
+Usage:
+  python test_pinnacle_event.py
+"""
+import random
+import unittest
+
+from mock_pinnacle import MockGame
+from utils.pinnacle_event import PinnacleEvent
+
+
+def raw_prices(payload, line_type, points, period_key):
+    """Reference lookup: scan the raw payload for the first exactly matching line"""
+    period = (((payload or {}).get("data") or {}).get("periods") or {}).get(period_key) or {}
+    if line_type == "money_line":
+        line, keys = period.get("money_line") or {}, {"home": "home", "away": "away", "draw": "draw"}
+    else:
+        if points is None:
+            return None
+        field, market = ("hdp", "spreads") if line_type == "spread" else ("points", "totals")
+        keys = {"home": "home", "away": "away"} if line_type == "spread" else {"over": "home", "under": "away"}
+        line = None
+        for raw in (period.get(market) or {}).values():
+            try:
+                if abs(float(raw[field]) - float(points)) < 0.01:
+                    line = raw
+                    break
+            except (KeyError, TypeError, ValueError):
+                continue
+        if line is None:
+            return None
+    prices = {}
+    for raw_key, key in keys.items():
+        try:
+            if line.get(raw_key) is not None:
+                prices[key] = float(line[raw_key])
+        except (TypeError, ValueError):
+            pass
+    return prices or None
+
+
+def snapshot_prices(payload, line_type, points, period_key):
+    event = PinnacleEvent.from_payload(payload)
+    period = event.period(period_key) if event else None
+    return period.prices(line_type, points) if period else None
+
+
+class PinnacleEventTest(unittest.TestCase):
+    def assert_same_as_raw(self, payload):
+        for period_key in ("num_0", "num_1", "num_2"):
+            self.assertEqual(snapshot_prices(payload, "money_line", None, period_key),
+                             raw_prices(payload, "money_line", None, period_key))
+            for line_type in ("spread", "total"):
+                for points in [None] + [p / 4 for p in range(-40, 41)] + [p / 2 for p in range(300, 500)]:
+                    args = (payload, line_type, points, period_key)
+                    self.assertEqual(snapshot_prices(*args), raw_prices(*args), args[1:])
+
+    def test_mock_games_match_raw_lookup(self):
+        rng = random.Random(7)
+        for i in range(20):
+            sport_id = 3 if i % 4 == 0 else 1
+            game = MockGame(1000 + i, sport_id, f"Home {i}", f"Away {i}", 0, rng)
+            self.assert_same_as_raw(game.payload())
+
+    def test_malformed_lines_match_raw_lookup(self):
+        payload = {"data": {"eventId": 1, "periods": {
+            "num_0": {
+                "money_line": {"home": "2.10", "away": None, "draw": "bad"},
+                "spreads": {
+                    "a": {"hdp": "x", "home": 1.9, "away": 1.9},
+                    "b": {"hdp": -0.5, "home": "1.95", "away": 1.85},
+                    "c": {"hdp": -0.50, "home": 1.50, "away": 2.50},
+                    "d": {"home": 1.5},
+                    "e": {"hdp": 1.0, "home": None, "away": None},
+                },
+                "totals": {"a": {"points": 2.5, "over": 1.8, "under": "2.0"}, "b": None},
+            },
+            "num_1": None,
+        }}}
+        self.assert_same_as_raw(payload)
+        period = PinnacleEvent.from_payload(payload).period("num_0")
+        self.assertEqual(period.prices("spread", -0.5), {"home": 1.95, "away": 1.85})
+        self.assertEqual(period.prices("total", 2.5), {"home": 1.8, "away": 2.0})
+        self.assertIsNone(period.prices("spread", 1.0))
+
+    def test_empty_payloads(self):
+        for payload in (None, {}, {"data": None}, {"data": "null"}, {"data": {}}):
+            self.assertIsNone(PinnacleEvent.from_payload(payload))
+
+    def test_points_lists(self):
+        game = MockGame(1, 1, "H", "A", 0, random.Random(1))
+        period = PinnacleEvent.from_payload(game.payload()).period("num_0")
+        self.assertEqual(period.spread_points(), [-1.5, -1.0, -0.5, 0.0, 0.5, 1.0])
+        self.assertEqual(period.total_points(), [1.5, 2.5, 3.5])
+
+
+    def test_returned_prices_do_not_change_the_snapshot(self):
+        # One parsed event is shared by every lookup of a game scan
+        game = MockGame(2, 1, "H", "A", 0, random.Random(2))
+        period = PinnacleEvent.from_payload(game.payload()).period("num_0")
+        prices = period.prices("money_line")
+        expected = dict(prices)
+        prices["home"] = 99.0
+        self.assertEqual(period.prices("money_line"), expected)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+"""
+Checks the alert replay driver: JSONL parsing, timestamp rebasing, pacing and
+the exit status when every replayed alert had already started.
+
+Usage:
+  python test_replay_alerts.py
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+from replay_alerts import AlertReplayer, batch_timestamp, load_batches, parse_speed, rebase_batch
+
+REPLAY_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "replay_alerts.py")
+
+HOUR_MS = 60 * 60 * 1000
+
+
+def recorded_alert(alert_id, timestamp, event_id=1):
+    return {
+        "id": f"{timestamp}-{alert_id}",
+        "timestamp": timestamp,
+        "eventId": event_id,
+        "sportId": 29,
+        "home": f"Home {event_id}",
+        "away": f"Away {event_id}",
+        "starts": timestamp + 3 * HOUR_MS,
+        "type": "prematch",
+        "periodNumber": "0",
+        "lineType": "money_line",
+        "outcome": "home",
+        "priceHome": 2.0,
+        "priceAway": 2.0,
+        "priceDraw": 3.4,
+    }
+
+
+class RecordingOddsEngine:
+    def __init__(self):
+        self.batches = []
+
+    def ingest_alerts(self, alerts, payload=None):
+        self.batches.append((time.time(), alerts))
+
+
+class ReplayHelpersTest(unittest.TestCase):
+    def test_parse_speed(self):
+        self.assertEqual(parse_speed("realtime"), 1.0)
+        self.assertEqual(parse_speed("max"), 0.0)
+        self.assertEqual(parse_speed("0"), 0.0)
+        self.assertEqual(parse_speed("10x"), 10.0)
+        self.assertEqual(parse_speed(" 2.5 "), 2.5)
+
+    def test_load_batches_accepts_each_record_shape(self):
+        first, second = recorded_alert(1, 1000), recorded_alert(2, 2000)
+        lines = [
+            json.dumps({"data": [first, second]}),
+            json.dumps({"alerts": [first]}),
+            json.dumps(second),
+            json.dumps([first, "noise"]),
+            "",
+            "not json",
+            json.dumps({"data": []}),
+            json.dumps({"status": "ok"}),
+        ]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "alerts.jsonl")
+            with open(path, "w") as f:
+                f.write("\n".join(lines))
+            batches, skipped = load_batches(path)
+        self.assertEqual(batches, [[first, second], [first], [second], [first]])
+        self.assertEqual(skipped, 3)
+
+    def test_rebase_keeps_time_to_kickoff(self):
+        alerts = [recorded_alert(1, 1000), recorded_alert(2, 4000)]
+        alerts[0]["starts"] = "bad"
+        rebased = rebase_batch(alerts, maturity_ms=2000)
+        now_ms = int(time.time() * 1000)
+        self.assertAlmostEqual(rebased[1]["timestamp"], now_ms - 2000, delta=100)
+        self.assertEqual(rebased[1]["timestamp"] - rebased[0]["timestamp"], 3000)
+        self.assertEqual(rebased[1]["starts"] - rebased[1]["timestamp"], 3 * HOUR_MS)
+        self.assertEqual(rebased[0]["starts"], "bad")
+        self.assertEqual(alerts[1]["timestamp"], 4000)
+        self.assertEqual(batch_timestamp([{"timestamp": None}, {}]), None)
+
+
+class AlertReplayerTest(unittest.TestCase):
+    def test_speed_scales_recorded_gaps(self):
+        batches = [[recorded_alert(1, 1000)], [recorded_alert(2, 1400)], [recorded_alert(3, 1400)]]
+        engine = RecordingOddsEngine()
+        result = AlertReplayer(engine, speed=2.0, rebase_time=False).replay(batches)
+        times = [t for t, _ in engine.batches]
+        self.assertGreaterEqual(times[1] - times[0], 0.19)
+        self.assertLess(times[2] - times[1], 0.1)
+        self.assertEqual((result["batches"], result["alerts"]), (3, 3))
+        self.assertEqual(engine.batches[0][1], batches[0])
+
+    def test_rebases_by_default(self):
+        engine = RecordingOddsEngine()
+        AlertReplayer(engine, speed=0).replay([[recorded_alert(1, 1000)]])
+        self.assertGreater(engine.batches[0][1][0]["timestamp"], int(time.time() * 1000) - 5000)
+
+
+class ReplayExitStatusTest(unittest.TestCase):
+    def run_replay(self, *args):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "alerts.jsonl")
+            recorded = int(time.time() * 1000) - 30 * 24 * HOUR_MS
+            with open(path, "w") as f:
+                for i in range(3):
+                    f.write(json.dumps(recorded_alert(i, recorded + i, event_id=i)) + "\n")
+            return subprocess.run([sys.executable, REPLAY_SCRIPT, path, "--quiet", *args],
+                                  cwd=tmp, capture_output=True, text=True, timeout=60)
+
+    def test_recorded_matches_are_replayed_when_rebased(self):
+        result = self.run_replay()
+        self.assertEqual(result.returncode, 0, result.stdout + result.stderr)
+        self.assertIn("Notify calls: 3", result.stdout)
+
+    def test_fails_when_every_alert_already_started(self):
+        result = self.run_replay("--no-rebase-time")
+        self.assertEqual(result.returncode, 1, result.stdout + result.stderr)
+        self.assertIn("all 3 alerts were rejected as already started", result.stdout)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+"""
+Checks the bit-parallel (Myers) Levenshtein distance against the plain
+dynamic-programming edit distance.
+
+Usage:
+  python test_similarity.py
+"""
+import random
+import unittest
+
+from utils.similarity import levenshtein, lev_similarity, lev_similarity_many
+from utils.team_names import normalize_team
+
+
+def dp_levenshtein(a, b):
+    """Reference edit distance: row-by-row dynamic programming"""
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+
+def dp_similarity(a, b):
+    a, b = normalize_team(a), normalize_team(b)
+    if not a or not b:
+        return 0.0
+    return (1 - dp_levenshtein(a, b) / max(len(a), len(b))) * 100
+
+
+TEAMS = [
+    "Manchester United", "Man Utd", "Manchester City", "Arsenal FC", "Arsenal",
+    "Bayern München", "FC Bayern Munich", "Paris Saint-Germain", "PSG", "Real Madrid",
+    "Atlético Madrid", "Fenerbahce Istanbul", "Hapoel Tel-Aviv", "Portugal", "Estonia",
+    "", "A", "Internazionale Milano U21", "Borussia Mönchengladbach", "1. FC Köln",
+]
+
+
+class LevenshteinTest(unittest.TestCase):
+    def test_random_strings_match_dp(self):
+        rng = random.Random(3)
+        for _ in range(3000):
+            a = "".join(rng.choice("abcde ") for _ in range(rng.randint(0, 80)))
+            b = "".join(rng.choice("abcde ") for _ in range(rng.randint(0, 80)))
+            self.assertEqual(levenshtein(a, b), dp_levenshtein(a, b), (a, b))
+
+    def test_long_and_unicode_strings_match_dp(self):
+        rng = random.Random(5)
+        alphabet = "aäbcçdeéøß-. "
+        for _ in range(200):
+            a = "".join(rng.choice(alphabet) for _ in range(rng.randint(60, 150)))
+            b = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 150)))
+            self.assertEqual(levenshtein(a, b), dp_levenshtein(a, b))
+
+    def test_similarity_matches_dp(self):
+        for a in TEAMS:
+            for b in TEAMS:
+                self.assertAlmostEqual(lev_similarity(a, b), dp_similarity(a, b), places=9, msg=(a, b))
+
+    def test_similarity_many_matches_pairwise(self):
+        for query in TEAMS:
+            expected = [dp_similarity(query, c) for c in TEAMS]
+            for got, want in zip(lev_similarity_many(query, TEAMS), expected):
+                self.assertAlmostEqual(got, want, places=9)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+"""
+Checks SingleFlightCache caching, negative TTL, error handling and
+coalescing of concurrent loads.
+
+Usage:
+  python test_single_flight.py
+"""
+import threading
+import time
+import unittest
+
+from utils.single_flight import SingleFlightCache
+
+
+class SingleFlightCacheTest(unittest.TestCase):
+    def test_fresh_value_is_served_from_cache(self):
+        cache = SingleFlightCache(ttl=60)
+        loads = []
+        for _ in range(5):
+            self.assertEqual(cache.get("k", lambda: loads.append(1) or "value"), "value")
+        self.assertEqual(len(loads), 1)
+        self.assertEqual((cache.stats()["hits"], cache.stats()["misses"]), (4, 1))
+
+    def test_expired_and_invalidated_values_reload(self):
+        cache = SingleFlightCache(ttl=0.05)
+        loads = []
+        cache.get("k", lambda: loads.append(1) or "v")
+        time.sleep(0.08)
+        cache.get("k", lambda: loads.append(1) or "v")
+        self.assertTrue(cache.invalidate("k"))
+        self.assertFalse(cache.invalidate("k"))
+        cache.get("k", lambda: loads.append(1) or "v")
+        self.assertEqual(len(loads), 3)
+
+    def test_negative_results_use_negative_ttl(self):
+        cache = SingleFlightCache(ttl=60, negative_ttl=0.05)
+        loads = []
+        self.assertIsNone(cache.get("k", lambda: loads.append(1)))
+        self.assertIsNone(cache.get("k", lambda: loads.append(1)))
+        self.assertEqual(cache.stats()["negative_hits"], 1)
+        time.sleep(0.08)
+        cache.get("k", lambda: loads.append(1))
+        self.assertEqual(len(loads), 2)
+
+        uncached = SingleFlightCache(ttl=60, negative_ttl=0)
+        uncached.get("k", lambda: loads.append(1) or [])
+        uncached.get("k", lambda: loads.append(1) or [])
+        self.assertEqual(len(loads), 4)
+
+    def test_errors_are_raised_and_not_cached(self):
+        cache = SingleFlightCache(ttl=60)
+
+        def fail():
+            raise ConnectionError("down")
+
+        with self.assertRaises(ConnectionError):
+            cache.get("k", fail)
+        self.assertEqual(cache.get("k", lambda: "ok"), "ok")
+        self.assertEqual(cache.stats()["errors"], 1)
+
+    def test_concurrent_callers_share_one_load(self):
+        cache = SingleFlightCache(ttl=60)
+        loads = []
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow_load():
+            loads.append(1)
+            started.set()
+            release.wait(2)
+            return "shared"
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get("k", slow_load))) for _ in range(10)]
+        threads[0].start()
+        started.wait(2)
+        for t in threads[1:]:
+            t.start()
+        time.sleep(0.05)
+        release.set()
+        for t in threads:
+            t.join(2)
+        self.assertEqual(results, ["shared"] * 10)
+        self.assertEqual(len(loads), 1)
+        self.assertEqual(cache.stats()["coalesced"], 9)
+
+    def test_concurrent_callers_all_see_the_error(self):
+        cache = SingleFlightCache(ttl=60)
+        started = threading.Event()
+        release = threading.Event()
+
+        def failing_load():
+            started.set()
+            release.wait(2)
+            raise TimeoutError("slow")
+
+        errors = []
+
+        def call():
+            try:
+                cache.get("k", failing_load)
+            except TimeoutError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=call) for _ in range(5)]
+        threads[0].start()
+        started.wait(2)
+        for t in threads[1:]:
+            t.start()
+        time.sleep(0.05)
+        release.set()
+        for t in threads:
+            t.join(2)
+        self.assertEqual(len(errors), 5)
+
+    def test_max_entries_evicts_least_recently_used(self):
+        cache = SingleFlightCache(ttl=60, max_entries=2)
+        cache.get("a", lambda: 1)
+        cache.get("b", lambda: 2)
+        cache.get("a", lambda: 1)
+        cache.get("c", lambda: 3)
+        self.assertEqual(cache.stats()["size"], 2)
+        self.assertTrue(cache.invalidate("a"))
+        self.assertFalse(cache.invalidate("b"))
+
+
+if __name__ == "__main__":
+    unittest.main()
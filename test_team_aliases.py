@@ -0,0 +1,96 @@
+"""
+Checks TeamAliasStore: confirmation counts before an alias is trusted,
+manual aliases, swapped home/away detection, persistence and picking up
+edits made by another process (cli.py).
+
+Usage:
+  python test_team_aliases.py
+"""
+import json
+import os
+import tempfile
+import unittest
+
+from utils.team_aliases import TeamAliasStore
+
+
+class TeamAliasStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "team_aliases.json")
+
+    def open_store(self, **kwargs):
+        return TeamAliasStore(path=self.path, **kwargs)
+
+    def test_alias_is_trusted_after_min_count_confirmations(self):
+        store = self.open_store(min_count=2)
+        self.assertTrue(store.record("Manchester United", "Man Utd"))
+        self.assertIsNone(store.lookup("Manchester United"))
+        self.assertEqual(store.names_for("Manchester United"), frozenset({"manchester"}))
+        store.record("Manchester United FC", "Man. Utd")
+        self.assertEqual(store.lookup("manchester united"), "man utd")
+        self.assertEqual(store.names_for("Manchester United"), frozenset({"manchester", "man utd"}))
+        stats = store.stats()
+        self.assertEqual((stats["names"], stats["trusted"], stats["hits"], stats["misses"]), (1, 1, 2, 2))
+
+    def test_identical_or_empty_names_are_not_aliases(self):
+        store = self.open_store(min_count=1)
+        self.assertFalse(store.record("Arsenal FC", "Arsenal"))
+        self.assertFalse(store.record("", "Arsenal"))
+        self.assertFalse(store.add("Arsenal", "FC"))
+        self.assertEqual(store.entries(), [])
+
+    def test_manual_alias_wins_over_counted_ones(self):
+        store = self.open_store(min_count=1)
+        for _ in range(3):
+            store.record("Olympiacos", "Olympiakos Piraeus")
+        self.assertEqual(store.lookup("Olympiacos"), "olympiakos piraeus")
+        self.assertTrue(store.add("Olympiacos", "Olympiacos Piraeus"))
+        self.assertEqual(store.lookup("Olympiacos"), "olympiacos piraeus")
+        rows = store.entries()
+        self.assertEqual([(r["sporty"], r["count"], r["manual"], r["trusted"]) for r in rows],
+                         [("olympiacos piraeus", 0, True, True), ("olympiakos piraeus", 3, False, False)])
+
+    def test_record_match_detects_swapped_teams(self):
+        store = self.open_store(min_count=1)
+        store.record_match("Olympiacos", "Panathinaikos", "Panathinaikos Athens", "Olympiakos Piraeus")
+        self.assertEqual(store.lookup("Olympiacos"), "olympiakos piraeus")
+        self.assertEqual(store.lookup("Panathinaikos"), "panathinaikos athens")
+
+    def test_remove(self):
+        store = self.open_store(min_count=1)
+        store.add("Gladbach", "Borussia Monchengladbach")
+        store.add("Spurs", "Tottenham Hotspur")
+        store.add("Spurs", "Tottenham")
+        self.assertFalse(store.remove("Spurs", "Arsenal"))
+        self.assertTrue(store.remove("Spurs", "Tottenham"))
+        self.assertEqual(store.lookup("Spurs"), "tottenham hotspur")
+        self.assertTrue(store.remove("Spurs"))
+        self.assertFalse(store.remove("Spurs"))
+        self.assertIsNone(store.lookup("Spurs"))
+        self.assertEqual([r["pinnacle"] for r in store.entries()], ["gladbach"])
+
+    def test_persists_and_reloads_external_edits(self):
+        store = self.open_store(min_count=1, reload_interval=0)
+        store.add("Wolves", "Wolverhampton Wanderers")
+        self.assertEqual(self.open_store().lookup("Wolves"), "wolverhampton wanderers")
+
+        with open(self.path) as f:
+            stored = json.load(f)
+        stored["aliases"]["psg"] = {"paris saint germain": {"count": 0, "manual": True}}
+        with open(self.path, "w") as f:
+            json.dump(stored, f)
+        os.utime(self.path, (0, 0))
+        self.assertEqual(store.lookup("PSG"), "paris saint germain")
+
+    def test_invalid_file_leaves_store_empty(self):
+        with open(self.path, "w") as f:
+            f.write("{not json")
+        with self.assertLogs("utils.team_aliases", level="ERROR"):
+            store = self.open_store()
+        self.assertEqual(store.entries(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
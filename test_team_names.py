@@ -0,0 +1,57 @@
+"""
+Checks the cached team-name helpers: normalization, token extraction, whole
+word matching and the cache counters.
+
+Usage:
+  python test_team_names.py
+"""
+import unittest
+
+from utils.team_names import cache_stats, longest_tokens, normalize_team, team_tokens, word_match
+
+
+class NormalizeTeamTest(unittest.TestCase):
+    def test_strips_brackets_punctuation_suffixes_and_stopwords(self):
+        self.assertEqual(normalize_team("Arsenal FC"), "arsenal")
+        self.assertEqual(normalize_team("  Manchester United (Women) "), "manchester")
+        self.assertEqual(normalize_team("Paris Saint-Germain"), "paris saint germain")
+        self.assertEqual(normalize_team("Real Madrid C.F."), "madrid c f")
+        self.assertEqual(normalize_team("Sporting CP"), "cp")
+        self.assertEqual(normalize_team(None), "")
+        self.assertEqual(normalize_team(""), "")
+
+    def test_tokens(self):
+        self.assertEqual(team_tokens("Borussia Monchengladbach FC"), frozenset({"borussia", "monchengladbach"}))
+        self.assertEqual(longest_tokens("Wolverhampton Wanderers FC"), ("wolverhampton", "wanderers"))
+        self.assertEqual(longest_tokens("AS Roma de la Sol Atl"), ("roma", "sol", "atl"))
+        self.assertEqual(longest_tokens("Bayern Bayern Munich", limit=1), ("bayern",))
+        self.assertEqual(longest_tokens("FC AS"), ())
+
+
+class WordMatchTest(unittest.TestCase):
+    def test_short_tokens_need_a_whole_word(self):
+        self.assertTrue(word_match("psv", "PSV Eindhoven"))
+        self.assertFalse(word_match("psv", "PSVX Eindhoven"))
+        self.assertTrue(word_match("AZ", "AZ Alkmaar"))
+
+    def test_long_tokens_match_substrings(self):
+        self.assertTrue(word_match("chester", "Manchester United"))
+        self.assertFalse(word_match("liverpool", "Everton"))
+        self.assertFalse(word_match("", "Everton"))
+        self.assertFalse(word_match("everton", None))
+
+
+class CacheStatsTest(unittest.TestCase):
+    def test_repeat_lookups_hit_the_cache(self):
+        name = "Cache Stats Test Rovers United"
+        before = cache_stats()["normalize_team"]
+        normalize_team(name)
+        normalize_team(name)
+        after = cache_stats()["normalize_team"]
+        self.assertEqual(after["misses"] - before["misses"], 1)
+        self.assertEqual(after["hits"] - before["hits"], 1)
+        self.assertLessEqual(after["size"], after["max_size"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+"""
+Checks TTLDedupStore expiry, eviction order and counters.
+
+Usage:
+  python test_ttl_dedup.py
+"""
+import time
+import unittest
+
+from utils.ttl_dedup import TTLDedupStore
+
+
+class TTLDedupStoreTest(unittest.TestCase):
+    def test_add_and_contains(self):
+        store = TTLDedupStore(max_size=10, default_ttl=60)
+        store.add("a")
+        self.assertIn("a", store)
+        self.assertNotIn("b", store)
+        self.assertEqual((store.stats()["hits"], store.stats()["misses"]), (1, 1))
+
+    def test_expired_keys_are_misses(self):
+        store = TTLDedupStore(max_size=10)
+        store.add("old", expires_at=time.time() - 1)
+        store.add("new", expires_at=time.time() + 60)
+        self.assertNotIn("old", store)
+        self.assertIn("new", store)
+        self.assertEqual(len(store), 1)
+        self.assertEqual(store.stats()["expirations"], 1)
+
+    def test_evicts_oldest_first_and_readd_refreshes_order(self):
+        store = TTLDedupStore(max_size=3, default_ttl=60)
+        for key in ("a", "b", "c"):
+            store.add(key)
+        store.add("a")
+        store.add("d")
+        self.assertEqual([k for k in ("a", "b", "c", "d") if k in store], ["a", "c", "d"])
+        self.assertEqual(store.stats()["evictions"], 1)
+
+    def test_expired_front_is_dropped_before_capacity_eviction(self):
+        store = TTLDedupStore(max_size=2, default_ttl=60)
+        store.add("stale", expires_at=time.time() - 1)
+        store.add("a")
+        store.add("b")
+        self.assertIn("a", store)
+        self.assertIn("b", store)
+        self.assertEqual(store.stats()["evictions"], 0)
+
+    def test_discard_and_clear(self):
+        store = TTLDedupStore(default_ttl=60)
+        store.add("a")
+        store.add("b")
+        store.discard("a")
+        store.discard("missing")
+        self.assertNotIn("a", store)
+        store.clear()
+        self.assertEqual(len(store), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
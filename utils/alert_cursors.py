@@ -0,0 +1,164 @@
+import json
+import os
+import re
+import threading
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+# Notification streams exposed by the Pinnacle alerts endpoint and the
+# sequence suffix the original fixed-lookback query used for each of them.
+STREAM_DEFAULT_SEQUENCE = {
+    "dropNotificationsCursor": 0,
+    "limitChangeNotificationsCursor": 0,
+    "openingLineNotificationsCursor": 1,
+}
+
+_CURSOR_RE = re.compile(r"^\s*(\d+)-(\d+)\s*$")
+
+
+def parse_cursor(value: Any) -> Optional[Tuple[int, int]]:
+    """
+    Parse a stream cursor ("<milliseconds>-<sequence>") into a comparable tuple.
+
+    Plain millisecond timestamps are accepted and treated as sequence 0.
+    Returns None when the value cannot be interpreted as a cursor.
+    """
+    if value is None:
+        return None
+    if isinstance(value, tuple) and len(value) == 2:
+        return int(value[0]), int(value[1])
+    if isinstance(value, (int, float)):
+        return int(value), 0
+    match = _CURSOR_RE.match(str(value))
+    if match:
+        return int(match.group(1)), int(match.group(2))
+    try:
+        return int(str(value).strip()), 0
+    except ValueError:
+        return None
+
+
+def format_cursor(cursor: Tuple[int, int]) -> str:
+    """Format a cursor tuple back into the "<milliseconds>-<sequence>" form."""
+    return f"{cursor[0]}-{cursor[1]}"
+
+
+def alert_position(alert: Dict[str, Any]) -> Optional[Tuple[int, int]]:
+    """Cursor position of an alert: its stream id when present, its timestamp otherwise."""
+    alert_id = alert.get("id")
+    if isinstance(alert_id, str) and _CURSOR_RE.match(alert_id):
+        return parse_cursor(alert_id)
+    if alert.get("timestamp"):
+        return parse_cursor(alert.get("timestamp"))
+    return None
+
+
+class AlertCursorStore:
+    """
+    Keeps the last seen cursor for each Pinnacle notification stream and
+    persists them to disk so a restart resumes from where it left off.
+    """
+
+    def __init__(self, path: str = "alert_cursors.json", lookback_ms: int = 2 * 60 * 1000,
+                 seeds: Optional[Dict[str, Any]] = None):
+        self.path = path
+        self.lookback_ms = lookback_ms
+        self._cursors: Dict[str, Tuple[int, int]] = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+        for stream, value in (seeds or {}).items():
+            cursor = parse_cursor(value)
+            if stream in STREAM_DEFAULT_SEQUENCE and cursor:
+                self._cursors[stream] = cursor
+        self.load()
+
+    def load(self) -> None:
+        """Load stored cursors from disk, keeping any seeds for missing streams."""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r") as f:
+                stored = json.load(f) or {}
+        except (OSError, ValueError):
+            return
+        with self._lock:
+            for stream in STREAM_DEFAULT_SEQUENCE:
+                cursor = parse_cursor(stored.get(stream))
+                if cursor:
+                    self._cursors[stream] = cursor
+
+    def save(self) -> bool:
+        """Write the cursors to disk if they changed. Returns True when a write happened."""
+        with self._lock:
+            if not self._dirty or not self.path:
+                return False
+            snapshot = {stream: format_cursor(c) for stream, c in self._cursors.items()}
+            self._dirty = False
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(snapshot, f, indent=4)
+        os.replace(tmp_path, self.path)
+        return True
+
+    def query_params(self, now_ms: int) -> Dict[str, str]:
+        """
+        Build the cursor query parameters for the next poll.
+
+        Streams without a stored cursor fall back to the fixed lookback window.
+        """
+        fallback_ms = now_ms - self.lookback_ms
+        params = {}
+        with self._lock:
+            for stream, default_seq in STREAM_DEFAULT_SEQUENCE.items():
+                cursor = self._cursors.get(stream) or (fallback_ms, default_seq)
+                params[stream] = format_cursor(cursor)
+        return params
+
+    def advance(self, stream: str, value: Any) -> bool:
+        """Move a stream cursor forward. Cursors never move backwards."""
+        cursor = parse_cursor(value)
+        if stream not in STREAM_DEFAULT_SEQUENCE or not cursor:
+            return False
+        with self._lock:
+            current = self._cursors.get(stream)
+            if current and cursor <= current:
+                return False
+            self._cursors[stream] = cursor
+            self._dirty = True
+            return True
+
+    def update_from_response(self, payload: Dict[str, Any], alerts: Iterable[Dict[str, Any]]) -> bool:
+        """
+        Advance cursors from a poll response.
+
+        Cursors returned by the server (top-level or under "cursors") win. Alerts do
+        not say which stream delivered them, so a stream the server did not report is
+        only advanced to the oldest alert in the batch: it is never moved past alerts
+        it has not delivered yet, at the cost of re-fetching the rest of the batch
+        (which the dedup stores then drop).
+        """
+        changed = False
+        reported = set()
+        payload = payload if isinstance(payload, dict) else {}
+        nested = payload.get("cursors") if isinstance(payload.get("cursors"), dict) else {}
+        for stream in STREAM_DEFAULT_SEQUENCE:
+            value = nested.get(stream, payload.get(stream))
+            if value is not None and parse_cursor(value):
+                reported.add(stream)
+                changed = self.advance(stream, value) or changed
+
+        oldest = None
+        for alert in alerts or []:
+            observed = alert_position(alert)
+            if observed and (oldest is None or observed < oldest):
+                oldest = observed
+
+        if oldest:
+            for stream in STREAM_DEFAULT_SEQUENCE:
+                if stream not in reported:
+                    changed = self.advance(stream, oldest) or changed
+        return changed
+
+    def snapshot(self) -> Dict[str, str]:
+        """Return the current cursors as strings (for logging/diagnostics)."""
+        with self._lock:
+            return {stream: format_cursor(c) for stream, c in self._cursors.items()}
@@ -0,0 +1,192 @@
+import logging
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Rule predicates return True when the alert should be rejected
+Predicate = Callable[[Dict[str, Any], int], bool]
+
+DEFAULT_ALERT_FILTERS = {
+    "exclude_team_substrings": ["(Corners)"],
+    "skip_started": True,
+}
+
+# Rules whose verdict can change for the same event and line as kick-off nears or the price moves
+TRANSIENT_RULES = frozenset({"starts_too_far", "starts_too_soon", "odds_above_max"})
+
+_OUTCOME_PRICE_KEYS = {
+    "home": "priceHome",
+    "away": "priceAway",
+    "draw": "priceDraw",
+    "over": "priceOver",
+    "under": "priceUnder",
+}
+
+
+def to_decimal_odds(price: Any) -> Optional[float]:
+    """
+    Convert an alert price to decimal odds.
+
+    Values with an absolute value of 100 or more are treated as American odds,
+    values above 1 as decimal odds. Returns None for anything else.
+    """
+    try:
+        value = float(price)
+    except (TypeError, ValueError):
+        return None
+    if value >= 100:
+        return 1 + value / 100
+    if value <= -100:
+        return 1 + 100 / abs(value)
+    if value > 1:
+        return value
+    return None
+
+
+def _alert_league(alert: Dict[str, Any]) -> str:
+    league = alert.get("league") or alert.get("leagueName") or ""
+    if isinstance(league, dict):
+        league = league.get("name") or ""
+    return str(league).lower()
+
+
+def _compile_substring_rule(substrings: List[str]) -> Optional[Predicate]:
+    substrings = [s for s in substrings or [] if s]
+    if not substrings:
+        return None
+    pattern = re.compile("|".join(re.escape(s) for s in substrings))
+    return lambda alert, now_ms: bool(
+        pattern.search(alert.get("home", "") or "") or pattern.search(alert.get("away", "") or "")
+    )
+
+
+def _compile_league_rule(leagues: List[str], include: bool) -> Optional[Predicate]:
+    leagues = [str(l).lower() for l in leagues or [] if l]
+    if not leagues:
+        return None
+    pattern = re.compile("|".join(re.escape(l) for l in leagues))
+    if include:
+        return lambda alert, now_ms: not pattern.search(_alert_league(alert))
+    return lambda alert, now_ms: bool(pattern.search(_alert_league(alert)))
+
+
+def _starts_ms(alert: Dict[str, Any]) -> int:
+    try:
+        return int(alert.get("starts", 0))
+    except (TypeError, ValueError):
+        return 0
+
+
+def compile_alert_filters(settings: Optional[Dict[str, Any]] = None) -> "AlertFilter":
+    """
+    Compile the "alert_filters" config section into an AlertFilter.
+
+    Supported keys (all optional):
+    - exclude_team_substrings: list of substrings; alerts whose home/away contains any are rejected
+    - skip_started: reject alerts for matches whose start time has passed
+    - sports: list of allowed Pinnacle sportIds
+    - include_leagues / exclude_leagues: case-insensitive league name substrings
+    - max_hours_to_start: reject matches starting further away than this
+    - min_minutes_to_start: reject matches starting sooner than this
+    - max_pinnacle_odds: reject alerts whose alerted price (decimal) is above this
+    """
+    settings = dict(DEFAULT_ALERT_FILTERS if settings is None else settings)
+    rules: List[Tuple[str, Predicate]] = []
+
+    corners = _compile_substring_rule(settings.get("exclude_team_substrings"))
+    if corners:
+        rules.append(("excluded_team_substring", corners))
+
+    if settings.get("skip_started", True):
+        rules.append(("already_started", lambda alert, now_ms: _starts_ms(alert) <= now_ms))
+
+    sports = settings.get("sports")
+    if sports:
+        allowed = frozenset(str(s) for s in sports)
+        rules.append(("sport_not_allowed", lambda alert, now_ms: str(alert.get("sportId", "")) not in allowed))
+
+    include = _compile_league_rule(settings.get("include_leagues"), include=True)
+    if include:
+        rules.append(("league_not_included", include))
+    exclude = _compile_league_rule(settings.get("exclude_leagues"), include=False)
+    if exclude:
+        rules.append(("league_excluded", exclude))
+
+    max_hours = settings.get("max_hours_to_start")
+    if max_hours is not None:
+        max_ms = float(max_hours) * 60 * 60 * 1000
+        rules.append(("starts_too_far", lambda alert, now_ms: _starts_ms(alert) - now_ms > max_ms))
+
+    min_minutes = settings.get("min_minutes_to_start")
+    if min_minutes:
+        min_ms = float(min_minutes) * 60 * 1000
+        rules.append(("starts_too_soon", lambda alert, now_ms: _starts_ms(alert) - now_ms < min_ms))
+
+    max_odds = settings.get("max_pinnacle_odds")
+    if max_odds is not None:
+        max_odds = float(max_odds)
+
+        def odds_too_high(alert, now_ms):
+            key = _OUTCOME_PRICE_KEYS.get(str(alert.get("outcome", "")).lower())
+            odds = to_decimal_odds(alert.get(key)) if key else None
+            return odds is not None and odds > max_odds
+
+        rules.append(("odds_above_max", odds_too_high))
+
+    return AlertFilter(rules)
+
+
+class AlertFilter:
+    """
+    Ordered list of compiled reject rules with per-rule rejection counters
+    """
+
+    def __init__(self, rules: List[Tuple[str, Predicate]]):
+        self.rules = rules
+        self.checked = 0
+        self.rejections = {name: 0 for name, _ in rules}
+        self.errors = {name: 0 for name, _ in rules}
+        self._lock = threading.Lock()
+
+    def check(self, alert: Dict[str, Any], now_ms: Optional[int] = None) -> Optional[str]:
+        """
+        Run the rules against an alert.
+
+        Returns:
+        - The name of the first rule that rejects the alert, or None if it passes
+        """
+        if now_ms is None:
+            now_ms = int(time.time() * 1000)
+        rejected_by = None
+        for name, predicate in self.rules:
+            try:
+                if predicate(alert, now_ms):
+                    rejected_by = name
+                    break
+            except Exception:
+                logger.exception(f"Alert filter rule {name} failed for alert {alert.get('id', '')}")
+                with self._lock:
+                    self.errors[name] += 1
+        with self._lock:
+            self.checked += 1
+            if rejected_by:
+                self.rejections[rejected_by] += 1
+        return rejected_by
+
+    def stats(self) -> Dict[str, Any]:
+        """Return how many alerts were checked and rejected by each rule"""
+        with self._lock:
+            return {
+                "checked": self.checked,
+                "rejected": sum(self.rejections.values()),
+                "rejections": dict(self.rejections),
+                "errors": dict(self.errors),
+            }
+
+    @staticmethod
+    def is_transient(rule_name: str) -> bool:
+        """Whether a rejection by this rule may not hold for later alerts on the same event and line"""
+        return rule_name in TRANSIENT_RULES
@@ -0,0 +1,94 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class DelayQueue:
+    """
+    Heap-based scheduler that runs callbacks once their due time is reached.
+
+    A single background thread sleeps until the earliest item matures, so holding
+    an item back never blocks the caller. Items due at the same time run in the
+    order they were scheduled. Callbacks run on the scheduler thread and should be
+    short; hand longer work off to an executor.
+    """
+
+    def __init__(self, name: str = "delay-queue"):
+        self.name = name
+        self._heap = []
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread = None
+
+    def schedule(self, due_at: float, callback: Callable[..., Any], *args: Any) -> None:
+        """
+        Run callback(*args) at Unix time due_at (seconds). Past due times run immediately.
+        """
+        with self._cond:
+            heapq.heappush(self._heap, (due_at, next(self._counter), callback, args))
+            if not self._running:
+                self._start_locked()
+            self._cond.notify_all()
+
+    def pending(self) -> int:
+        """Number of items waiting to mature"""
+        with self._cond:
+            return len(self._heap)
+
+    def stop(self, run_pending: bool = False) -> None:
+        """
+        Stop the scheduler thread
+
+        Parameters:
+        - run_pending: Run the remaining items immediately instead of dropping them
+        """
+        with self._cond:
+            self._running = False
+            thread = self._thread
+            self._thread = None
+            remaining = self._heap if run_pending else []
+            self._heap = []
+            self._cond.notify_all()
+        if thread and thread.is_alive() and thread is not threading.current_thread():
+            thread.join(timeout=5)
+        for _, _, callback, args in sorted(remaining):
+            self._run(callback, args)
+
+    def _start_locked(self) -> None:
+        self._running = True
+        self._thread = threading.Thread(target=self._loop, name=self.name, daemon=True)
+        self._thread.start()
+
+    def _owns_queue(self) -> bool:
+        # A thread keeps scheduling only while it is the queue's current thread, so a
+        # schedule() racing with stop() can start a new thread without the old one
+        # (still waking up) running items alongside it
+        return self._running and self._thread is threading.current_thread()
+
+    def _loop(self) -> None:
+        while True:
+            with self._cond:
+                while self._owns_queue():
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+                    wait = self._heap[0][0] - time.time()
+                    if wait <= 0:
+                        break
+                    self._cond.wait(timeout=wait)
+                if not self._owns_queue():
+                    return
+                _, _, callback, args = heapq.heappop(self._heap)
+            self._run(callback, args)
+
+    def _run(self, callback: Callable[..., Any], args: tuple) -> None:
+        try:
+            callback(*args)
+        except Exception as e:
+            logger.error(f"Error running delayed callback in {self.name}: {e}")
@@ -0,0 +1,337 @@
+import bisect
+import logging
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from utils.team_names import normalize_team
+
+logger = logging.getLogger(__name__)
+
+HOUR_MS = 60 * 60 * 1000
+
+
+class IndexedEvent:
+    """An upcoming Sportybet event as stored in the index"""
+
+    __slots__ = ("event_id", "home", "away", "start_ms", "tokens", "raw")
+
+    def __init__(self, event_id: str, home: str, away: str, start_ms: Optional[int], tokens: Set[str], raw: Dict[str, Any]):
+        self.event_id = event_id
+        self.home = home
+        self.away = away
+        self.start_ms = start_ms
+        self.tokens = tokens
+        self.raw = raw
+
+    def as_candidate(self) -> Dict[str, Any]:
+        """Shape the event like a firstSearch result so the same scoring code can use it"""
+        return {
+            "eventId": self.event_id,
+            "homeTeamName": self.home,
+            "awayTeamName": self.away,
+            "estimateStartTime": self.start_ms,
+        }
+
+
+class SportyEventIndex:
+    """
+    In-memory index of upcoming Sportybet pre-match events.
+
+    A background thread bulk-loads pcUpcomingEvents pages for the configured
+    sports and applies the difference to the index on every refresh: new events
+    are inserted, changed ones re-indexed, and events that disappeared or kicked
+    off are removed. Events are keyed by normalized team-name tokens and a list
+    sorted by start time, so resolving an alert to candidate events needs no
+    network round trip.
+    """
+
+    def __init__(self, api_host: str, referer: Optional[str] = None,
+                 sport_ids: Iterable[str] = ("sr:sport:1", "sr:sport:2"), page_size: int = 100,
+                 max_pages: int = 20, timeline: Optional[str] = "24", refresh_interval: float = 300,
+                 timeout: float = 15, proxies: Optional[Dict[str, str]] = None):
+        self.api_host = api_host
+        self.referer = referer
+        self.sport_ids = list(sport_ids)
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.timeline = timeline
+        self.refresh_interval = refresh_interval
+        self.timeout = timeout
+        self.proxies = proxies
+
+        self._lock = threading.Lock()
+        self._events: Dict[str, IndexedEvent] = {}
+        self._tokens: Dict[str, Set[str]] = {}
+        self._by_start: List[Tuple[int, str]] = []  # (start_ms, event_id), sorted
+
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=2)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
+        self._running = False
+        self._stop_event = threading.Event()
+        self._thread = None
+        self.last_refresh = None
+        self.last_refresh_seconds = 0.0
+        self.refresh_errors = 0
+        self.lookups = 0
+        self.hits = 0
+
+    # Lifecycle
+
+    def start(self) -> None:
+        """Load the index in a background thread and keep refreshing it"""
+        if self._running:
+            return
+        self._running = True
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._refresh_loop, name="sporty-event-index", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the refresh thread and close the HTTP session"""
+        self._running = False
+        self._stop_event.set()
+        if self._thread and self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+        self._session.close()
+
+    def _refresh_loop(self) -> None:
+        while self._running:
+            try:
+                self.refresh()
+            except Exception as e:
+                self.refresh_errors += 1
+                logger.error(f"Error refreshing Sportybet event index: {e}")
+            self._stop_event.wait(self.refresh_interval)
+
+    # Loading
+
+    def refresh(self) -> int:
+        """
+        Fetch all upcoming events and apply the changes to the index
+
+        Returns:
+        - Number of events indexed
+        """
+        started = time.time()
+        events = []
+        for sport_id in self.sport_ids:
+            events.extend(self._fetch_sport(sport_id))
+
+        fresh = {}
+        for raw in events:
+            entry = self._make_entry(raw)
+            if entry:
+                fresh[entry.event_id] = entry
+        added = removed = 0
+        with self._lock:
+            for event_id in [i for i in self._events if i not in fresh]:
+                self._unlink(event_id)
+                removed += 1
+        # One event per lock hold, so lookups are not blocked for the whole (initial) load
+        for event_id, entry in fresh.items():
+            with self._lock:
+                current = self._events.get(event_id)
+                if current and (current.home, current.away, current.start_ms) == (entry.home, entry.away, entry.start_ms):
+                    continue
+                self._link(entry)
+            added += 1
+        removed += self.prune_started()
+        self.last_refresh = time.time()
+        self.last_refresh_seconds = self.last_refresh - started
+        logger.info(f"Sportybet event index refreshed: {len(fresh)} events ({added} added/changed, {removed} removed) "
+                    f"in {self.last_refresh_seconds:.2f}s")
+        return len(self)
+
+    def _fetch_sport(self, sport_id: str) -> List[Dict[str, Any]]:
+        url = f"{self.api_host}/factsCenter/pcUpcomingEvents"
+        headers = {
+            "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36",
+            "Accept": "application/json",
+        }
+        if self.referer:
+            headers["Referer"] = self.referer
+        events = []
+        for page_num in range(1, self.max_pages + 1):
+            params = {
+                "sportId": sport_id,
+                "marketId": "1,18",
+                "pageSize": str(self.page_size),
+                "pageNum": str(page_num),
+                "option": "1",
+                "_t": str(int(time.time() * 1000)),
+            }
+            if self.timeline:
+                params["timeline"] = str(self.timeline)
+            resp = self._session.get(url, params=params, headers=headers, proxies=self.proxies, timeout=self.timeout)
+            if resp.status_code != 200:
+                logger.warning(f"pcUpcomingEvents returned {resp.status_code} for {sport_id} page {page_num}")
+                break
+            data = (resp.json() or {}).get("data") or {}
+            page_events = []
+            for tournament in data.get("tournaments") or []:
+                page_events.extend(tournament.get("events") or [])
+            events.extend(page_events)
+            total = data.get("totalNum")
+            if len(page_events) < self.page_size or (isinstance(total, int) and page_num * self.page_size >= total):
+                break
+        return events
+
+    def _make_entry(self, raw: Dict[str, Any]) -> Optional[IndexedEvent]:
+        event_id = raw.get("eventId") or raw.get("id")
+        home = raw.get("homeTeamName") or raw.get("home") or ""
+        away = raw.get("awayTeamName") or raw.get("away") or ""
+        if not event_id or not (home or away):
+            return None
+        est = raw.get("estimateStartTime") or raw.get("startTime")
+        try:
+            start_ms = int(est) if est else None
+        except (TypeError, ValueError):
+            start_ms = None
+        tokens = set(normalize_team(home).split()) | set(normalize_team(away).split())
+        tokens = {t for t in tokens if len(t) >= 2}
+        return IndexedEvent(str(event_id), home, away, start_ms, tokens, raw)
+
+    # Incremental updates (callers of _link/_unlink hold the lock)
+
+    def add_event(self, raw: Dict[str, Any]) -> bool:
+        """
+        Insert or update one event
+
+        Returns:
+        - True if the event was indexed
+        """
+        entry = self._make_entry(raw)
+        if not entry:
+            return False
+        with self._lock:
+            self._link(entry)
+        return True
+
+    def remove_event(self, event_id: Any) -> bool:
+        """
+        Remove one event
+
+        Returns:
+        - True if the event was indexed
+        """
+        with self._lock:
+            return self._unlink(str(event_id))
+
+    def prune_started(self, now_ms: Optional[int] = None) -> int:
+        """Remove events whose start time has passed; returns how many were removed"""
+        if now_ms is None:
+            now_ms = int(time.time() * 1000)
+        with self._lock:
+            started = [i for i, e in self._events.items() if e.start_ms is not None and e.start_ms <= now_ms]
+            for event_id in started:
+                self._unlink(event_id)
+        return len(started)
+
+    def _link(self, entry: IndexedEvent) -> None:
+        if entry.event_id in self._events:
+            self._unlink(entry.event_id)
+        self._events[entry.event_id] = entry
+        for token in entry.tokens:
+            self._tokens.setdefault(token, set()).add(entry.event_id)
+        if entry.start_ms is not None:
+            bisect.insort(self._by_start, (entry.start_ms, entry.event_id))
+
+    def _unlink(self, event_id: str) -> bool:
+        entry = self._events.pop(event_id, None)
+        if entry is None:
+            return False
+        for token in entry.tokens:
+            ids = self._tokens.get(token)
+            if ids is not None:
+                ids.discard(event_id)
+                if not ids:
+                    del self._tokens[token]
+        if entry.start_ms is not None:
+            pos = bisect.bisect_left(self._by_start, (entry.start_ms, event_id))
+            if pos < len(self._by_start) and self._by_start[pos] == (entry.start_ms, event_id):
+                del self._by_start[pos]
+        return True
+
+    # Lookups
+
+    def lookup(self, home_team: str, away_team: str, start_ms: Optional[int] = None,
+               window_hours: float = 2, extra_names: Iterable[str] = ()) -> List[Dict[str, Any]]:
+        """
+        Find indexed events sharing a normalized name token with the teams
+
+        Parameters:
+        - home_team: Home team name (raw, normalized here)
+        - away_team: Away team name (raw, normalized here)
+        - start_ms: Match start time in milliseconds; when given only events starting within window_hours are considered
+        - window_hours: Hours either side of start_ms to consider
+        - extra_names: Other names the teams may be listed under (e.g. known aliases)
+
+        Returns:
+        - List of candidate events shaped like firstSearch results
+        """
+        names = [home_team, away_team, *extra_names]
+        query_tokens = set()
+        for name in names:
+            query_tokens.update(t for t in normalize_team(name).split() if len(t) >= 2)
+        with self._lock:
+            window = None
+            if start_ms is not None:
+                window = self._window_ids(int(start_ms), window_hours)
+                if not window:
+                    self.lookups += 1
+                    return []
+            ids = set()
+            for token in query_tokens:
+                postings = self._tokens.get(token)
+                if not postings:
+                    continue
+                # Intersect per token (set & iterates the smaller side), so a common token
+                # never copies its whole board-wide posting list
+                ids |= postings if window is None else postings & window
+            entries = [self._events[i] for i in ids]
+            self.lookups += 1
+            if entries:
+                self.hits += 1
+        if start_ms is not None:
+            # Closest kick-off first, so ties in the match score go to the nearest event
+            entries.sort(key=lambda e: (abs(e.start_ms - int(start_ms)), e.event_id))
+        return [e.as_candidate() for e in entries]
+
+    def _window_ids(self, start_ms: int, window_hours: float) -> Set[str]:
+        """IDs of events starting within window_hours of start_ms (bisect range over the sorted start times)"""
+        span = int(window_hours * HOUR_MS)
+        lo = bisect.bisect_left(self._by_start, (start_ms - span, ""))
+        hi = bisect.bisect_right(self._by_start, (start_ms + span, "\uffff"))
+        return {event_id for _, event_id in self._by_start[lo:hi]}
+
+    def window(self, start_ms: int, window_hours: float = 2) -> List[Dict[str, Any]]:
+        """All indexed events starting within window_hours of start_ms, earliest first"""
+        span = int(window_hours * HOUR_MS)
+        with self._lock:
+            lo = bisect.bisect_left(self._by_start, (start_ms - span, ""))
+            hi = bisect.bisect_right(self._by_start, (start_ms + span, "\uffff"))
+            return [self._events[event_id].as_candidate() for _, event_id in self._by_start[lo:hi]]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._events)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return index size, refresh timing and lookup counters"""
+        with self._lock:
+            return {
+                "events": len(self._events),
+                "tokens": len(self._tokens),
+                "last_refresh": self.last_refresh,
+                "last_refresh_seconds": self.last_refresh_seconds,
+                "refresh_errors": self.refresh_errors,
+                "lookups": self.lookups,
+                "hits": self.hits,
+            }
@@ -0,0 +1,158 @@
+import logging
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class EventMapCache:
+    """
+    Persistent Pinnacle eventId -> Sportybet eventId mapping.
+
+    Mappings are kept in memory for O(1) lookups and written through to a
+    sqlite file so they survive restarts. Each mapping expires at the match
+    kick-off time; expired rows are dropped on load and on lookup.
+    """
+
+    def __init__(self, path: str = "event_map.db", default_ttl: float = 24 * 60 * 60):
+        self.path = path
+        self.default_ttl = default_ttl
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS event_map ("
+            "pinnacle_id TEXT PRIMARY KEY, sporty_id TEXT NOT NULL, home TEXT, away TEXT, "
+            "expires_at REAL NOT NULL, source TEXT, updated_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+        self._load()
+
+    def _load(self) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute("DELETE FROM event_map WHERE expires_at <= ?", (now,))
+            self._conn.commit()
+            rows = self._conn.execute(
+                "SELECT pinnacle_id, sporty_id, home, away, expires_at, source FROM event_map"
+            ).fetchall()
+            for pinnacle_id, sporty_id, home, away, expires_at, source in rows:
+                self._entries[pinnacle_id] = {
+                    "sporty_id": sporty_id, "home": home, "away": away,
+                    "expires_at": expires_at, "source": source,
+                }
+        if rows:
+            logger.info(f"Loaded {len(rows)} event mappings from {self.path}")
+
+    def _expiry(self, starts_ms: Optional[Any]) -> float:
+        try:
+            starts_s = int(starts_ms) / 1000
+        except (TypeError, ValueError):
+            starts_s = 0
+        return starts_s if starts_s > time.time() else time.time() + self.default_ttl
+
+    def get(self, pinnacle_id: Any) -> Optional[str]:
+        """
+        Look up the Sportybet event ID for a Pinnacle event ID
+
+        Returns:
+        - Sportybet event ID, or None if unknown or expired
+        """
+        if pinnacle_id is None:
+            return None
+        key = str(pinnacle_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry["expires_at"] <= time.time():
+                self._delete_locked(key)
+                entry = None
+            if entry:
+                self.hits += 1
+                return entry["sporty_id"]
+            self.misses += 1
+            return None
+
+    def put(self, pinnacle_id: Any, sporty_id: Any, starts_ms: Optional[Any] = None,
+            home: Optional[str] = None, away: Optional[str] = None, source: str = "search") -> None:
+        """
+        Store a mapping that expires at kick-off
+
+        Parameters:
+        - pinnacle_id: Pinnacle event ID
+        - sporty_id: Matched Sportybet event ID
+        - starts_ms: Match start time in milliseconds (default_ttl is used when missing or past)
+        - home/away: Team names, for inspection only
+        - source: Where the mapping came from ("search", "manual", ...)
+        """
+        if pinnacle_id is None or not sporty_id:
+            return
+        key = str(pinnacle_id)
+        entry = {
+            "sporty_id": str(sporty_id), "home": home, "away": away,
+            "expires_at": self._expiry(starts_ms), "source": source,
+        }
+        with self._lock:
+            self._entries[key] = entry
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO event_map (pinnacle_id, sporty_id, home, away, expires_at, source, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (key, entry["sporty_id"], home, away, entry["expires_at"], source, time.time())
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.error(f"Error saving event mapping {key}: {e}")
+
+    def invalidate(self, pinnacle_id: Any) -> bool:
+        """
+        Forget a mapping, e.g. after it turned out to be wrong
+
+        Returns:
+        - True if a mapping was removed
+        """
+        key = str(pinnacle_id)
+        with self._lock:
+            existed = key in self._entries
+            self._delete_locked(key)
+            return existed
+
+    def _delete_locked(self, key: str) -> None:
+        self._entries.pop(key, None)
+        try:
+            self._conn.execute("DELETE FROM event_map WHERE pinnacle_id = ?", (key,))
+            self._conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Error deleting event mapping {key}: {e}")
+
+    def purge_expired(self) -> int:
+        """Drop mappings whose match has kicked off; returns how many were removed"""
+        now = time.time()
+        with self._lock:
+            expired = [k for k, v in self._entries.items() if v["expires_at"] <= now]
+            for key in expired:
+                self._entries.pop(key, None)
+            try:
+                self._conn.execute("DELETE FROM event_map WHERE expires_at <= ?", (now,))
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.error(f"Error purging event mappings: {e}")
+            return len(expired)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return size and hit/miss counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": (self.hits / lookups) if lookups else 0.0,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,130 @@
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+# merge(pending_args, new_args) -> merged args tuple, or None to queue the new task separately
+MergeFn = Callable[[tuple, tuple], Optional[tuple]]
+
+
+class _Task:
+    __slots__ = ("fn", "args", "enqueued_at")
+
+    def __init__(self, fn: Callable[..., Any], args: tuple):
+        self.fn = fn
+        self.args = args
+        self.enqueued_at = time.time()
+
+
+class KeyedExecutor:
+    """
+    Bounded thread pool that runs tasks with the same key strictly in order.
+
+    - Tasks for different keys run in parallel, up to max_workers at a time.
+    - Tasks for the same key run one after another in submission order.
+    - When a merge function is given, a new task for a key that already has a
+      task waiting (not yet started) is folded into that waiting task instead
+      of being queued behind it.
+    """
+
+    def __init__(self, max_workers: int = 4, name: str = "keyed-executor", merge: Optional[MergeFn] = None):
+        self.max_workers = max(1, int(max_workers))
+        self.name = name
+        self._merge = merge
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._queues: Dict[Hashable, deque] = {}
+        self._running = 0
+        self.submitted = 0
+        self.merged = 0
+        self.completed = 0
+        self.failed = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def submit(self, key: Hashable, fn: Callable[..., Any], *args: Any) -> bool:
+        """
+        Queue fn(*args) under key. Raises RuntimeError once the executor is shut down.
+
+        Returns:
+        - True if a new task was queued, False if it was merged into a waiting task
+        """
+        with self._lock:
+            self.submitted += 1
+            queue = self._queues.get(key)
+            if queue and self._merge:
+                pending = queue[-1]
+                if pending.fn == fn:
+                    merged_args = self._merge(pending.args, args)
+                    if merged_args is not None:
+                        pending.args = merged_args
+                        self.merged += 1
+                        return False
+            if queue is None:
+                # No task in flight for this key: start a drain worker for it
+                queue = self._queues[key] = deque()
+                queue.append(_Task(fn, args))
+                try:
+                    self._pool.submit(self._drain, key)
+                except Exception:
+                    # No worker will drain this key (pool shut down): drop it so the
+                    # key is not left marked active with a task that never runs
+                    del self._queues[key]
+                    raise
+            else:
+                queue.append(_Task(fn, args))
+            return True
+
+    def stats(self) -> Dict[str, Any]:
+        """Return queue depth, wait time and throughput counters"""
+        with self._lock:
+            depth = sum(len(q) for q in self._queues.values())
+            started = self.completed + self.failed + self._running
+            return {
+                "name": self.name,
+                "max_workers": self.max_workers,
+                "running": self._running,
+                "queue_depth": depth,
+                "active_keys": len(self._queues),
+                "submitted": self.submitted,
+                "merged": self.merged,
+                "completed": self.completed,
+                "failed": self.failed,
+                "avg_wait_seconds": (self._wait_total / started) if started else 0.0,
+                "max_wait_seconds": self._wait_max,
+            }
+
+    def shutdown(self, wait: bool = False) -> None:
+        """Stop accepting work and release the worker threads"""
+        self._pool.shutdown(wait=wait)
+
+    def _drain(self, key: Hashable) -> None:
+        # The key stays registered (with a possibly empty queue) while a task runs,
+        # so later submissions queue behind it instead of starting a second worker.
+        while True:
+            with self._lock:
+                queue = self._queues[key]
+                if not queue:
+                    del self._queues[key]
+                    return
+                task = queue.popleft()
+                waited = time.time() - task.enqueued_at
+                self._wait_total += waited
+                self._wait_max = max(self._wait_max, waited)
+                self._running += 1
+            try:
+                task.fn(*task.args)
+                ok = True
+            except Exception:
+                logger.exception(f"{self.name} task for key {key} failed")
+                ok = False
+            with self._lock:
+                self._running -= 1
+                if ok:
+                    self.completed += 1
+                else:
+                    self.failed += 1
@@ -0,0 +1,179 @@
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+# Substrings of a market's name/group/title that mark it as a first-half market
+FIRST_HALF_KEYS = ("first half", "1st half", "half-time", "halftime", "half time", "fh", "ht")
+# Substrings that mark a market as belonging to some other period (skipped in strict mode)
+OTHER_PERIOD_KEYS = ("2nd half", "second half", "quarter")
+DNB_KEYS = ("draw no bet", "dnb")
+HANDICAP_KEYS = ("asian handicap",)
+# Strict mode also reads the basketball full-match handicap
+STRICT_HANDICAP_KEYS = HANDICAP_KEYS + ("handicap (incl. overtime)",)
+
+# Exact total market name per (is_basketball, is_first_half)
+TOTAL_MARKET_NAMES = {
+    (False, False): "over/under",
+    (False, True): "1st half - over/under",
+    (True, False): "over/under (incl. overtime)",
+    (True, True): "1st half - total",
+}
+
+_TOTAL_OUTCOME = re.compile(r"(over|under)\s*(\d+\.?\d*)")
+_HANDICAP_POINTS = re.compile(r"([+-]?\d+\.?\d*)")
+# Handicap outcomes are described as "Home (-1.5)" / "Away (+1.5)"
+_HANDICAP_OUTCOME = re.compile(r"^(home|away)\s*\(\s*([+-]?\d+\.?\d*)\s*\)")
+
+MISS = (None, None, None)
+
+
+def _points_key(points: float) -> float:
+    return round(float(points), 2)
+
+
+def _entry(outcome: Dict[str, Any], points: Optional[float]) -> Tuple[Any, Optional[float], Optional[float]]:
+    odds = outcome.get("odds") or outcome.get("value")
+    try:
+        odds = float(odds)
+    except (TypeError, ValueError):
+        odds = None
+    return outcome.get("id"), odds, points
+
+
+class MarketIndex:
+    """
+    Sportybet event markets parsed once into dicts for O(1) lookups.
+
+    Markets are split into full-match and first-half by keywords, and where
+    several outcomes fit a key the first one in payload order wins.
+
+    By default lookups give the same answer as the original scan of the
+    markets list: handicap outcomes are keyed by their whole description, so a
+    "home"/"away" lookup never matches one. With strict=True second-half and
+    quarter markets are skipped so they are never taken for full-match lines,
+    and handicap outcomes are keyed by side and their own points, so
+    "Away (+1.5)" is found as ("away", 1.5).
+    """
+
+    __slots__ = ("markets", "strict", "money_line", "totals", "handicaps", "dnb")
+
+    def __init__(self, markets, strict: bool = False):
+        self.markets = markets
+        self.strict = strict
+        self.money_line: Dict[tuple, tuple] = {}  # (first_half, label) -> (id, odds, None)
+        self.totals: Dict[tuple, tuple] = {}  # (first_half, market_name, side, points) -> (id, odds, points)
+        self.handicaps: Dict[tuple, tuple] = {}  # (first_half, side or label, points) -> (id, odds, points)
+        self.dnb: Dict[tuple, tuple] = {}  # (first_half, label) -> (id, odds, 0.0)
+        total_names = set(TOTAL_MARKET_NAMES.values())
+        handicap_keys = STRICT_HANDICAP_KEYS if strict else HANDICAP_KEYS
+
+        for market in markets or []:
+            label = (market.get("name") or market.get("desc") or "").strip().lower()
+            group = (market.get("group") or "").strip().lower()
+            title = (market.get("title") or "").strip().lower()
+            first_half = any(k in f"{label} {group} {title}" for k in FIRST_HALF_KEYS)
+            name = (market.get("name") or "").strip().lower()
+            desc = (market.get("desc") or "").strip().lower()
+            if strict and any(k in f"{name} {desc}" for k in OTHER_PERIOD_KEYS):
+                continue
+            outcomes = market.get("outcomes") or []
+
+            if name == "1x2" or (first_half and name == "1st half - 1x2"):
+                for o in outcomes:
+                    lbl = (o.get("desc") or "").strip().lower()
+                    self.money_line.setdefault((first_half, lbl), _entry(o, None))
+
+            if name in total_names:
+                for o in outcomes:
+                    m = _TOTAL_OUTCOME.search((o.get("desc") or "").strip().lower())
+                    if m:
+                        pts = float(m.group(2))
+                        self.totals.setdefault((first_half, name, m.group(1), _points_key(pts)), _entry(o, pts))
+
+            if any(k in desc for k in DNB_KEYS):
+                for o in outcomes:
+                    lbl = (o.get("desc") or "").strip().lower()
+                    self.dnb.setdefault((first_half, lbl), _entry(o, 0.0))
+
+            if any(k in desc for k in handicap_keys):
+                for o in outcomes:
+                    txt = (o.get("desc") or "").strip().lower()
+                    if strict:
+                        m = _HANDICAP_OUTCOME.match(txt)
+                        if m:
+                            pts = float(m.group(2))
+                            self.handicaps.setdefault((first_half, m.group(1), _points_key(pts)), _entry(o, pts))
+                    else:
+                        m = _HANDICAP_POINTS.search(txt)
+                        if m:
+                            pts = float(m.group(1))
+                            self.handicaps.setdefault((first_half, txt, _points_key(pts)), _entry(o, pts))
+
+    def find(self, line_type: str, points: Optional[Any], outcome: str, is_first_half: bool = False,
+             is_basketball: bool = False) -> Tuple[Any, Optional[float], Optional[float]]:
+        """
+        Look up the outcome for a bet
+
+        Parameters:
+        - line_type: money_line, total or spread (spread with points 0 is draw no bet)
+        - points: Line points (ignored for money_line)
+        - outcome: home, away, draw, over or under
+        - is_first_half: Whether the bet is for the first half
+        - is_basketball: Picks the basketball total market names
+
+        Returns:
+        - Tuple of (outcome_id, odds, points), or (None, None, None) if not offered
+        """
+        lt = line_type.lower()
+        side = outcome.lower()
+        if lt == "money_line":
+            return self.money_line.get((is_first_half, side), MISS)
+        if points is None:
+            return MISS
+        if lt == "total":
+            name = TOTAL_MARKET_NAMES[(bool(is_basketball), bool(is_first_half))]
+            return self.totals.get((is_first_half, name, side, _points_key(points)), MISS)
+        if lt == "spread":
+            if abs(float(points)) < 0.01:
+                return self.dnb.get((is_first_half, side), MISS)
+            return self.handicaps.get((is_first_half, side, _points_key(points)), MISS)
+        return MISS
+
+    def offered_lines(self, line_type: str, outcome: str, is_first_half: bool = False,
+                      is_basketball: bool = False) -> List[float]:
+        """
+        Points of every line find() can resolve for this market and outcome
+
+        Parameters:
+        - line_type: total or spread (handicap lines only; draw no bet is looked up at 0)
+        - outcome: over/under for totals, home/away for spreads
+        - is_first_half: Whether to list first-half lines
+        - is_basketball: Picks the basketball total market names
+
+        Returns:
+        - Sorted list of points rounded to 2 decimals
+        """
+        lt = line_type.lower()
+        side = outcome.lower()
+        if lt == "total":
+            name = TOTAL_MARKET_NAMES[(bool(is_basketball), bool(is_first_half))]
+            return sorted({pts for fh, n, s, pts in self.totals if fh == is_first_half and n == name and s == side})
+        if lt == "spread":
+            return sorted({pts for fh, s, pts in self.handicaps if fh == is_first_half and s == side and abs(pts) >= 0.01})
+        return []
+
+    def __len__(self) -> int:
+        return len(self.money_line) + len(self.totals) + len(self.handicaps) + len(self.dnb)
+
+
+def get_market_index(event_details: Dict[str, Any], strict: bool = False) -> MarketIndex:
+    """
+    Market index for a Sportybet event, built on first use and kept on the event
+    details under "_market_index" (rebuilt if the markets list is replaced or
+    the matching mode changes)
+    """
+    markets = event_details.get("markets") or []
+    index = event_details.get("_market_index")
+    if index is None or index.markets is not markets or index.strict != strict:
+        index = MarketIndex(markets, strict)
+        event_details["_market_index"] = index
+    return index
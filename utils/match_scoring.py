@@ -0,0 +1,123 @@
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence
+
+import numpy as np
+
+from utils.similarity import lev_similarity_many
+from utils.team_names import normalize_team, longest_tokens, word_match
+
+# Rule scores from best to worst; a candidate gets the highest rule it satisfies
+RULE_SCORES = (400, 350, 300, 250, 200)
+TOP_SCORE = RULE_SCORES[0]
+
+
+def _within_window(event: Dict[str, Any], pinnacle_start_time: Optional[Any], window_hours: float) -> bool:
+    est = event.get("estimateStartTime") or event.get("startTime")
+    if not pinnacle_start_time or not est:
+        return True
+    try:
+        return abs(int(pinnacle_start_time) - int(est)) / (1000 * 60 * 60) <= window_hours
+    except Exception:
+        return False
+
+
+def score_candidates(home_team: str, away_team: str, candidates: Sequence[Dict[str, Any]],
+                     pinnacle_start_time: Optional[Any] = None, window_hours: float = 2,
+                     home_names: Optional[FrozenSet[str]] = None,
+                     away_names: Optional[FrozenSet[str]] = None) -> List[Dict[str, Any]]:
+    """
+    Score Sportybet candidate events against a Pinnacle match in one batch.
+
+    Similarities for home/away against every candidate's home/away are built as
+    arrays and the 400/350/300/250/200 rules are applied as vectorized masks.
+
+    Parameters:
+    - home_team: Pinnacle home team name
+    - away_team: Pinnacle away team name
+    - candidates: Sportybet events (firstSearch results or indexed events)
+    - pinnacle_start_time: Start time from Pinnacle in milliseconds; candidates further than window_hours away are dropped
+    - window_hours: Allowed start-time difference in hours
+    - home_names / away_names: Known normalized names (e.g. from the alias store); candidates whose
+      teams both match exactly score the top rule without any fuzzy matching
+
+    Returns:
+    - Matches as dicts with event_name, event_id, score, exact (both teams matched a known
+      name exactly) and index (position in candidates), best score first and candidate
+      order preserved within a score
+    """
+    kept = []
+    for i, event in enumerate(candidates):
+        if not (event.get("eventId") or event.get("id")):
+            continue
+        if not _within_window(event, pinnacle_start_time, window_hours):
+            continue
+        kept.append(i)
+    if not kept:
+        return []
+
+    q_home = normalize_team(home_team)
+    q_away = normalize_team(away_team)
+    first_tokens = list(longest_tokens(home_team)[:1] + longest_tokens(away_team)[:1])
+
+    names = [(candidates[i].get("homeTeamName") or candidates[i].get("home") or "",
+              candidates[i].get("awayTeamName") or candidates[i].get("away") or "") for i in kept]
+    hns = [normalize_team(h) for h, _ in names]
+    ans = [normalize_team(a) for _, a in names]
+
+    # Exact (alias) hits on both teams need no fuzzy scoring
+    home_names = (home_names or frozenset()) | {q_home}
+    away_names = (away_names or frozenset()) | {q_away}
+    exact = np.array([
+        bool(hn and an) and ((hn in home_names and an in away_names) or (hn in away_names and an in home_names))
+        for hn, an in zip(hns, ans)
+    ], dtype=bool)
+    scores = np.where(exact, TOP_SCORE, 0)
+    fuzzy = np.flatnonzero(~exact)
+    if fuzzy.size:
+        scores[fuzzy] = _fuzzy_scores(q_home, q_away, first_tokens, [hns[i] for i in fuzzy], [ans[i] for i in fuzzy])
+
+    order = np.argsort(-scores, kind="stable")
+    matches = []
+    for pos in order:
+        if scores[pos] <= 0:
+            break
+        event = candidates[kept[pos]]
+        home_name, away_name = names[pos]
+        matches.append({
+            "event_name": f"{home_name} vs {away_name}",
+            "event_id": event.get("eventId") or event.get("id"),
+            "score": int(scores[pos]),
+            "exact": bool(exact[pos]),
+            "index": kept[pos],
+        })
+    return matches
+
+
+def _fuzzy_scores(q_home: str, q_away: str, first_tokens: List[str], hns: List[str], ans: List[str]) -> np.ndarray:
+    """Rule score per candidate from the normalized query and candidate team names"""
+    sim_hh = np.array(lev_similarity_many(q_home, hns))
+    sim_ha = np.array(lev_similarity_many(q_home, ans))
+    sim_aa = np.array(lev_similarity_many(q_away, ans))
+    sim_ah = np.array(lev_similarity_many(q_away, hns))
+
+    # Pick the straight or swapped pairing with the larger sum (straight wins ties)
+    straight = (sim_hh + sim_aa) >= (sim_ha + sim_ah)
+    s1 = np.where(straight, sim_hh, sim_ha)
+    s2 = np.where(straight, sim_aa, sim_ah)
+    total = s1 + s2
+
+    ok_l1b = np.array([any(word_match(x, hn) or word_match(x, an) for x in first_tokens) for hn, an in zip(hns, ans)], dtype=bool)
+    home_eq_h = np.array([q_home == hn for hn in hns], dtype=bool)
+    home_eq_a = np.array([q_home == an for an in ans], dtype=bool)
+    away_eq_h = np.array([q_away == hn for hn in hns], dtype=bool)
+    away_eq_a = np.array([q_away == an for an in ans], dtype=bool)
+    bs1 = np.array([(len(q_home) >= 3 and (q_home in hn or hn in q_home)) or (len(q_home) <= 3 and word_match(q_home, hn)) for hn in hns], dtype=bool)
+    bs2 = np.array([(len(q_away) >= 3 and (q_away in an or an in q_away)) or (len(q_away) <= 3 and word_match(q_away, an)) for an in ans], dtype=bool)
+
+    rules = [
+        (s1 >= 25) & (s2 >= 25) & (total >= 100),
+        ok_l1b & ((s1 >= 70) | (s2 >= 70)),
+        ((home_eq_h | home_eq_a) & (s2 >= 50)) | ((away_eq_h | away_eq_a) & (s1 >= 50)),
+        ok_l1b & ((s1 >= 50) | (s2 >= 50) | (bs1 & bs2)),
+        (s1 >= 40) & (s2 >= 40) & (total >= 100),
+    ]
+    return np.select(rules, RULE_SCORES, default=0)
@@ -0,0 +1,123 @@
+import logging
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _price(value: Any) -> Optional[float]:
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _prices(raw: Dict[str, Any], keys: Dict[str, str]) -> Dict[str, float]:
+    """Parseable prices of raw, renamed by keys (raw key -> price key)"""
+    prices = {}
+    for raw_key, key in keys.items():
+        price = _price(raw.get(raw_key))
+        if price is not None:
+            prices[key] = price
+    return prices
+
+
+def line_key(points: Any) -> float:
+    """Dict key for a spread/total line"""
+    return round(float(points), 2)
+
+
+class PinnaclePeriod:
+    """
+    One period (num_0 full match, num_1 first half) of a Pinnacle event.
+
+    - money_line: {"home", "away", "draw"} -> decimal price
+    - spreads: rounded hdp -> {"home", "away"} -> decimal price
+    - totals: rounded points -> {"home": over, "away": under} decimal prices
+
+    Where several lines round to the same key the first one in the payload is kept.
+    """
+
+    __slots__ = ("key", "money_line", "spreads", "totals")
+
+    def __init__(self, key: str, raw: Dict[str, Any]):
+        self.key = key
+        self.money_line = _prices(raw.get("money_line") or {}, {"home": "home", "away": "away", "draw": "draw"})
+        self.spreads: Dict[float, Dict[str, float]] = {}
+        self.totals: Dict[float, Dict[str, float]] = {}
+        for line in (raw.get("spreads") or {}).values():
+            try:
+                self.spreads.setdefault(line_key(line["hdp"]), _prices(line, {"home": "home", "away": "away"}))
+            except (KeyError, TypeError, ValueError):
+                continue
+        for line in (raw.get("totals") or {}).values():
+            try:
+                # Over/under are priced as home/away for the no-vig calculation
+                self.totals.setdefault(line_key(line["points"]), _prices(line, {"over": "home", "under": "away"}))
+            except (KeyError, TypeError, ValueError):
+                continue
+
+    def prices(self, line_type: str, points: Optional[Any] = None) -> Optional[Dict[str, float]]:
+        """
+        Decimal prices for a market
+
+        Parameters:
+        - line_type: money_line, spread or total
+        - points: Line points for spread/total (exact line only)
+
+        Returns:
+        - Copy of the prices dict, or None if the line is not offered or has no prices
+        """
+        if line_type == "money_line":
+            prices = self.money_line
+        elif line_type == "spread":
+            prices = self.spreads.get(line_key(points)) if points is not None else None
+        elif line_type == "total":
+            prices = self.totals.get(line_key(points)) if points is not None else None
+        else:
+            prices = None
+        return dict(prices) if prices else None
+
+    def spread_points(self) -> List[float]:
+        return sorted(self.spreads)
+
+    def total_points(self) -> List[float]:
+        return sorted(self.totals)
+
+
+class PinnacleEvent:
+    """A Pinnacle /events/{id} payload parsed once into periods with O(1) line lookups"""
+
+    __slots__ = ("event_id", "home", "away", "starts", "periods")
+
+    def __init__(self, event_id: Any, home: Optional[str], away: Optional[str], starts: Any,
+                 periods: Dict[str, PinnaclePeriod]):
+        self.event_id = event_id
+        self.home = home
+        self.away = away
+        self.starts = starts
+        self.periods = periods
+
+    @classmethod
+    def from_payload(cls, payload: Any) -> Optional["PinnacleEvent"]:
+        """
+        Parse an /events/{id} response
+
+        Returns:
+        - PinnacleEvent, or None if the response has no event data
+        """
+        data = payload.get("data") if isinstance(payload, dict) else None
+        if not data or not isinstance(data, dict):
+            return None
+        periods = {}
+        for key, raw in (data.get("periods") or {}).items():
+            if raw and isinstance(raw, dict):
+                try:
+                    periods[key] = PinnaclePeriod(key, raw)
+                except Exception as e:
+                    logger.error(f"Error parsing Pinnacle period {key}: {e}")
+        return cls(data.get("eventId") or data.get("id"), data.get("home"), data.get("away"), data.get("starts"), periods)
+
+    def period(self, period_key: str) -> Optional[PinnaclePeriod]:
+        return self.periods.get(period_key)
@@ -0,0 +1,90 @@
+from functools import lru_cache
+from typing import Dict, Iterable, List, Tuple
+
+from utils.team_names import normalize_team, NORMALIZE_CACHE_SIZE
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def _pattern_masks(pattern: str) -> Tuple[Dict[str, int], int]:
+    """Per-character match bitmasks for a pattern, plus the pattern length"""
+    peq: Dict[str, int] = {}
+    for i, ch in enumerate(pattern):
+        peq[ch] = peq.get(ch, 0) | (1 << i)
+    return peq, len(pattern)
+
+
+def _myers_distance(peq: Dict[str, int], m: int, text: str) -> int:
+    # Myers/Hyyro bit-parallel edit distance: one column of the DP matrix per
+    # text character, encoded as vertical +1/-1 delta bit vectors
+    mask = (1 << m) - 1
+    last = 1 << (m - 1)
+    pv, mv, score = mask, 0, m
+    for ch in text:
+        eq = peq.get(ch, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (~(xh | pv) & mask)
+        mh = pv & xh
+        if ph & last:
+            score += 1
+        elif mh & last:
+            score -= 1
+        ph = ((ph << 1) | 1) & mask
+        mh = (mh << 1) & mask
+        pv = mh | (~(xv | ph) & mask)
+        mv = ph & xv
+    return score
+
+
+def levenshtein(a: str, b: str) -> int:
+    """Levenshtein edit distance between two strings"""
+    if a == b:
+        return 0
+    if not a:
+        return len(b)
+    if not b:
+        return len(a)
+    if len(a) > len(b):
+        a, b = b, a
+    peq, m = _pattern_masks(a)
+    return _myers_distance(peq, m, b)
+
+
+def _similarity_normalized(a: str, b: str) -> float:
+    if not a or not b:
+        return 0.0
+    dist = levenshtein(a, b)
+    return (1 - dist / max(len(a), len(b))) * 100
+
+
+def lev_similarity(a: str, b: str) -> float:
+    """
+    Levenshtein similarity (0-100) of two team names after normalization
+    """
+    return _similarity_normalized(normalize_team(a), normalize_team(b))
+
+
+def lev_similarity_many(query: str, candidates: Iterable[str]) -> List[float]:
+    """
+    Score one team name against many candidate names in a single call
+
+    The query is normalized and its bitmasks built once for the whole batch.
+
+    Returns:
+    - Similarity (0-100) for each candidate, in order
+    """
+    q = normalize_team(query)
+    if not q:
+        return [0.0 for _ in candidates]
+    peq, m = _pattern_masks(q)
+    scores = []
+    for candidate in candidates:
+        c = normalize_team(candidate)
+        if not c:
+            scores.append(0.0)
+        elif c == q:
+            scores.append(100.0)
+        else:
+            dist = _myers_distance(peq, m, c)
+            scores.append((1 - dist / max(m, len(c))) * 100)
+    return scores
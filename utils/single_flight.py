@@ -0,0 +1,117 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class _Flight:
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlightCache:
+    """
+    Short-TTL result cache where concurrent callers for the same key share one load.
+
+    - A fresh cached value is returned without calling the loader.
+    - While a load is in flight, other callers for that key wait for its result
+      instead of starting their own.
+    - Negative results (as decided by is_negative) are cached for negative_ttl.
+    - Loader exceptions are passed to every waiting caller and are not cached.
+    """
+
+    def __init__(self, ttl: float = 30.0, negative_ttl: float = 10.0, max_entries: int = 2048,
+                 is_negative: Optional[Callable[[Any], bool]] = None, name: str = "single-flight"):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.is_negative = is_negative or (lambda value: not value)
+        self.name = name
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key -> (expires_at, value)
+        self._flights: Dict[Hashable, _Flight] = {}
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.errors = 0
+
+    def get(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+        Return the cached value for key, loading it once if missing or expired
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > time.time():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    if self.is_negative(value):
+                        self.negative_hits += 1
+                    return value
+                del self._entries[key]
+            flight = self._flights.get(key)
+            if flight is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                flight = self._flights[key] = _Flight()
+                self.misses += 1
+                leader = True
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = loader()
+        except BaseException as e:
+            flight.error = e
+            with self._lock:
+                self.errors += 1
+            raise
+        else:
+            ttl = self.negative_ttl if self.is_negative(flight.value) else self.ttl
+            if ttl > 0:
+                with self._lock:
+                    self._entries[key] = (time.time() + ttl, flight.value)
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+            return flight.value
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def invalidate(self, key: Hashable) -> bool:
+        """Drop a cached value; returns True if one was cached"""
+        with self._lock:
+            return self._entries.pop(key, None) is not None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit ratio and how many loads were saved by the cache and by coalescing"""
+        with self._lock:
+            calls = self.hits + self.misses + self.coalesced
+            return {
+                "name": self.name,
+                "size": len(self._entries),
+                "hits": self.hits,
+                "negative_hits": self.negative_hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "errors": self.errors,
+                "saved_requests": self.hits + self.coalesced,
+                "hit_ratio": ((self.hits + self.coalesced) / calls) if calls else 0.0,
+            }
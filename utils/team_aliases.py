@@ -0,0 +1,215 @@
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, FrozenSet, List, Optional
+
+from utils.similarity import lev_similarity
+from utils.team_names import normalize_team
+
+logger = logging.getLogger(__name__)
+
+
+class TeamAliasStore:
+    """
+    Pinnacle -> Sportybet team name aliases learned from confirmed matches.
+
+    Names are stored normalized. Each Pinnacle name maps to one or more
+    Sportybet names with a count of how often the pair was confirmed; manual
+    entries (pre-seeded or added from cli.py) are always trusted. Lookups are
+    plain dict hits, so known names resolve without any fuzzy matching.
+
+    The file is re-read when it changes on disk, so edits made with cli.py
+    while the bot is running are picked up instead of overwritten.
+    """
+
+    def __init__(self, path: str = "team_aliases.json", min_count: int = 2, reload_interval: float = 5.0):
+        self.path = path
+        self.min_count = max(1, int(min_count))
+        self.reload_interval = reload_interval
+        self._lock = threading.RLock()
+        self._aliases: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._best: Dict[str, str] = {}
+        self._mtime = None
+        self._last_check = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.load()
+
+    # Persistence
+
+    def load(self) -> None:
+        """Load aliases from disk (missing or invalid files leave the store empty)"""
+        with self._lock:
+            aliases = {}
+            mtime = None
+            if os.path.exists(self.path):
+                try:
+                    mtime = os.path.getmtime(self.path)
+                    with open(self.path, "r") as f:
+                        stored = json.load(f) or {}
+                    for pinnacle_name, targets in (stored.get("aliases") or {}).items():
+                        if isinstance(targets, dict):
+                            aliases[pinnacle_name] = {
+                                sporty_name: {"count": int(info.get("count", 0)), "manual": bool(info.get("manual", False))}
+                                for sporty_name, info in targets.items() if isinstance(info, dict)
+                            }
+                except Exception as e:
+                    logger.error(f"Error loading team aliases from {self.path}: {e}")
+            self._aliases = aliases
+            self._mtime = mtime
+            self._rebuild_best()
+
+    def save(self) -> None:
+        """Write the aliases to disk atomically"""
+        with self._lock:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"aliases": self._aliases}, f, indent=4, sort_keys=True)
+            os.replace(tmp_path, self.path)
+            self._mtime = os.path.getmtime(self.path)
+
+    def _reload_if_changed(self, force: bool = False) -> None:
+        now = time.time()
+        if not force and now - self._last_check < self.reload_interval:
+            return
+        self._last_check = now
+        try:
+            mtime = os.path.getmtime(self.path) if os.path.exists(self.path) else None
+        except OSError:
+            return
+        if mtime != self._mtime:
+            self.load()
+
+    def _rebuild_best(self) -> None:
+        best = {}
+        for pinnacle_name, targets in self._aliases.items():
+            trusted = [(info["manual"], info["count"], sporty_name) for sporty_name, info in targets.items()
+                       if info["manual"] or info["count"] >= self.min_count]
+            if trusted:
+                best[pinnacle_name] = max(trusted)[2]
+        self._best = best
+
+    # Lookups
+
+    def lookup(self, pinnacle_name: str) -> Optional[str]:
+        """
+        Get the trusted Sportybet name for a Pinnacle team name
+
+        Returns:
+        - Normalized Sportybet name, or None if there is no trusted alias
+        """
+        key = normalize_team(pinnacle_name)
+        with self._lock:
+            self._reload_if_changed()
+            alias = self._best.get(key)
+            if alias:
+                self.hits += 1
+            else:
+                self.misses += 1
+            return alias
+
+    def names_for(self, pinnacle_name: str) -> FrozenSet[str]:
+        """Normalized names a Sportybet team may use for this Pinnacle team (itself plus any trusted alias)"""
+        names = {normalize_team(pinnacle_name)}
+        alias = self.lookup(pinnacle_name)
+        if alias:
+            names.add(alias)
+        return frozenset(n for n in names if n)
+
+    # Updates
+
+    def record(self, pinnacle_name: str, sporty_name: str) -> bool:
+        """
+        Count one confirmed Pinnacle/Sportybet name pair
+
+        Returns:
+        - True if the pair was recorded (identical names are not aliases and are skipped)
+        """
+        key = normalize_team(pinnacle_name)
+        target = normalize_team(sporty_name)
+        if not key or not target or key == target:
+            return False
+        with self._lock:
+            self._reload_if_changed(force=True)
+            info = self._aliases.setdefault(key, {}).setdefault(target, {"count": 0, "manual": False})
+            info["count"] += 1
+            self._rebuild_best()
+            self.save()
+        return True
+
+    def record_match(self, pinnacle_home: str, pinnacle_away: str, sporty_home: str, sporty_away: str) -> None:
+        """Record both team pairs of a confirmed match, detecting swapped home/away"""
+        straight = lev_similarity(pinnacle_home, sporty_home) + lev_similarity(pinnacle_away, sporty_away)
+        swapped = lev_similarity(pinnacle_home, sporty_away) + lev_similarity(pinnacle_away, sporty_home)
+        if swapped > straight:
+            sporty_home, sporty_away = sporty_away, sporty_home
+        self.record(pinnacle_home, sporty_home)
+        self.record(pinnacle_away, sporty_away)
+
+    def add(self, pinnacle_name: str, sporty_name: str) -> bool:
+        """Add a manual (always trusted) alias"""
+        key = normalize_team(pinnacle_name)
+        target = normalize_team(sporty_name)
+        if not key or not target:
+            return False
+        with self._lock:
+            self._reload_if_changed(force=True)
+            info = self._aliases.setdefault(key, {}).setdefault(target, {"count": 0, "manual": True})
+            info["manual"] = True
+            self._rebuild_best()
+            self.save()
+        return True
+
+    def remove(self, pinnacle_name: str, sporty_name: Optional[str] = None) -> bool:
+        """
+        Remove one alias, or all aliases of a Pinnacle name when sporty_name is None
+
+        Returns:
+        - True if anything was removed
+        """
+        key = normalize_team(pinnacle_name)
+        with self._lock:
+            self._reload_if_changed(force=True)
+            targets = self._aliases.get(key)
+            if not targets:
+                return False
+            if sporty_name is None:
+                del self._aliases[key]
+            else:
+                if targets.pop(normalize_team(sporty_name), None) is None:
+                    return False
+                if not targets:
+                    del self._aliases[key]
+            self._rebuild_best()
+            self.save()
+        return True
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """All aliases as a list of dicts, sorted by Pinnacle name"""
+        with self._lock:
+            self._reload_if_changed(force=True)
+            rows = []
+            for pinnacle_name in sorted(self._aliases):
+                for sporty_name, info in sorted(self._aliases[pinnacle_name].items()):
+                    rows.append({
+                        "pinnacle": pinnacle_name,
+                        "sporty": sporty_name,
+                        "count": info["count"],
+                        "manual": info["manual"],
+                        "trusted": self._best.get(pinnacle_name) == sporty_name,
+                    })
+            return rows
+
+    def stats(self) -> Dict[str, Any]:
+        """Return alias counts and lookup hit/miss counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "names": len(self._aliases),
+                "trusted": len(self._best),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": (self.hits / lookups) if lookups else 0.0,
+            }
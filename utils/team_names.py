@@ -0,0 +1,80 @@
+import re
+from functools import lru_cache
+from typing import Dict, FrozenSet, Tuple
+
+# Bounded so a long-running process cannot grow the caches without limit
+NORMALIZE_CACHE_SIZE = 16384
+
+_BRACKETED = re.compile(r"\(.*?\)")
+_NON_ALNUM = re.compile(r"[^a-z0-9\s]")
+_WHITESPACE = re.compile(r"\s+")
+_CLUB_SUFFIX = re.compile(r"\b(fc|bc|cf|ac)\b\s*$")
+
+STOPWORDS: FrozenSet[str] = frozenset({
+    "club", "team", "sport", "sports", "fc", "cf", "sc", "ac", "bc", "fk", "united", "city", "town",
+    "rovers", "athletic", "sporting", "real", "atletico", "inter", "milan", "juventus", "football",
+    "soccer", "basketball",
+})
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def normalize_team(name: str) -> str:
+    """
+    Lower-case a team name and strip brackets, punctuation, club suffixes and stopwords
+    """
+    s = str(name or "").lower()
+    s = _BRACKETED.sub("", s)
+    s = _NON_ALNUM.sub(" ", s)
+    s = _WHITESPACE.sub(" ", s).strip()
+    s = _CLUB_SUFFIX.sub("", s).strip()
+    return " ".join(t for t in s.split() if t not in STOPWORDS)
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def team_tokens(name: str) -> FrozenSet[str]:
+    """Set of tokens of the normalized team name"""
+    return frozenset(normalize_team(name).split())
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def longest_tokens(name: str, limit: int = 3) -> Tuple[str, ...]:
+    """
+    Up to `limit` distinct tokens of at least 3 characters, longest first
+    """
+    arr = [w for w in normalize_team(name).split() if len(w) >= 3]
+    arr.sort(key=lambda x: len(x), reverse=True)
+    seen = []
+    for w in arr:
+        if w not in seen:
+            seen.append(w)
+        if len(seen) >= limit:
+            break
+    return tuple(seen)
+
+
+@lru_cache(maxsize=1024)
+def _word_pattern(token: str):
+    return re.compile(r"\b" + re.escape(token) + r"\b")
+
+
+def word_match(token: str, text: str) -> bool:
+    """
+    Whether a token occurs in the normalized text; tokens of 3 characters or
+    fewer must match a whole word
+    """
+    token = str(token or "").lower().strip()
+    text = normalize_team(text)
+    if not token or not text:
+        return False
+    if len(token) <= 3:
+        return _word_pattern(token).search(text) is not None
+    return token in text
+
+
+def cache_stats() -> Dict[str, Dict[str, int]]:
+    """Hit/miss counters of the normalization caches"""
+    stats = {}
+    for fn in (normalize_team, team_tokens, longest_tokens):
+        info = fn.cache_info()
+        stats[fn.__name__] = {"hits": info.hits, "misses": info.misses, "size": info.currsize, "max_size": info.maxsize}
+    return stats
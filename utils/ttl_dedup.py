@@ -0,0 +1,101 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+class TTLDedupStore:
+    """
+    Insertion-ordered set of seen keys with a per-key expiry.
+
+    - Keys are kept in insertion order (re-adding a key moves it to the end), so
+      when the store is full the oldest entries are evicted first.
+    - Each key carries its own expiry time; expired keys count as misses and are
+      dropped lazily on lookup and from the front of the order on insert.
+    - All operations are O(1) amortized and thread safe.
+    """
+
+    def __init__(self, max_size: int = 1000, default_ttl: float = 6 * 60 * 60, name: str = "dedup"):
+        self.max_size = max_size
+        self.default_ttl = default_ttl
+        self.name = name
+        self._entries: "OrderedDict[Hashable, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def add(self, key: Hashable, expires_at: Optional[float] = None) -> None:
+        """
+        Record a key as seen.
+
+        Parameters:
+        - key: The key to record
+        - expires_at: Unix time (seconds) after which the key is forgotten;
+          defaults to now + default_ttl
+        """
+        now = time.time()
+        if expires_at is None:
+            expires_at = now + self.default_ttl
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            self._entries[key] = expires_at
+            self._evict(now)
+
+    def __contains__(self, key: Hashable) -> bool:
+        now = time.time()
+        with self._lock:
+            expires_at = self._entries.get(key)
+            if expires_at is None:
+                self.misses += 1
+                return False
+            if expires_at <= now:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return False
+            self.hits += 1
+            return True
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def discard(self, key: Hashable) -> None:
+        """Forget a key if present"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Forget all keys (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return size and hit/miss/eviction counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": (self.hits / lookups) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def _evict(self, now: float) -> None:
+        # Drop expired keys sitting at the front of the order, then trim to capacity.
+        # Each key is removed at most once, so the cost is amortized O(1) per insert.
+        while self._entries:
+            oldest_key, oldest_expiry = next(iter(self._entries.items()))
+            if oldest_expiry > now:
+                break
+            self._entries.popitem(last=False)
+            self.expirations += 1
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1